@@ -0,0 +1,72 @@
+import React from 'react'
+import '@testing-library/jest-dom'
+import { render, screen, fireEvent, waitFor, act } from '@testing-library/react'
+
+const mockPush = jest.fn()
+jest.mock('next/navigation', () => ({
+    useRouter: () => ({ push: mockPush }),
+    useSearchParams: () => ({ get: () => null }),
+}))
+jest.mock('next/image', () => props => {
+    const { fill, priority, ...rest } = props
+    return <img {...rest} />
+})
+jest.mock('next/link', () => ({ href, children }) => <a href={href}>{children}</a>)
+
+class LocalStorageMock {
+    constructor() { this.store = {} }
+    getItem(k) { return this.store[k] ?? null }
+    setItem(k, v) { this.store[k] = String(v) }
+    removeItem(k) { delete this.store[k] }
+}
+global.localStorage = new LocalStorageMock()
+
+const token = `x.${btoa(JSON.stringify({ exp: Date.now() / 1000 + 3600 }))}.y`
+const context = {
+    cart: {
+        items: [
+            { product: 1, name: 'Apple', price: 10, quantity: 1, stock: 5 },
+            { product: 2, name: 'Bread', price: 5, quantity: 1, stock: 5 },
+        ],
+    },
+    addresses: [],
+    payment_methods: [],
+    shipping_options: [],
+}
+
+import OrderSummaryPage from '../pages/order'
+
+describe('OrderSummaryPage', () => {
+    beforeEach(() => {
+        localStorage.store = { jwt_access: token }
+        global.fetch = jest.fn(() =>
+            Promise.resolve({ ok: true, json: () => Promise.resolve({ data: context }) })
+        )
+    })
+    afterEach(() => {
+        delete global.fetch
+    })
+
+    const patches = () => fetch.mock.calls.filter(([, init]) => init?.method === 'PATCH')
+
+    it('sends quick quantity changes together in one PATCH', async () => {
+        await act(async () => {
+            render(<OrderSummaryPage />)
+        })
+        await waitFor(() => expect(screen.getByText('Apple')).toBeInTheDocument())
+
+        const [applePlus, breadPlus] = screen.getAllByRole('button', { name: '+' })
+        fireEvent.click(applePlus)
+        fireEvent.click(applePlus)
+        fireEvent.click(breadPlus)
+        expect(patches()).toHaveLength(0)
+
+        await waitFor(() => expect(patches()).toHaveLength(1))
+        expect(JSON.parse(patches()[0][1].body)).toEqual({
+            items: [
+                { product_id: 1, quantity: 3 },
+                { product_id: 2, quantity: 2 },
+            ],
+        })
+    })
+})
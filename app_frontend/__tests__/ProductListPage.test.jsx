@@ -37,6 +37,9 @@ describe('ProductListPage', () => {
         localStorage.store = {}
         mockPush.mockClear()
         fetch.mockClear()
+        fetch.mockImplementation(() =>
+            Promise.resolve({ ok: true, json: () => Promise.resolve({ data: [], next: null }) })
+        )
     })
 
     it('renders search box, category buttons and login prompt', async () => {
@@ -64,16 +67,16 @@ describe('ProductListPage', () => {
         })
     })
 
-    it('filters products by search term', async () => {
-        fetch.mockImplementationOnce(() =>
+    it('sends the search term to the server', async () => {
+        const apple = { id: 1, name: 'Apple', detail: 'Fresh apple', available: true, expiration_date: '2025-01-01', price: 10, categories: ['Fruit'] }
+        const bread = { id: 2, name: 'Bread', detail: 'Whole grain', available: true, expiration_date: '2025-01-01', price: 5, categories: ['Cereals'] }
+        fetch.mockImplementation(url =>
             Promise.resolve({
                 ok: true,
                 json: () =>
                     Promise.resolve({
-                        data: [
-                            { id: 1, name: 'Apple', detail: 'Fresh apple', available: true, expiration_date: '2025-01-01', price: 10, categories: ['Fruit'] },
-                            { id: 2, name: 'Bread', detail: 'Whole grain', available: true, expiration_date: '2025-01-01', price: 5, categories: ['Cereals'] },
-                        ],
+                        data: url.includes('q=app') ? [apple] : [apple, bread],
+                        next: null,
                     }),
             })
         )
@@ -91,7 +94,57 @@ describe('ProductListPage', () => {
             target: { value: 'app' },
         })
 
+        await waitFor(() => {
+            expect(screen.queryByText('Bread')).toBeNull()
+        })
         expect(screen.getByText('Apple')).toBeInTheDocument()
+        expect(fetch.mock.calls.at(-1)[0]).toContain('q=app')
+    })
+
+    it('sends the category to the server', async () => {
+        await act(async () => {
+            render(<ProductListPage />)
+        })
+
+        await act(async () => {
+            fireEvent.click(screen.getByRole('button', { name: /Fruit/ }))
+        })
+
+        await waitFor(() => {
+            expect(fetch.mock.calls.at(-1)[0]).toContain('category=Fruit')
+        })
+    })
+
+    it('loads the next page on demand', async () => {
+        fetch.mockImplementation(url =>
+            Promise.resolve({
+                ok: true,
+                json: () =>
+                    Promise.resolve(
+                        url === 'http://api/next'
+                            ? { data: [{ id: 2, name: 'Bread', detail: '', expiration_date: '2025-01-01', price: 5, categories: [] }], next: null }
+                            : { data: [{ id: 1, name: 'Apple', detail: '', expiration_date: '2025-01-01', price: 10, categories: [] }], next: 'http://api/next' }
+                    ),
+            })
+        )
+
+        await act(async () => {
+            render(<ProductListPage />)
+        })
+
+        await waitFor(() => {
+            expect(screen.getByText('Apple')).toBeInTheDocument()
+        })
         expect(screen.queryByText('Bread')).toBeNull()
+
+        await act(async () => {
+            fireEvent.click(screen.getByRole('button', { name: 'โหลดสินค้าเพิ่มเติม' }))
+        })
+
+        await waitFor(() => {
+            expect(screen.getByText('Bread')).toBeInTheDocument()
+        })
+        expect(screen.getByText('Apple')).toBeInTheDocument()
+        expect(screen.queryByRole('button', { name: 'โหลดสินค้าเพิ่มเติม' })).toBeNull()
     })
 })
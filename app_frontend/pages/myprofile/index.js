@@ -58,6 +58,7 @@ export default function ProfilePage() {
     const [isLoggedIn, setIsLoggedIn] = useState(false);
     const [backgroundImage, setBackgroundImage] = useState('/images/bg1.jpeg');
     const [historyList, setHistoryList] = useState([]);
+    const [historyNext, setHistoryNext] = useState(null);
     const [addressList, setAddressList] = useState([]);
     const [showNewAddressForm, setShowNewAddressForm] = useState(false);
     const [defaultAddressId, setDefaultAddressId] = useState(null);
@@ -94,18 +95,25 @@ export default function ProfilePage() {
 
     useEffect(() => {
         if (isLoggedIn && activeTab === 'history') {
-            const token = localStorage.getItem('jwt_access');
-            fetch(`${getProductUrl()}/api/history/`, {
-                headers: { Authorization: `Bearer ${token}` }
-            })
-                .then(res => res.json())
-                .then(json => {
-                    setHistoryList(json.orders || []);
-                })
-                .catch(err => console.error('Error fetching history:', err));
+            loadHistory(`${getProductUrl()}/api/history/`, false);
         }
     }, [isLoggedIn, activeTab]);
 
+    // The history comes a page at a time; `next` is the URL of the page after.
+    const loadHistory = (url, append) => {
+        const token = localStorage.getItem('jwt_access');
+        fetch(url, {
+            headers: { Authorization: `Bearer ${token}` }
+        })
+            .then(res => res.json())
+            .then(json => {
+                const orders = json.orders || [];
+                setHistoryList(prev => (append ? [...prev, ...orders] : orders));
+                setHistoryNext(json.next || null);
+            })
+            .catch(err => console.error('Error fetching history:', err));
+    };
+
     useEffect(() => {
         const checkAuth = () => {
             const token = localStorage.getItem('jwt_access');
@@ -939,6 +947,14 @@ export default function ProfilePage() {
                                             ))
                                     )}
                                 </div>
+                                {historyNext && (
+                                    <button
+                                        onClick={() => loadHistory(historyNext, true)}
+                                        className="mt-4 px-4 py-2 border border-[#8b4513] text-[#8b4513] rounded-lg hover:bg-[#fdf6e3]"
+                                    >
+                                        ดูคำสั่งซื้อเพิ่มเติม
+                                    </button>
+                                )}
                             </>
                         )}
 
@@ -4,7 +4,7 @@ import { useEffect, useState, useRef } from 'react';
 import { useSearchParams, useRouter } from 'next/navigation';
 import Link from 'next/link';
 import Image from 'next/image';
-import { getUserUrl, getProductUrl } from '@/baseurl';
+import { getProductUrl } from '@/baseurl';
 
 function isTokenExpired(token) {
     try {
@@ -39,6 +39,9 @@ export default function OrderSummaryPage() {
     const [cartCount, setCartCount] = useState(0);
     const [isSubmitting, setIsSubmitting] = useState(false);
     const dropdownRef = useRef(null);
+    // Quantity changes not yet sent, by product id, and the timer that sends them.
+    const pendingQtyRef = useRef({});
+    const flushTimerRef = useRef(null);
 
     useEffect(() => {
         const stored = JSON.parse(localStorage.getItem('cart') || '[]');
@@ -107,15 +110,30 @@ export default function OrderSummaryPage() {
         (async () => {
             try {
                 const token = localStorage.getItem('jwt_access');
-                const res = await fetch(`${getProductUrl()}/api/cart/`, {
+                const res = await fetch(`${getProductUrl()}/api/checkout/context/`, {
                     headers: { Authorization: `Bearer ${token}` }
                 });
-                const { cart_orders } = await res.json();
-                const fetched = cart_orders.flatMap(o =>
-                    o.items.map(i => ({ id: i.product, quantity: i.quantity }))
-                );
+                const { data } = await res.json();
+                const items = data.cart ? data.cart.items : [];
+                const fetched = items.map(i => ({ id: i.product, quantity: i.quantity }));
+                setFullProducts(items.map(i => ({
+                    id: i.product,
+                    name: i.name,
+                    image: `/images/${i.name.toLowerCase().trim()}.jpg`,
+                    price: Number(i.price) || 0,
+                    quantity: i.quantity,
+                    stock: i.stock || 0,
+                })));
                 setCart(fetched);
                 localStorage.setItem('cart', JSON.stringify(fetched));
+
+                // Addresses and payment methods arrive sorted defaults first.
+                setAddresses(data.addresses);
+                setPayments(data.payment_methods);
+                setShippings(data.shipping_options);
+                setSelectedAddressId(prev => prev ?? data.addresses[0]?.id ?? null);
+                setSelectedPaymentId(prev => prev ?? data.payment_methods[0]?.id ?? null);
+                setSelectedShippingId(prev => prev ?? data.shipping_options[0]?.id ?? null);
             } catch (e) {
                 console.error(e);
             }
@@ -130,31 +148,39 @@ export default function OrderSummaryPage() {
         }
         if (!cart.length) return setFullProducts([]);
 
+        // Products already loaded only need their quantities updated.
+        const known = new Map(fullProducts.map(p => [p.id, p]));
+        if (cart.every(({ id }) => known.has(id))) {
+            setFullProducts(cart.map(({ id, quantity }) => ({ ...known.get(id), quantity })));
+            return;
+        }
+
         (async () => {
             try {
-                const details = await Promise.all(
-                    cart.map(({ id }) =>
-                        fetch(`${getProductUrl()}/api/product/${id}/`)
-                            .then(r => r.json())
-                            .then(json => json)
-                    )
+                const ids = cart.map(({ id }) => id).join(',');
+                const res = await fetch(
+                    `${getProductUrl()}/api/product/batch/?ids=${ids}&fields=id,name,price,stock`
                 );
-                const enriched = details.map((p, i) => {
-                    const fileName =
-                        p.data.name
-                            .toLowerCase()
-                            .trim()
-                        + '.jpg';
-
-                    return {
-                        id: p.data.id,
-                        name: p.data.name,
-                        image: `/images/${fileName}`,
-                        price: Number(p.data.price) || 0,
-                        quantity: cart[i].quantity,
-                        stock: p.data.stock || 0,
-                    };
-                });
+                const { data: details } = await res.json();
+                const enriched = cart
+                    .filter(({ id }) => !details[id].error)
+                    .map(({ id, quantity }) => {
+                        const p = details[id];
+                        const fileName =
+                            p.name
+                                .toLowerCase()
+                                .trim()
+                            + '.jpg';
+
+                        return {
+                            id: p.id,
+                            name: p.name,
+                            image: `/images/${fileName}`,
+                            price: Number(p.price) || 0,
+                            quantity,
+                            stock: p.stock || 0,
+                        };
+                    });
                 setFullProducts(enriched);
             } catch (e) {
                 console.error(e);
@@ -162,82 +188,47 @@ export default function OrderSummaryPage() {
         })();
     }, [cart, isLoggedIn]);
 
-    useEffect(() => {
-        (async () => {
-            try {
-                const token = localStorage.getItem('jwt_access');
-                const headers = { Authorization: `Bearer ${token}` };
-                const [ar, pr, sr] = await Promise.all([
-                    fetch(`${getUserUrl()}/api/address/`, { headers }),
-                    fetch(`${getUserUrl()}/api/payment/`, { headers }),
-                    fetch(`${getProductUrl()}/api/shipping/`, { headers }),
-                ]);
-                const { data: addrlist = [] } = await ar.json();
-                const { data: paylist = [] } = await pr.json();
-                const sj = await sr.json();
-                const sl = Array.isArray(sj) ? sj : sj.data || [];
-
-                const sortedAddresses = [...addrlist].sort((a, b) => (b.is_default ? 1 : 0) - (a.is_default ? 1 : 0));
-                const sortedPayments = [...paylist].sort((a, b) => (b.is_default ? 1 : 0) - (a.is_default ? 1 : 0));
-
-                setAddresses(sortedAddresses);
-                setPayments(sortedPayments);
-                setShippings(sl);
-
-                if (sortedAddresses.length) setSelectedAddressId(sortedAddresses[0].id);
-                if (sortedPayments.length) setSelectedPaymentId(sortedPayments[0].id);
-                if (sl.length) setSelectedShippingId(sl[0].id);
-            } catch (e) {
-                console.error(e);
-            }
-        })();
-    }, []);
-
-
-    const removeItemFromCart = async (productId) => {
-        try {
-            const token = localStorage.getItem('jwt_access');
-            const res = await fetch(`${getProductUrl()}/api/cart/remove/${productId}/`, {
-                method: 'DELETE',
-                headers: { Authorization: `Bearer ${token}` }
-            });
-            if (!res.ok) throw new Error('Failed to remove item');
-        } catch (err) {
-            console.error('Remove failed:', err);
-        }
-    };
-
-    const updateCart = async (productId, quantity) => {
+    const updateCart = async (items) => {
         try {
             const token = localStorage.getItem('jwt_access');
-            await fetch(`${getProductUrl()}/api/cart/update/${productId}/`, {
+            await fetch(`${getProductUrl()}/api/cart/items/`, {
                 method: 'PATCH',
                 headers: {
                     'Content-Type': 'application/json',
                     'Authorization': `Bearer ${token}`,
                 },
-                body: JSON.stringify({ quantity }),
+                body: JSON.stringify({ items }),
+                // Still delivered when the page is left right after a click.
+                keepalive: true,
             });
         } catch (err) {
             console.error('Backend update failed:', err);
         }
     };
 
-    const updateQty = async (id, newQty) => {
-        try {
-            if (newQty === 0) {
-                await removeItemFromCart(id);
-            } else {
-                await updateCart(id, newQty);
-            }
+    // Send every quantity changed since the last flush in one PATCH.
+    const flushCartUpdates = async () => {
+        clearTimeout(flushTimerRef.current);
+        flushTimerRef.current = null;
+        const items = Object.entries(pendingQtyRef.current).map(([id, quantity]) => ({
+            product_id: Number(id),
+            quantity,
+        }));
+        pendingQtyRef.current = {};
+        if (items.length > 0) await updateCart(items);
+    };
 
-            const updated = newQty > 0
-                ? cart.map(i => i.id === id ? { ...i, quantity: newQty } : i)
-                : cart.filter(i => i.id !== id);
-            setCart(updated);
-        } catch (err) {
-            console.error('Failed to update quantity:', err);
-        }
+    useEffect(() => () => { flushCartUpdates(); }, []);
+
+    const updateQty = (id, newQty) => {
+        setCart(prev => newQty > 0
+            ? prev.map(i => i.id === id ? { ...i, quantity: newQty } : i)
+            : prev.filter(i => i.id !== id));
+
+        // Clicks in quick succession, on one product or several, share a PATCH.
+        pendingQtyRef.current[id] = newQty;
+        clearTimeout(flushTimerRef.current);
+        flushTimerRef.current = setTimeout(flushCartUpdates, 400);
     };
 
     const subtotal = fullProducts.reduce((sum, p) => sum + p.price * p.quantity, 0);
@@ -270,6 +261,9 @@ export default function OrderSummaryPage() {
 
         try {
             setIsSubmitting(true);
+            // The order is confirmed from the server's cart, so send any
+            // quantity change still waiting first.
+            await flushCartUpdates();
             const token = localStorage.getItem("jwt_access");
             const res = await fetch(`${getProductUrl()}/api/order/confirm/`, {
                 method: "POST",
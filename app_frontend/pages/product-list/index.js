@@ -20,11 +20,17 @@ export default function ProductListPage() {
     const [products, setProducts] = useState([]);
     const [selectedCategory, setSelectedCategory] = useState(initialCategory || null);
     const [searchTerm, setSearchTerm] = useState('');
+    const [debouncedTerm, setDebouncedTerm] = useState('');
+    const [nextUrl, setNextUrl] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [cartCount, setCartCount] = useState(0)
     const [userProvince, setUserProvince] = useState(undefined);
     const [isLoading, setIsLoading] = useState(true);
 
     const dropdownRef = useRef(null);
+    // Bumped for every new query, so a "load more" answer that arrives after
+    // the filters changed is dropped instead of appended.
+    const queryRef = useRef(0);
 
     const [isLoggedIn, setIsLoggedIn] = useState(false);
     useEffect(() => {
@@ -82,35 +88,71 @@ export default function ProductListPage() {
         { label: 'Other', icon: '/icons/other.png' },
     ];
 
+    useEffect(() => {
+        const timer = setTimeout(() => setDebouncedTerm(searchTerm.trim()), 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
+
+    // Category and search term are filtered by the server, which pages through
+    // every matching product; the browser only ever holds the pages loaded so far.
     useEffect(() => {
         if (userProvince === undefined) return;
+        const query = ++queryRef.current;
+        const controller = new AbortController();
         async function fetchProducts() {
+            setIsLoading(true);
             try {
-                let url = `${getProductUrl()}/api/product/all/`;
+                const params = new URLSearchParams({ available: 'true' });
                 if (isLoggedIn) {
                     if (!userProvince) {
                         setProducts([]);
-                        setIsLoading(false);
+                        setNextUrl(null);
                         return;
                     }
-                    url += `?province=${encodeURIComponent(userProvince)}`;
+                    params.set('province', userProvince);
                 }
-                const res = await fetch(url);
+                if (selectedCategory) params.set('category', selectedCategory);
+                if (debouncedTerm) params.set('q', debouncedTerm);
+                const res = await fetch(`${getProductUrl()}/api/product/all/?${params}`, {
+                    signal: controller.signal,
+                });
                 if (res.ok) {
                     const json = await res.json();
-                    const available = json.data.filter(item => item.available);
-                    setProducts(available);
+                    setProducts(json.data);
+                    setNextUrl(json.next);
                 } else {
                     console.error('Failed to load products', res.statusText);
                 }
             } catch (e) {
-                console.error('Error loading products', e);
+                if (e.name !== 'AbortError') console.error('Error loading products', e);
             } finally {
-                setIsLoading(false);
+                if (query === queryRef.current) setIsLoading(false);
             }
         }
         fetchProducts();
-    }, [userProvince, isLoggedIn]);
+        return () => controller.abort();
+    }, [userProvince, isLoggedIn, selectedCategory, debouncedTerm]);
+
+    async function loadMore() {
+        if (!nextUrl || isLoadingMore) return;
+        const query = queryRef.current;
+        setIsLoadingMore(true);
+        try {
+            const res = await fetch(nextUrl);
+            if (!res.ok) {
+                console.error('Failed to load more products', res.statusText);
+                return;
+            }
+            const json = await res.json();
+            if (query !== queryRef.current) return;
+            setProducts(prev => [...prev, ...json.data]);
+            setNextUrl(json.next);
+        } catch (e) {
+            console.error('Error loading more products', e);
+        } finally {
+            setIsLoadingMore(false);
+        }
+    }
 
     useEffect(() => {
         async function fetchAddress() {
@@ -149,14 +191,6 @@ export default function ProductListPage() {
         }
     }, [searchParams]);
 
-    const filteredProducts = products.filter(item => {
-        const matchesCategory = selectedCategory ? item.categories.includes(selectedCategory) : true;
-        const term = searchTerm.toLowerCase();
-        const nameMatch = item.name?.toLowerCase().includes(term);
-        const detailMatch = (item.detail ?? '').toLowerCase().includes(term);
-        return matchesCategory && (nameMatch || detailMatch);
-    });
-
     return (
         <div className="min-h-screen flex flex-col bg-cover bg-no-repeat" style={{ backgroundImage: "url('/images/bg.png')" }}>
             <header className="fixed top-0 w-full bg-[#fff8e1] shadow-md z-50">
@@ -262,9 +296,10 @@ export default function ProductListPage() {
                 <section className="md:w-3/4 w-full">
                     {isLoading ? (
                         <div className="text-center text-gray-500 mt-10">กำลังโหลดสินค้า...</div>
-                    ) : filteredProducts.length > 0 ? (
+                    ) : products.length > 0 ? (
+                        <>
                         <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-6">
-                            {filteredProducts.map((item, index) => {
+                            {products.map((item, index) => {
                                 const fileName = item.name.toLowerCase().trim() + '.jpg';
                                 return (
                                     <div
@@ -302,6 +337,18 @@ export default function ProductListPage() {
                                 );
                             })}
                         </div>
+                        {nextUrl && (
+                            <div className="flex justify-center mt-8">
+                                <button
+                                    onClick={loadMore}
+                                    disabled={isLoadingMore}
+                                    className="bg-[#f4d03f] hover:bg-[#e6c02f] disabled:opacity-60 text-[#8b4513] font-bold px-6 py-2 rounded-full transition-colors duration-200"
+                                >
+                                    {isLoadingMore ? 'กำลังโหลด...' : 'โหลดสินค้าเพิ่มเติม'}
+                                </button>
+                            </div>
+                        )}
+                        </>
                     ) : (
                         <div className="text-center text-gray-500 mt-10">ไม่พบสินค้าที่ตรงกับคำค้นหา หมวดหมู่ หรือสินค้าหมด</div>
                     )}
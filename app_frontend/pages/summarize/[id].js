@@ -2,7 +2,7 @@ import { useEffect, useState, useRef } from 'react';
 import { useRouter } from 'next/router';
 import Link from 'next/link';
 import Image from 'next/image';
-import { getUserUrl, getProductUrl } from '@/baseurl';
+import { getProductUrl } from '@/baseurl';
 
 function isTokenExpired(token) {
     try {
@@ -53,11 +53,11 @@ export default function SummarizePage() {
             const token = localStorage.getItem('jwt_access');
             if (!token) { setLoading(false); return; }
             try {
-                const res = await fetch(`${getProductUrl()}/api/order/${orderIdParam}/`, {
+                const res = await fetch(`${getProductUrl()}/api/order/${orderIdParam}/summary/`, {
                     headers: { Authorization: `Bearer ${token}` }
                 });
                 if (!res.ok) throw new Error('การดึงคำสั่งซื้อล้มเหลว');
-                const order = await res.json();
+                const { data: order } = await res.json();
 
                 setOrderId(order.id);
                 setOrderDate(new Date(order.create_at).toLocaleDateString('th-TH', {
@@ -72,18 +72,10 @@ export default function SummarizePage() {
                 }));
                 const shipping = parseFloat(order.shipping_fee);
                 const totalPrice = parseFloat(order.total_price);
-                let address = 'ไม่พบที่อยู่';
-
-                if (order.shipping_address) {
-                    const dataAddr = await fetch(
-                        `${getUserUrl()}/api/address/${order.shipping_address}/`,
-                        { headers: { Authorization: `Bearer ${token}` } }
-                    );
-                    if (dataAddr.ok) {
-                        const { data: addr } = await dataAddr.json();
-                        address = `${addr.receiver_name}, ${addr.house_number}, ${addr.district}, ${addr.province} ${addr.post_code}`;
-                    }
-                }
+                const addr = order.address;
+                const address = addr
+                    ? `${addr.receiver_name}, ${addr.house_number}, ${addr.district}, ${addr.province} ${addr.post_code}`
+                    : 'ไม่พบที่อยู่';
 
                 setOrderData({ cart, totalPrice, shipping, address, shippingMethod: order.shipping_method });
             } catch (err) {
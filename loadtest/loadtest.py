@@ -0,0 +1,326 @@
+"""
+Load generator for user_service and product_service.
+
+Each virtual user walks the shopper journey against running services:
+register, get a token, add an address, browse the catalog, open a product,
+add to cart, confirm the order and view the order history. Only the
+standard library is used, so it runs anywhere Python 3.11 does.
+
+Start both services against a local database that holds some available
+products and at least one shipping method, then run for example:
+
+    python loadtest/loadtest.py --users 20 --duration 60 --output results.json
+    python loadtest/loadtest.py --compare old.json new.json
+
+Results are printed as a table of throughput and p50/p95/p99 latency per
+endpoint, and written as JSON so runs from different releases can be
+compared.
+"""
+
+import argparse
+import http.client
+import json
+import platform
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+PERCENTILES = (50, 95, 99)
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.journeys = 0
+        self.failed_journeys = 0
+
+    def record(self, name, seconds, ok):
+        with self.lock:
+            self.samples[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+
+    def finish_journey(self, ok):
+        with self.lock:
+            self.journeys += 1
+            if not ok:
+                self.failed_journeys += 1
+
+
+class JourneyFailed(Exception):
+    pass
+
+
+class Service:
+    """A keep-alive HTTP connection to one service, owned by one thread."""
+
+    def __init__(self, base_url, recorder, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.recorder = recorder
+        self.timeout = timeout
+        self.connection = None
+
+    def request(self, name, method, path, body=None, token=None, expect=(200,)):
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        start = time.perf_counter()
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            if self.connection is not None:
+                self.connection.close()
+            self.connection = None
+            self.recorder.record(name, time.perf_counter() - start, ok=False)
+            raise JourneyFailed(f"{name}: connection error")
+
+        ok = status in expect
+        self.recorder.record(name, time.perf_counter() - start, ok=ok)
+        if not ok:
+            raise JourneyFailed(f"{name}: HTTP {status}")
+        return json.loads(payload) if payload else None
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+def journey(users, products, think_time):
+    username = f"load_{uuid.uuid4().hex[:12]}"
+    password = "LoadTest!2345"
+    users.request(
+        "POST /api/register/",
+        "POST",
+        "/api/register/",
+        {
+            "username": username,
+            "password": password,
+            "email": f"{username}@example.com",
+            "fullname": "Load Test",
+            "date_of_birth": "2000-01-01",
+            "sex": "M",
+            "tel": "0812345678",
+        },
+        expect=(201,),
+    )
+    token = users.request(
+        "POST /api/token/",
+        "POST",
+        "/api/token/",
+        {"username": username, "password": password},
+    )["access"]
+    address = users.request(
+        "POST /api/address/",
+        "POST",
+        "/api/address/",
+        {
+            "receiver_name": "Load Test",
+            "house_number": "1",
+            "district": "Khlong Luang",
+            "province": "Pathum Thani",
+            "post_code": "12120",
+            "is_default": True,
+        },
+        token=token,
+        expect=(201,),
+    )["data"]
+
+    catalog = products.request(
+        "GET /api/product/all/", "GET", "/api/product/all/?available=true"
+    )["data"]
+    if not catalog:
+        raise JourneyFailed("no available products to buy")
+    time.sleep(think_time)
+
+    product = random.choice(catalog)
+    products.request(
+        "GET /api/product/<id>/", "GET", f"/api/product/{product['id']}/"
+    )
+    products.request(
+        "POST /api/cart/add/",
+        "POST",
+        "/api/cart/add/",
+        {"product_id": product["id"], "quantity": 1},
+        token=token,
+        expect=(201,),
+    )
+    products.request("GET /api/cart/", "GET", "/api/cart/", token=token)
+    shipping = products.request(
+        "GET /api/shipping/", "GET", "/api/shipping/", token=token
+    )["data"]
+    if not shipping:
+        raise JourneyFailed("no shipping methods configured")
+    time.sleep(think_time)
+
+    products.request(
+        "POST /api/order/confirm/",
+        "POST",
+        "/api/order/confirm/",
+        {
+            "address_id": address["id"],
+            "shipping_id": shipping[0]["id"],
+            "payment_method": "cash_on_delivery",
+        },
+        token=token,
+        # Running out of stock is a valid outcome under load, not an error.
+        expect=(200, 400),
+    )
+    products.request("GET /api/history/", "GET", "/api/history/", token=token)
+
+
+def virtual_user(args, recorder, deadline, errors):
+    users = Service(args.user_url, recorder, args.timeout)
+    products = Service(args.product_url, recorder, args.timeout)
+    try:
+        while time.monotonic() < deadline:
+            try:
+                journey(users, products, args.think_time)
+            except JourneyFailed as e:
+                recorder.finish_journey(ok=False)
+                with recorder.lock:
+                    errors[str(e)] += 1
+            else:
+                recorder.finish_journey(ok=True)
+    finally:
+        users.close()
+        products.close()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for name, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": recorder.errors[name],
+            "throughput_rps": round(len(ordered) / elapsed, 2),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+            "max_ms": round(ordered[-1] * 1000, 2),
+            **{
+                f"p{pct}_ms": round(percentile(ordered, pct) * 1000, 2)
+                for pct in PERCENTILES
+            },
+        }
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "journeys": recorder.journeys,
+        "failed_journeys": recorder.failed_journeys,
+        "journeys_per_s": round(recorder.journeys / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def print_summary(summary):
+    columns = ("requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+    rows = [
+        (name, *(stats[column] for column in columns))
+        for name, stats in summary["endpoints"].items()
+    ]
+    headers = ("endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms")
+    widths = [max(len(str(v)) for v in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(str(v).ljust(w) for v, w in zip(row, widths)))
+    print(
+        f"\n{summary['journeys']} journeys ({summary['failed_journeys']} failed) "
+        f"in {summary['elapsed_s']}s, {summary['journeys_per_s']} journeys/s"
+    )
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)["summary"]["endpoints"]
+    with open(new_path) as f:
+        new = json.load(f)["summary"]["endpoints"]
+    print(f"{'endpoint':<28} {'p95 old':>9} {'p95 new':>9} {'change':>8}")
+    for name in sorted(set(old) | set(new)):
+        before = old.get(name, {}).get("p95_ms")
+        after = new.get(name, {}).get("p95_ms")
+        if before and after:
+            change = f"{(after - before) / before * 100:+.1f}%"
+        else:
+            change = "n/a"
+        print(f"{name:<28} {before or '-':>9} {after or '-':>9} {change:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-url", default="http://127.0.0.1:3342")
+    parser.add_argument("--product-url", default="http://127.0.0.1:3341")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run.")
+    parser.add_argument("--think-time", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files."
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    recorder = Recorder()
+    errors = defaultdict(int)
+    deadline = time.monotonic() + args.duration
+    threads = [
+        threading.Thread(target=virtual_user, args=(args, recorder, deadline, errors))
+        for _ in range(args.users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = summarize(recorder, time.perf_counter() - started)
+
+    print_summary(summary)
+    for message, count in sorted(errors.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count} x {message}")
+
+    if args.output:
+        result = {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "config": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+            "summary": summary,
+            "errors": dict(errors),
+        }
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
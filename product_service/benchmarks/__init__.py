@@ -0,0 +1,60 @@
+"""
+Benchmarks for product_service.
+
+Run from the product_service directory, e.g. ``python -m benchmarks.cart_totals``.
+Each benchmark creates and destroys its own test database through the
+configured DATABASES settings, so it never touches real data. The README's
+"Tests and benchmarks" section lists the settings and the environment the
+recorded figures came from.
+"""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def setup():
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "product_service.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat):
+    """Call ``func`` ``repeat`` times and return (mean ms, queries per call)."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    with CaptureQueriesContext(connection) as ctx:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings), len(ctx.captured_queries) / repeat
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column) for column in zip(headers, *rows)
+    ]
+    for row in [headers, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
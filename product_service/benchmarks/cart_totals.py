@@ -0,0 +1,72 @@
+"""
+Cost of a single cart line mutation as the cart grows.
+
+    python -m benchmarks.cart_totals
+"""
+
+from datetime import date
+
+from benchmarks import measure, print_table, setup, test_database
+
+CART_SIZES = (1, 10, 50, 200)
+REPEAT = 50
+
+
+def run():
+    from django.contrib.auth.models import User
+    from order_management.models import Order, ProductOrder
+    from product_management.models import Product
+
+    user = User.objects.create_user(username="bench", password="bench")
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {i}",
+            detail="",
+            price=10.0,
+            stock=10_000,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(max(CART_SIZES) + 1)
+    )
+    extra = products[-1]
+
+    rows = []
+    for size in CART_SIZES:
+        order = Order.objects.create(customer=user, status=Order.STATUS_CART)
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=product, quantity=1)
+            for product in products[:size]
+        )
+        line = ProductOrder.objects.select_related("order", "product").get(
+            order=order, product=products[0]
+        )
+
+        def update_line():
+            line.quantity = line.quantity % 5 + 1
+            line.save()
+
+        def add_and_remove_line():
+            ProductOrder.objects.create(order=order, product=extra, quantity=1).delete()
+
+        update_ms, update_queries = measure(update_line, REPEAT)
+        add_ms, add_queries = measure(add_and_remove_line, REPEAT)
+        rows.append(
+            (
+                size,
+                f"{update_ms:.2f}",
+                f"{update_queries:.0f}",
+                f"{add_ms:.2f}",
+                f"{add_queries:.0f}",
+            )
+        )
+
+    print_table(
+        ("cart lines", "update ms", "queries", "add+remove ms", "queries"), rows
+    )
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        run()
@@ -0,0 +1,124 @@
+"""
+Concurrent checkouts competing for the same products.
+
+    python -m benchmarks.checkout_contention [threads] [checkouts per thread]
+
+Every cart holds the same hot products in a different order, the pattern
+that deadlocks when rows are locked in cart order. The benchmark fails if
+more units are sold than were in stock or if any stock goes negative.
+Meaningful numbers need PostgreSQL. SQLite serializes all writers.
+"""
+
+import random
+import sys
+import threading
+import time
+from datetime import date
+
+from benchmarks import print_table, setup, test_database
+
+HOT_PRODUCTS = 5
+INITIAL_STOCK = 200
+
+
+def run(threads, checkouts_per_thread):
+    from django.contrib.auth.models import User
+    from django.db import DatabaseError, connection, transaction
+    from django.db.models import Sum
+    from order_management.models import Order, ProductOrder
+    from order_management.stock import InsufficientStock, reserve_stock
+    from product_management.models import Product
+
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Hot {i}",
+            detail="",
+            price=10.0,
+            stock=INITIAL_STOCK,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(HOT_PRODUCTS)
+    )
+    carts = []
+    for t in range(threads):
+        user = User.objects.create_user(username=f"bench{t}", password="bench")
+        for _ in range(checkouts_per_thread):
+            order = Order.objects.create(customer=user, status=Order.STATUS_CART)
+            lines = random.sample(products, len(products))
+            ProductOrder.objects.bulk_create(
+                ProductOrder(order=order, product=p, quantity=random.randint(1, 3))
+                for p in lines
+            )
+            carts.append(order)
+
+    results = {"confirmed": 0, "out_of_stock": 0, "errors": 0}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(threads)
+
+    def worker(orders):
+        start_barrier.wait()
+        try:
+            for order in orders:
+                try:
+                    with transaction.atomic():
+                        reserve_stock(order)
+                        Order.objects.filter(pk=order.pk).update(
+                            status=Order.STATUS_PENDING
+                        )
+                    outcome = "confirmed"
+                except InsufficientStock:
+                    outcome = "out_of_stock"
+                except DatabaseError:
+                    outcome = "errors"
+                with lock:
+                    results[outcome] += 1
+        finally:
+            connection.close()
+
+    chunks = [carts[i::threads] for i in range(threads)]
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+
+    sold = (
+        ProductOrder.objects.filter(order__status=Order.STATUS_PENDING)
+        .values("product")
+        .annotate(total=Sum("quantity"))
+    )
+    sold = {row["product"]: row["total"] for row in sold}
+    remaining = dict(Product.objects.values_list("pk", "stock"))
+    oversold = [
+        pk
+        for pk in remaining
+        if remaining[pk] < 0 or sold.get(pk, 0) + remaining[pk] != INITIAL_STOCK
+    ]
+
+    print_table(
+        ("threads", "attempts", "confirmed", "out of stock", "errors", "checkouts/s"),
+        [
+            (
+                threads,
+                len(carts),
+                results["confirmed"],
+                results["out_of_stock"],
+                results["errors"],
+                f"{results['confirmed'] / elapsed:.1f}",
+            )
+        ],
+    )
+    if oversold:
+        raise SystemExit(f"Stock mismatch for products {oversold}")
+    print("No overselling: sold + remaining == initial stock for every product.")
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    setup()
+    with test_database():
+        run(threads, per_thread)
@@ -0,0 +1,89 @@
+"""
+Requests per second with and without the database connection pool.
+
+    python -m benchmarks.db_pool [concurrency] [requests]
+
+Serves product_service under ASGI and requests product details with the
+response cache disabled, so every request runs its short queries. Under
+ASGI each request runs its ORM calls in a thread of its own: without the
+pool every request opens a new connection, with it they reuse a few.
+Needs PostgreSQL and the pooled backend (``product_service.db``).
+"""
+
+import sys
+from datetime import date
+
+from benchmarks import print_table, setup, test_database
+from benchmarks.servers import free_port, load, serve_asgi
+
+
+def run(concurrency, total):
+    from django.db import connection
+    from django.test import override_settings
+    from django.urls import reverse
+    from product_management.models import Product
+    from product_service.db.pool import close_pools, pool_stats
+    from product_service.metrics import registry
+
+    if not hasattr(connection, "pool"):
+        print("Needs the pooled PostgreSQL backend, ENGINE product_service.db.")
+        return
+
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {i}",
+            detail="",
+            price=10.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(20)
+    )
+    paths = [
+        reverse("product-detail", args=[products[i % len(products)].id])
+        for i in range(total)
+    ]
+
+    options = connection.settings_dict["OPTIONS"]
+    configured = options.get("pool")
+    rows = []
+    with override_settings(
+        ALLOWED_HOSTS=["*"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}},
+    ):
+        for name, pool in (("no pool", False), ("pool", configured or True)):
+            options["pool"] = pool
+            close_pools()
+            connects = registry.db_connects
+            created = sum(stats["created"] for _, stats in pool_stats())
+            port = free_port()
+            stop = serve_asgi(port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                load(base_url, paths[:5], 1)
+                rps, p50, p95, errors = load(base_url, paths, concurrency)
+            finally:
+                stop()
+            if pool:
+                opened = sum(stats["created"] for _, stats in pool_stats()) - created
+            else:
+                opened = registry.db_connects - connects
+            rows.append(
+                (name, f"{rps:.0f}", f"{p50:.1f}", f"{p95:.1f}", opened, errors)
+            )
+    options["pool"] = configured
+    close_pools()
+
+    print(f"{total} product detail requests, {concurrency} concurrent clients")
+    print_table(
+        ("connections", "req/s", "p50 ms", "p95 ms", "opened", "errors"), rows
+    )
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    setup()
+    with test_database():
+        run(concurrency, total)
@@ -0,0 +1,77 @@
+"""
+Per-request cost of authenticating GET /api/cart/.
+
+    python -m benchmarks.jwt_auth
+
+Compares simplejwt's JWTAuthentication, which loads auth_user on every
+request, with ClaimsJWTAuthentication, which builds the user from the
+token's username and email claims.
+"""
+
+from datetime import date
+
+from benchmarks import measure, print_table, setup, test_database
+
+REPEAT = 200
+
+
+def run():
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    from order_management.models import Order, ProductOrder
+    from order_management.views import CartOrderView
+    from product_management.models import Product
+    from product_service.authentication import ClaimsJWTAuthentication
+
+    user = User.objects.create_user(
+        username="bench", password="bench", email="bench@example.com"
+    )
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {i}",
+            detail="",
+            price=10.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(5)
+    )
+    order = Order.objects.create(customer=user, status=Order.STATUS_CART)
+    ProductOrder.objects.bulk_create(
+        ProductOrder(order=order, product=product, quantity=1) for product in products
+    )
+
+    token = AccessToken.for_user(user)
+    token["username"] = user.username
+    token["email"] = user.email
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    url = reverse("cart-orders")
+
+    def get_cart():
+        assert client.get(url).status_code == 200
+
+    original = CartOrderView.authentication_classes
+    rows = []
+    try:
+        for auth_class in (JWTAuthentication, ClaimsJWTAuthentication):
+            CartOrderView.authentication_classes = [auth_class]
+            cache.clear()
+            get_cart()
+            ms, queries = measure(get_cart, REPEAT)
+            rows.append((auth_class.__name__, f"{ms:.2f}", f"{queries:.0f}"))
+    finally:
+        CartOrderView.authentication_classes = original
+
+    print_table(("authentication", "ms/request", "queries"), rows)
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        run()
@@ -0,0 +1,95 @@
+"""
+Memory and time to serve a long order history.
+
+    python -m benchmarks.order_history [orders]
+
+Compares building the whole history as one response, which is what
+/api/history/ used to do, with reading one cursor page and with streaming
+every order through ``iter_history_json``. Peak memory is measured with
+tracemalloc and covers the Python objects built while answering.
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+from benchmarks import print_table, setup, test_database
+
+ITEMS_PER_ORDER = 3
+
+
+def peak(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak_bytes / 1024 / 1024
+
+
+def run(total):
+    from django.contrib.auth.models import User
+    from rest_framework.renderers import JSONRenderer
+    from order_management.history import ORDERING, iter_history_json
+    from order_management.models import Order, ProductOrder
+    from order_management.serializers import OrderHistorySerializer
+    from product_management.models import Product
+
+    user = User.objects.create_user(username="bench", password="bench")
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {i}",
+            detail="",
+            price=10.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(ITEMS_PER_ORDER)
+    )
+    orders = Order.objects.bulk_create(
+        Order(customer=user, status=Order.STATUS_PAID) for _ in range(total)
+    )
+    ProductOrder.objects.bulk_create(
+        ProductOrder(order=order, product=product, quantity=1)
+        for order in orders
+        for product in products
+    )
+    history = Order.objects.filter(customer=user)
+
+    def everything():
+        data = OrderHistorySerializer(
+            history.with_items().order_by(*ORDERING), many=True
+        ).data
+        JSONRenderer().render({"orders": data})
+
+    def one_page():
+        page = history.with_items().order_by(*ORDERING)[:20]
+        JSONRenderer().render(
+            {"orders": OrderHistorySerializer(page, many=True).data}
+        )
+
+    def stream():
+        for _ in iter_history_json(history, 100):
+            pass
+
+    rows = []
+    for name, func in (
+        ("one response", everything),
+        ("one page of 20", one_page),
+        ("stream, 100 per chunk", stream),
+    ):
+        elapsed, peak_mb = peak(func)
+        rows.append((name, f"{elapsed:.0f}", f"{peak_mb:.1f}"))
+
+    print(f"{total} orders of {ITEMS_PER_ORDER} items")
+    print_table(("history", "ms", "peak MiB"), rows)
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    setup()
+    with test_database():
+        run(total)
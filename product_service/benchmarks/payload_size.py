@@ -0,0 +1,92 @@
+"""
+Bytes on the wire and time per request for sparse fieldsets and compression.
+
+    python -m benchmarks.payload_size
+
+Requests a page of 100 products and a page of 100 orders through the test
+client, so the whole middleware stack runs, with every field and with a
+``fields=`` or ``exclude=`` fieldset, each uncompressed, with gzip and with
+brotli. The catalog cache is cleared before every request, so each one
+reads and serializes its page.
+"""
+
+from datetime import date
+
+from benchmarks import measure, print_table, setup, test_database
+
+PAGE_SIZE = 100
+ITEMS_PER_ORDER = 3
+REPEAT = 20
+ENCODINGS = (("identity", ""), ("gzip", "gzip"), ("br", "gzip, br"))
+
+
+def run():
+    from django.contrib.auth.models import User
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+    from order_management.models import Order, ProductOrder
+    from product_management.models import Category, Product
+
+    categories = Category.objects.bulk_create(
+        Category(name=f"Category {i}") for i in range(5)
+    )
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Product {i}",
+            # The catalog's descriptions run up to detail's 500 characters.
+            detail=f"Product {i} is fresh, locally made and packed by hand. " * 6,
+            price=10 + i % 90 + 0.25,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+            address="Bangkok",
+        )
+        for i in range(PAGE_SIZE)
+    )
+    through = Product.categories.through
+    through.objects.bulk_create(
+        through(product_id=product.id, category_id=categories[i % 5].id)
+        for i, product in enumerate(products)
+    )
+    user = User.objects.create_user(username="bench", password="bench")
+    orders = Order.objects.bulk_create(
+        Order(customer=user, status=Order.STATUS_SHIPPED) for _ in range(PAGE_SIZE)
+    )
+    ProductOrder.objects.bulk_create(
+        ProductOrder(order=order, product=product, quantity=1)
+        for order in orders
+        for product in products[:ITEMS_PER_ORDER]
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    cases = (
+        ("product list", "/api/product/all/", ""),
+        ("product list", "/api/product/all/", "fields=id,name,price"),
+        ("order history", "/api/history/", ""),
+        ("order history", "/api/history/", "exclude=items"),
+    )
+
+    rows = []
+    for name, path, fieldset in cases:
+        url = f"{path}?page_size={PAGE_SIZE}&{fieldset}"
+        for encoding, accept in ENCODINGS:
+
+            def request():
+                cache.clear()
+                return client.get(url, HTTP_ACCEPT_ENCODING=accept)
+
+            size = len(request().content)
+            ms, _ = measure(request, REPEAT)
+            rows.append(
+                (name, fieldset or "all", encoding, f"{size:,}", f"{ms:.1f}")
+            )
+
+    print(f"pages of {PAGE_SIZE}, orders of {ITEMS_PER_ORDER} items")
+    print_table(("endpoint", "fields", "encoding", "bytes", "ms"), rows)
+
+
+if __name__ == "__main__":
+    setup()
+    with test_database():
+        run()
@@ -0,0 +1,90 @@
+"""
+Rows per second importing a catalog.
+
+    python -m benchmarks.product_import [rows]
+
+Loads the same generated catalog three ways: one ``Product.save()`` per
+row with its categories added one at a time, which is what the admin
+amounts to, ``import_products`` with ``bulk_create``/``bulk_update``, and
+``import_products`` with ``COPY`` on PostgreSQL. Each run starts from an
+empty catalog and then imports the file a second time, so the upsert path
+is timed as well.
+"""
+
+import sys
+import time
+from datetime import date
+
+from benchmarks import print_table, setup, test_database
+
+CATEGORIES = 20
+
+
+def records(total):
+    for i in range(total):
+        yield i + 2, {
+            "name": f"Product {i}",
+            "detail": "Imported",
+            "price": str(10 + i % 90),
+            "stock": str(i % 7),
+            "production_date": "2025-01-01",
+            "expiration_date": "2026-01-01",
+            "address": f"Province {i % 77}",
+            "categories": f"Category {i % CATEGORIES}|Category {(i + 1) % CATEGORIES}",
+        }
+
+
+def run(total):
+    from django.db import connection, transaction
+    from product_management.bulk import import_products
+    from product_management.models import Category, Product
+
+    def one_at_a_time():
+        with transaction.atomic():
+            for _, record in records(total):
+                product, _ = Product.objects.update_or_create(
+                    name=record["name"],
+                    defaults={
+                        "detail": record["detail"],
+                        "price": float(record["price"]),
+                        "stock": int(record["stock"]),
+                        "production_date": date(2025, 1, 1),
+                        "expiration_date": date(2026, 1, 1),
+                        "address": record["address"],
+                    },
+                )
+                product.categories.set(
+                    Category.objects.get_or_create(name=name)[0]
+                    for name in record["categories"].split("|")
+                )
+
+    ways = [
+        ("save() per row", one_at_a_time),
+        (
+            "bulk_create/bulk_update",
+            lambda: import_products(records(total), use_copy=False),
+        ),
+    ]
+    if connection.vendor == "postgresql":
+        ways.append(("COPY", lambda: import_products(records(total), use_copy=True)))
+
+    rows = []
+    for name, load in ways:
+        Product.objects.all().delete()
+        Category.objects.all().delete()
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            load()
+            timings.append(time.perf_counter() - start)
+        rows.append((name, *(f"{total / elapsed:.0f}" for elapsed in timings)))
+
+    print(f"{total} products, {CATEGORIES} categories")
+    print_table(("import", "insert rows/s", "upsert rows/s"), rows)
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    setup()
+    with test_database():
+        run(total)
@@ -0,0 +1,88 @@
+"""
+Rows per second turning catalog products into a JSON response body.
+
+    python -m benchmarks.product_serialization [products]
+
+Compares ``ProductSerializer`` with its categories prefetched, rendered by
+DRF's ``JSONRenderer``, which is what /api/product/all/ used to do, with
+``product_rows``/``represent_rows`` rendered by ``ORJSONRenderer``. Both
+read pages of 100 products, the largest page the catalog serves, and the
+timings include the queries.
+"""
+
+import sys
+from datetime import date
+
+from benchmarks import measure, print_table, setup, test_database
+
+CATEGORIES = 20
+CATEGORIES_PER_PRODUCT = 3
+PAGE_SIZE = 100
+
+
+def run(total):
+    from rest_framework.renderers import JSONRenderer
+    from product_management.models import Category, Product
+    from product_management.rows import product_rows, represent_rows
+    from product_management.serializers import ProductSerializer
+    from product_service.renderers import ORJSONRenderer
+
+    categories = Category.objects.bulk_create(
+        Category(name=f"Category {i}") for i in range(CATEGORIES)
+    )
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Product {i}",
+            detail="A product description of a typical length for the catalog.",
+            price=10 + i % 90 + 0.25,
+            stock=i % 7,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+            address="Bangkok",
+        )
+        for i in range(total)
+    )
+    through = Product.categories.through
+    through.objects.bulk_create(
+        through(product_id=product.id, category_id=categories[(i + j) % CATEGORIES].id)
+        for i, product in enumerate(products)
+        for j in range(CATEGORIES_PER_PRODUCT)
+    )
+    pages = [
+        Product.objects.filter(id__gte=product.id).order_by("id")[:PAGE_SIZE]
+        for product in products[::PAGE_SIZE]
+    ]
+
+    def serializer():
+        for page in pages:
+            data = ProductSerializer(page.prefetch_related("categories"), many=True)
+            JSONRenderer().render({"data": data.data})
+
+    def rows():
+        for page in pages:
+            ORJSONRenderer().render({"data": represent_rows(product_rows(page))})
+
+    table = []
+    for name, func in (
+        ("ProductSerializer + JSONRenderer", serializer),
+        ("represent_rows + ORJSONRenderer", rows),
+    ):
+        ms, queries = measure(func, 3)
+        table.append(
+            (
+                name,
+                f"{ms:.0f}",
+                f"{total / ms * 1000:,.0f}",
+                f"{queries / len(pages):.0f}",
+            )
+        )
+
+    print(f"{total} products, {CATEGORIES_PER_PRODUCT} categories each")
+    print_table(("path", "ms", "rows/s", "queries/page"), table)
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    setup()
+    with test_database():
+        run(total)
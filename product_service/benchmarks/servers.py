@@ -0,0 +1,107 @@
+"""
+In-process HTTP servers and a load generator for the benchmarks.
+
+``serve_wsgi`` and ``serve_asgi`` start product_service on a local port in a
+background thread and return a function that stops it. ``load`` requests a
+list of paths from concurrent client threads.
+"""
+
+import socket
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class PooledWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI server that handles requests on a fixed pool of threads."""
+
+    daemon_threads = True
+
+    def __init__(self, *args, workers, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_wsgi(port, workers):
+    from django.core.wsgi import get_wsgi_application
+
+    server = make_server(
+        "127.0.0.1",
+        port,
+        get_wsgi_application(),
+        server_class=lambda *args, **kwargs: PooledWSGIServer(
+            *args, workers=workers, **kwargs
+        ),
+        handler_class=QuietHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def serve_asgi(port):
+    import uvicorn
+    from django.core.asgi import get_asgi_application
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            get_asgi_application(),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            lifespan="off",
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+
+    return stop
+
+
+def load(base_url, paths, concurrency, authorization=None):
+    """Return (requests/s, p50 ms, p95 ms, failed requests)."""
+
+    def get(path):
+        headers = {"Authorization": authorization} if authorization else {}
+        request = urllib.request.Request(base_url + path, headers=headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as resp:
+                resp.read()
+                ok = resp.status == 200
+        except OSError:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(get, paths))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in results)
+    return (
+        len(results) / elapsed,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        sum(1 for _, ok in results if not ok),
+    )
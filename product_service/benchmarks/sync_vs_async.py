@@ -0,0 +1,128 @@
+"""
+Thread-per-request WSGI against a single ASGI event loop.
+
+    python -m benchmarks.sync_vs_async [concurrency] [requests]
+
+Both servers run in this process on the same throwaway database. The WSGI
+server has a fixed pool of worker threads, like a sync gunicorn worker. The
+ASGI server is one uvicorn event loop. Clients mix catalog reads, order
+history and order summaries. A summary makes two lookups against a local
+stand-in for user_service that answers after USER_SERVICE_LATENCY seconds.
+The lookup cache is disabled so every summary waits on it.
+"""
+
+import json
+import sys
+import threading
+import time
+from datetime import date
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import print_table, setup, test_database
+from benchmarks.servers import free_port, load, serve_asgi, serve_wsgi
+
+WSGI_WORKERS = 4
+USER_SERVICE_LATENCY = 0.05
+ORDERS = 20
+
+
+class SlowUserService(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(USER_SERVICE_LATENCY)
+        body = json.dumps({"data": {"id": 1, "path": self.path}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class UserServiceServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+def run(concurrency, total):
+    from django.contrib.auth.models import User
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+    from order_management.models import Order, ProductOrder
+    from product_management.models import Product
+
+    user = User.objects.create_user(username="bench", password="bench")
+    products = Product.objects.bulk_create(
+        Product(
+            name=f"Bench {i}",
+            detail="",
+            price=10.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        for i in range(50)
+    )
+    orders = []
+    for _ in range(ORDERS):
+        order = Order.objects.create(
+            customer=user, shipping_address_id=1, user_payment_method_id=1
+        )
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=product, quantity=1)
+            for product in products[:5]
+        )
+        orders.append(order)
+
+    token = AccessToken.for_user(user)
+    token["username"] = user.username
+    authorization = f"Bearer {token}"
+
+    mix = ["/api/product/all/", "/api/history/"] + [
+        f"/api/order/{order.id}/summary/" for order in orders[:2]
+    ]
+    paths = [mix[i % len(mix)] for i in range(total)]
+
+    user_service = UserServiceServer(("127.0.0.1", free_port()), SlowUserService)
+    threading.Thread(target=user_service.serve_forever, daemon=True).start()
+
+    rows = []
+    with override_settings(
+        ALLOWED_HOSTS=["*"],
+        USER_SERVICE_URL=f"http://127.0.0.1:{user_service.server_port}",
+        USER_SERVICE_CACHE_TIMEOUT=0,
+    ):
+        for name, serve in (
+            (
+                f"WSGI, {WSGI_WORKERS} threads",
+                partial(serve_wsgi, workers=WSGI_WORKERS),
+            ),
+            ("ASGI, 1 event loop", serve_asgi),
+        ):
+            port = free_port()
+            stop = serve(port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                load(base_url, mix, 1, authorization)
+                rps, p50, p95, errors = load(
+                    base_url, paths, concurrency, authorization
+                )
+            finally:
+                stop()
+            rows.append((name, f"{rps:.0f}", f"{p50:.1f}", f"{p95:.1f}", errors))
+    user_service.shutdown()
+
+    print(
+        f"{total} requests, {concurrency} concurrent clients, "
+        f"user_service latency {USER_SERVICE_LATENCY * 1000:.0f} ms"
+    )
+    print_table(("server", "req/s", "p50 ms", "p95 ms", "errors"), rows)
+
+
+if __name__ == "__main__":
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    setup()
+    with test_database():
+        run(concurrency, total)
@@ -12,3 +12,4 @@ class OrderAdmin(admin.ModelAdmin):
 admin.site.register(Shipping)
 admin.site.register(ProductOrder)
 admin.site.register(Payment)
+admin.site.register(OutboxEmail)
@@ -0,0 +1,92 @@
+"""
+Moving old shipped orders out of the hot order tables.
+
+Every order a customer ever placed stays in ``Order`` and its lines in
+``ProductOrder``, which carts, checkout and the history all query.
+``archive_orders`` moves shipped orders older than a cutoff, with their
+lines and payment, into ``ArchivedOrder``, ``ArchivedProductOrder`` and
+``ArchivedPayment``. Rows keep their ids and column names, so each batch
+is one ``INSERT ... SELECT`` and one ``DELETE`` per table, and the order
+serializers read archived rows as they read live ones.
+
+The history and order detail endpoints read both tables, see
+order_management.history.
+"""
+
+from django.db import connection, transaction
+from django.utils import timezone
+from order_management.models import (
+    ArchivedOrder,
+    ArchivedPayment,
+    ArchivedProductOrder,
+    Order,
+    Payment,
+    ProductOrder,
+    StockReservation,
+)
+from order_management.stock import release_holds
+
+# (live model, archive model, column holding the order id), parents first.
+TABLES = (
+    (Order, ArchivedOrder, "id"),
+    (ProductOrder, ArchivedProductOrder, "order_id"),
+    (Payment, ArchivedPayment, "order_id"),
+)
+
+
+def archive_orders(before, batch_size=1000):
+    """
+    Move the shipped orders created before ``before`` into the archive,
+    ``batch_size`` orders per transaction, oldest first. Returns how many
+    were moved.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                Order.objects.select_for_update(skip_locked=True)
+                .filter(status=Order.STATUS_SHIPPED, create_at__lt=before)
+                .order_by("create_at", "id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            _move(ids)
+        total += len(ids)
+
+
+def _move(order_ids):
+    placeholders = ", ".join(["%s"] * len(order_ids))
+    quote = connection.ops.quote_name
+    # Shipped orders hold no stock, but a stray hold would block the delete.
+    # Locked holds are waited for rather than skipped, or the DELETE of the
+    # order rows would fail on the holds still pointing at them.
+    release_holds(
+        StockReservation.objects.filter(order__in=order_ids), skip_locked=False
+    )
+    with connection.cursor() as cursor:
+        for live, archive, key in TABLES:
+            columns = ", ".join(
+                quote(field.column) for field in live._meta.concrete_fields
+            )
+            extra_columns = extra_values = ""
+            params = list(order_ids)
+            if archive is ArchivedOrder:
+                extra_columns, extra_values = ", archived_at", ", %s"
+                params.insert(
+                    0, connection.ops.adapt_datetimefield_value(timezone.now())
+                )
+            cursor.execute(
+                f"INSERT INTO {quote(archive._meta.db_table)} "
+                f"({columns}{extra_columns}) "
+                f"SELECT {columns}{extra_values} FROM {quote(live._meta.db_table)} "
+                f"WHERE {key} IN ({placeholders})",
+                params,
+            )
+        # Children first, so no foreign key is left dangling.
+        for live, _, key in reversed(TABLES):
+            cursor.execute(
+                f"DELETE FROM {quote(live._meta.db_table)} "
+                f"WHERE {key} IN ({placeholders})",
+                order_ids,
+            )
@@ -0,0 +1,132 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from order_management.models import Order, ProductOrder, deferred_order_totals
+from order_management.stock import InsufficientStock, hold_stock, holds_enabled
+from product_management.models import Product
+
+
+class CartError(ValueError):
+    pass
+
+
+def get_cart(user):
+    """
+    Return the user's cart, creating it if needed.
+
+    ``unique_cart_per_customer`` makes a concurrent create fail, and
+    ``get_or_create`` then returns the cart the other request made.
+    """
+    cart, _ = Order.objects.get_or_create(
+        customer=user,
+        status=Order.STATUS_CART,
+        defaults={"shipping": None, "total_price": 0},
+    )
+    return cart
+
+
+def _not_enough_stock(product):
+    return CartError(f"Not enough stock (available {product.available_stock})")
+
+
+def _increment(cart, product, quantity, limit):
+    # One UPDATE that both checks the stock and adds the quantity, so two
+    # concurrent clicks cannot both pass the check and lose an increment.
+    lines = ProductOrder.objects.filter(order=cart, product=product)
+    if limit is not None:
+        lines = lines.filter(quantity__lte=limit - quantity)
+    return lines.update(quantity=F("quantity") + quantity)
+
+
+def add_to_cart(cart, product, quantity):
+    """Add ``quantity`` of ``product`` to ``cart`` and return the cart line."""
+    if quantity < 1:
+        raise CartError("Quantity must be at least 1.")
+
+    held = holds_enabled()
+    # With stock holds, the hold taken below checks the stock instead.
+    limit = None if held else product.available_stock
+    with transaction.atomic():
+        if _increment(cart, product, quantity, limit):
+            Order.objects.filter(pk=cart.pk).update_totals()
+        elif limit is not None and quantity > limit:
+            raise _not_enough_stock(product)
+        else:
+            try:
+                with transaction.atomic():
+                    ProductOrder.objects.create(
+                        order=cart, product=product, quantity=quantity
+                    )
+            except IntegrityError:
+                # The line already exists, either from before with too much in
+                # it, or just created by a concurrent request: increment it.
+                if not _increment(cart, product, quantity, limit):
+                    raise _not_enough_stock(product)
+                Order.objects.filter(pk=cart.pk).update_totals()
+
+        line = ProductOrder.objects.select_related("product").get(
+            order=cart, product=product
+        )
+        if held:
+            try:
+                hold_stock(cart, {product.pk: line.quantity})
+            except InsufficientStock as e:
+                raise CartError(f"Not enough stock (available {e.available})")
+    return line
+
+
+def set_cart_quantities(cart, quantities):
+    """
+    Set the quantity of several cart lines in one transaction.
+
+    ``quantities`` maps product ids to the new quantity, where 0 removes the
+    line. Nothing is changed if any product is missing or short of stock.
+    """
+    held = holds_enabled()
+    with transaction.atomic():
+        # Serialize concurrent edits of the same cart.
+        Order.objects.select_for_update().filter(pk=cart.pk).exists()
+
+        products = Product.objects.in_bulk(quantities)
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if product is None:
+                raise CartError(f"Product {product_id} not found")
+            # With stock holds, hold_stock below checks the stock instead.
+            if not held and quantity > product.available_stock:
+                raise CartError(
+                    f"Not enough stock for {product.name} "
+                    f"(available {product.available_stock})"
+                )
+
+        lines = {
+            line.product_id: line
+            for line in ProductOrder.objects.filter(order=cart, product__in=products)
+        }
+        removed, changed, added = [], [], []
+        for product_id, quantity in quantities.items():
+            line = lines.get(product_id)
+            if quantity == 0:
+                if line is not None:
+                    removed.append(line.pk)
+            elif line is None:
+                added.append(
+                    ProductOrder(order=cart, product_id=product_id, quantity=quantity)
+                )
+            elif line.quantity != quantity:
+                line.quantity = quantity
+                changed.append(line)
+
+        with deferred_order_totals():
+            ProductOrder.objects.filter(pk__in=removed).delete()
+            ProductOrder.objects.bulk_update(changed, ["quantity"])
+            ProductOrder.objects.bulk_create(added)
+            # Bulk writes skip the post_save receiver, so recompute here.
+            Order.objects.filter(pk=cart.pk).update_totals()
+
+        if held:
+            try:
+                hold_stock(cart, quantities)
+            except InsufficientStock as e:
+                raise CartError(
+                    f"Not enough stock for {e.product.name} (available {e.available})"
+                )
@@ -0,0 +1,186 @@
+"""
+A customer's order history, newest first.
+
+``/api/history/`` answers one page at a time through
+``OrderHistoryPagination``. Clients that want everything at once can ask
+for ``?stream=true`` instead: ``iter_history_json`` writes the same JSON a
+chunk of orders at a time, so memory stays flat however long the history.
+
+Both read ``order_history``, which covers the live ``Order`` table and the
+orders ``manage.py archive_orders`` moved to ``ArchivedOrder``.
+"""
+
+import heapq
+from itertools import islice
+from operator import attrgetter
+
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from order_management.models import ArchivedOrder, Order
+from order_management.serializers import OrderHistorySerializer
+from product_service.sparse import only_columns
+
+ORDERING = ("-create_at", "-id")
+STATUSES = {value for value, _ in Order.STATUS_CHOICES}
+
+
+class OrderHistoryPagination(CursorPagination):
+    """
+    Keyset pagination over ``(create_at, id)``.
+
+    Each page is read with ``WHERE create_at < <cursor> LIMIT page_size``
+    on order_customer_created_idx, so a page costs the same however deep
+    into the history it is. ``id`` breaks ties between orders created in
+    the same instant.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ORDERING
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "orders": data,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+            }
+        )
+
+
+class CombinedHistory:
+    """
+    Live and archived orders read as one queryset, as far as
+    ``OrderHistoryPagination`` and ``iter_history_json`` need one.
+
+    ``filter``, ``only``, ``order_by`` and ``with_items`` apply to both
+    querysets.
+    Slicing reads up to the end of the slice from each table, on its own
+    (customer, create_at, id) index, and merges the two in order, so a
+    page costs one keyset query per table however long the history.
+    """
+
+    def __init__(self, *querysets, ordering=ORDERING):
+        self.querysets = querysets
+        self.ordering = ordering
+
+    def _chain(self, method, *args, **kwargs):
+        return CombinedHistory(
+            *(getattr(qs, method)(*args, **kwargs) for qs in self.querysets),
+            ordering=self.ordering,
+        )
+
+    def filter(self, *args, **kwargs):
+        return self._chain("filter", *args, **kwargs)
+
+    def only(self, *fields):
+        return self._chain("only", *fields)
+
+    def with_items(self):
+        return self._chain("with_items")
+
+    def order_by(self, *ordering):
+        history = self._chain("order_by", *ordering)
+        history.ordering = ordering
+        return history
+
+    def _merge(self, iterables):
+        return heapq.merge(
+            *iterables,
+            key=attrgetter(*(name.lstrip("-") for name in self.ordering)),
+            reverse=self.ordering[0].startswith("-"),
+        )
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError("CombinedHistory only supports slicing.")
+        parts = [qs[: index.stop] for qs in self.querysets]
+        return list(islice(self._merge(parts), index.start, index.stop))
+
+    def iterator(self, chunk_size):
+        iterators = [qs.iterator(chunk_size) for qs in self.querysets]
+        try:
+            yield from self._merge(iterators)
+        finally:
+            for iterator in iterators:
+                iterator.close()
+
+
+def order_history(user):
+    """Every order of ``user``, live or archived."""
+    return CombinedHistory(
+        Order.objects.filter(customer=user),
+        ArchivedOrder.objects.filter(customer=user),
+    )
+
+
+def filter_history(queryset, params):
+    """
+    Apply the ``status`` query parameter to an ``Order`` queryset or a
+    ``CombinedHistory``. It may be repeated or comma separated. Raises
+    ``ValueError`` with a user facing message for an unknown status.
+    """
+    statuses = {
+        status.strip()
+        for value in params.getlist("status")
+        for status in value.split(",")
+        if status.strip()
+    }
+    unknown = statuses - STATUSES
+    if unknown:
+        raise ValueError(f"Unknown status: {', '.join(sorted(unknown))}.")
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    return queryset
+
+
+def select_fields(queryset, fields):
+    """
+    Narrow an ``Order`` queryset or a ``CombinedHistory`` to the columns
+    ``OrderHistorySerializer`` reads for ``fields``, loading the items only
+    when they are sent.
+    """
+    serializer = OrderHistorySerializer(fields=fields)
+    columns = only_columns(serializer, *(name.lstrip("-") for name in ORDERING))
+    if "items" in serializer.fields:
+        # with_items() joins the shipping row, which only() has to keep.
+        return queryset.with_items().only(*columns, "shipping")
+    return queryset.only(*columns)
+
+
+def iter_history_json(queryset, chunk_size, fields=None):
+    """
+    Yield ``{"orders": [...]}`` for ``queryset`` in pieces of
+    ``chunk_size`` orders, limited to ``fields`` if given. Orders are read
+    with ``iterator()``, which uses a server-side cursor on PostgreSQL, and
+    each chunk's items are prefetched as it is read.
+    """
+    orders = select_fields(queryset, fields).order_by(*ORDERING).iterator(chunk_size)
+    renderer = JSONRenderer()
+    yield b'{"orders":['
+    separator = b""
+    while chunk := list(islice(orders, chunk_size)):
+        data = OrderHistorySerializer(chunk, many=True, fields=fields).data
+        # Render the chunk as a list and drop its brackets.
+        yield separator + renderer.render(data)[1:-1]
+        separator = b","
+    yield b"]}"
+
+
+async def aiterate(iterator):
+    """
+    Serve a sync iterator to an ASGI response one item at a time.
+
+    Django reads a sync iterator into memory before streaming it under
+    ASGI. Each step here runs in the request's ORM thread instead, so a
+    server-side cursor stays on the connection that opened it.
+    """
+    step = sync_to_async(next)
+    try:
+        while (item := await step(iterator, None)) is not None:
+            yield item
+    finally:
+        await sync_to_async(iterator.close)()
@@ -0,0 +1,36 @@
+import calendar
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from order_management.archive import archive_orders
+
+
+def months_ago(moment, months):
+    year, month = divmod(moment.year * 12 + moment.month - 1 - months, 12)
+    day = min(moment.day, calendar.monthrange(year, month + 1)[1])
+    return moment.replace(year=year, month=month + 1, day=day)
+
+
+class Command(BaseCommand):
+    help = "Move shipped orders older than --months into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=6,
+            help="Archive shipped orders created at least this many months ago.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["months"] < 0 or options["batch_size"] < 1:
+            raise CommandError("--months must be >= 0 and --batch-size >= 1.")
+        before = months_ago(timezone.now(), options["months"])
+        start = time.perf_counter()
+        moved = archive_orders(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            f"archived {moved} orders created before {before:%Y-%m-%d} "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
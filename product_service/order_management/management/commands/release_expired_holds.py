@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from order_management.stock import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Release cart stock holds that are past their expiry."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30.0,
+            help="Seconds to sleep between sweeps.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Release the expired holds and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired_holds(batch_size=options["batch_size"])
+            if released:
+                self.stdout.write(f"released {released} holds")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from order_management.outbox import send_pending_emails
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the outbox is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the due emails and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending_emails(
+                batch_size=options["batch_size"],
+                max_attempts=options["max_attempts"],
+            )
+            if sent or failed:
+                self.stdout.write(f"sent {sent}, failed {failed}")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
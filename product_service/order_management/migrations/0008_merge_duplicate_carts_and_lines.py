@@ -0,0 +1,54 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:59
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def merge_duplicates(apps, schema_editor):
+    """Fold duplicate carts and order lines together so the constraints apply."""
+    Order = apps.get_model("order_management", "Order")
+    ProductOrder = apps.get_model("order_management", "ProductOrder")
+    touched = set()
+
+    customers = (
+        Order.objects.filter(status="cart")
+        .values("customer")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("customer", flat=True)
+    )
+    for customer_id in customers:
+        keep, *extra = Order.objects.filter(customer_id=customer_id, status="cart").order_by("pk")
+        ProductOrder.objects.filter(order__in=extra).update(order=keep)
+        Order.objects.filter(pk__in=[o.pk for o in extra]).delete()
+        touched.add(keep.pk)
+
+    duplicates = (
+        ProductOrder.objects.values("order", "product")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        keep, *extra = ProductOrder.objects.filter(
+            order_id=row["order"], product_id=row["product"]
+        ).order_by("pk")
+        keep.quantity += sum(line.quantity for line in extra)
+        keep.save(update_fields=["quantity"])
+        ProductOrder.objects.filter(pk__in=[line.pk for line in extra]).delete()
+        touched.add(row["order"])
+
+    for order in Order.objects.filter(pk__in=touched):
+        lines = ProductOrder.objects.filter(order=order).select_related("product")
+        order.total_price = sum(line.quantity * line.product.price for line in lines)
+        order.save(update_fields=["total_price"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("order_management", "0007_outboxemail"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0008_merge_duplicate_carts_and_lines'),
+        ('product_management', '0005_product_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cart')), fields=('customer',), name='unique_cart_per_customer'),
+        ),
+        migrations.AddConstraint(
+            model_name='productorder',
+            constraint=models.UniqueConstraint(fields=('order', 'product'), name='unique_product_per_order'),
+        ),
+    ]
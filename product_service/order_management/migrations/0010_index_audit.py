@@ -0,0 +1,32 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0009_unique_cart_and_order_line'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # Build the composite index before dropping the single-column ones it
+    # and unique_product_per_order make redundant.
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'status'], name='order_customer_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(db_index=False, default=1, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='productorder',
+            name='order',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='order_management.order'),
+        ),
+    ]
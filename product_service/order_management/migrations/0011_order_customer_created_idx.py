@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0010_index_audit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'create_at', 'id'], name='order_customer_created_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0011_order_customer_created_idx'),
+        ('product_management', '0008_product_reserved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('order', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='order_management.order')),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='product_management.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='hold_expires_idx'), models.Index(fields=['product', 'expires_at'], name='hold_product_expires_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stockreservation',
+            constraint=models.UniqueConstraint(fields=('order', 'product'), name='unique_hold_per_order'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order_management', '0012_stockreservation'),
+        ('product_management', '0008_product_reserved'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('payment_method', models.CharField(choices=[('credit_card', 'บัตรเครดิต/เดบิต'), ('cash_on_delivery', 'เก็บเงินปลายทาง'), ('qr_code', 'สแกน QR Code')], max_length=20)),
+                ('shipping_address_id', models.IntegerField(blank=True, null=True)),
+                ('user_payment_method_id', models.IntegerField(null=True)),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('status', models.CharField(choices=[('cart', 'ตะกร้า'), ('pending', 'รอชำระเงิน'), ('paid', 'ชำระเงินแล้ว'), ('processing', 'กำลังเตรียมของ'), ('in_transit', 'กำลังจัดส่ง'), ('shipped', 'จัดส่งแล้ว')], max_length=100)),
+                ('create_at', models.DateTimeField()),
+                ('update_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('shipping', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='order_management.shipping')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('paid_at', models.DateTimeField()),
+                ('amount', models.FloatField()),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='order_management.archivedorder')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedProductOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('quantity', models.IntegerField()),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='order_management.archivedorder')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='product_management.product')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedorder',
+            index=models.Index(fields=['customer', 'create_at', 'id'], name='archived_order_customer_idx'),
+        ),
+    ]
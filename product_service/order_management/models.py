@@ -1,7 +1,28 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
 from django.db import models
-from product_management.models import Product
+from django.db.models import (
+    DecimalField,
+    F,
+    FloatField,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+from product_management.models import Product, availability
+from product_management.cache import (
+    CATALOG,
+    SHIPPING,
+    invalidate,
+    product_namespace,
+)
 from django.core.validators import MinValueValidator
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from django.utils.html import strip_tags
@@ -17,6 +38,40 @@ class Shipping(models.Model):
         return self.method
 
 
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """
+        Load shipping, items and each item's product up front so serializing
+        any number of orders costs a fixed number of queries.
+        """
+        return self.select_related("shipping").prefetch_related(
+            Prefetch("items", queryset=ProductOrder.objects.select_related("product"))
+        )
+
+    def update_totals(self):
+        """
+        Recompute ``total_price`` for every order in the queryset with a single
+        ``UPDATE ... SET total_price = (SELECT SUM(quantity * price) ...)``.
+        """
+        line_totals = (
+            ProductOrder.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(
+                total=Sum(
+                    F("quantity") * F("product__price"), output_field=FloatField()
+                )
+            )
+            .values("total")
+        )
+        money = DecimalField(max_digits=12, decimal_places=2)
+        return self.update(
+            total_price=Coalesce(
+                Cast(Subquery(line_totals), money), Value(0), output_field=money
+            ),
+            update_at=timezone.now(),
+        )
+
+
 class Order(models.Model):
     STATUS_CART = "cart"
     STATUS_PENDING = "pending"
@@ -47,7 +102,10 @@ class Order(models.Model):
         default=PAYMENT_COD,
     )
 
-    customer = models.ForeignKey(User, on_delete=models.CASCADE, default=1)
+    # Indexed by order_customer_status_idx, which leads with customer.
+    customer = models.ForeignKey(
+        User, on_delete=models.CASCADE, default=1, db_index=False
+    )
     shipping = models.ForeignKey(Shipping, on_delete=models.SET_NULL, null=True)
     shipping_address_id = models.IntegerField(null=True, blank=True)
     user_payment_method_id = models.IntegerField(null=True)
@@ -64,6 +122,27 @@ class Order(models.Model):
     create_at = models.DateTimeField(auto_now_add=True)
     update_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer"],
+                condition=models.Q(status="cart"),
+                name="unique_cart_per_customer",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["customer", "status"], name="order_customer_status_idx"
+            ),
+            # Order history pages, see order_management.history.
+            models.Index(
+                fields=["customer", "create_at", "id"],
+                name="order_customer_created_idx",
+            ),
+        ]
+
     @property
     def calculated_total(self):
         return sum(item.total_price for item in self.items.all())
@@ -78,25 +157,33 @@ class Order(models.Model):
 
 class ProductOrder(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
-    order = models.ForeignKey(Order, related_name="items", on_delete=models.CASCADE)
+    # Indexed by unique_product_per_order, which leads with order.
+    order = models.ForeignKey(
+        Order, related_name="items", on_delete=models.CASCADE, db_index=False
+    )
     quantity = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "product"], name="unique_product_per_order"
+            )
+        ]
+
     @property
     def total_price(self):
         return self.product.price * self.quantity
 
     def save(self, *args, **kwargs):
-        if self.order.status == Order.STATUS_CART:
-            existing = (
-                ProductOrder.objects.filter(order=self.order, product=self.product)
-                .exclude(pk=self.pk)
-                .first()
-            )
-            existing_quantity = existing.quantity if existing else 0
-            total_quantity = self.quantity + existing_quantity
-
-            if total_quantity > self.product.stock:
-                raise ValueError(f"จำนวนสินค้าเกิน stock ที่มีอยู่ ({self.product.stock})")
+        # unique_product_per_order means this is the only line for the
+        # product, so its own quantity is the whole amount in the cart.
+        # With stock holds, the hold taken for the line checks the stock
+        # instead, and can first release other carts' expired holds.
+        holds = getattr(settings, "STOCK_RESERVATIONS", False)
+        if self.order.status == Order.STATUS_CART and not holds:
+            available = self.product.available_stock
+            if self.quantity > available:
+                raise ValueError(f"จำนวนสินค้าเกิน stock ที่มีอยู่ ({available})")
 
         super().save(*args, **kwargs)
 
@@ -120,8 +207,207 @@ class Payment(models.Model):
         return f"Payment of customer{self.order.customer_id}: order{self.order.pk}"
 
 
+class StockReservation(models.Model):
+    """
+    Units of a product held for a cart until ``expires_at``, when
+    ``STOCK_RESERVATIONS`` is on. Their sum per product is kept in
+    ``Product.reserved``; see order_management.stock.
+    """
+
+    # Indexed by unique_hold_per_order, which leads with order.
+    order = models.ForeignKey(
+        Order, related_name="holds", on_delete=models.CASCADE, db_index=False
+    )
+    # Indexed by hold_product_expires_idx, which leads with product.
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=False)
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "product"], name="unique_hold_per_order"
+            )
+        ]
+        indexes = [
+            # release_expired_holds
+            models.Index(fields=["expires_at"], name="hold_expires_idx"),
+            # Expired holds of one product, released when it runs short.
+            models.Index(
+                fields=["product", "expires_at"], name="hold_product_expires_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Hold {self.quantity} x {self.product_id} for order {self.order_id}"
+
+
+class ArchivedOrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """``OrderQuerySet.with_items`` for archived orders."""
+        return self.select_related("shipping").prefetch_related(
+            Prefetch(
+                "items",
+                queryset=ArchivedProductOrder.objects.select_related("product"),
+            )
+        )
+
+
+class ArchivedOrder(models.Model):
+    """
+    A shipped order moved out of ``Order`` by ``manage.py archive_orders``.
+
+    It keeps the id and the field names it had, so the order serializers
+    read it like an ``Order``; see order_management.archive.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_CHOICES)
+    # Indexed by archived_order_customer_idx, which leads with customer.
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    shipping = models.ForeignKey(Shipping, on_delete=models.SET_NULL, null=True)
+    shipping_address_id = models.IntegerField(null=True, blank=True)
+    user_payment_method_id = models.IntegerField(null=True)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2)
+    status = models.CharField(max_length=100, choices=Order.STATUS_CHOICES)
+    create_at = models.DateTimeField()
+    update_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    objects = ArchivedOrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Order history pages, like order_customer_created_idx.
+            models.Index(
+                fields=["customer", "create_at", "id"],
+                name="archived_order_customer_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived order: {self.pk} - {self.customer_id}"
+
+
+class ArchivedProductOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    order = models.ForeignKey(
+        ArchivedOrder, related_name="items", on_delete=models.CASCADE
+    )
+    quantity = models.IntegerField()
+
+    @property
+    def total_price(self):
+        return self.product.price * self.quantity
+
+    def __str__(self):
+        return f"Archived order {self.order_id}: {self.product.name}"
+
+
+class ArchivedPayment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.OneToOneField(
+        ArchivedOrder, related_name="payment", on_delete=models.CASCADE
+    )
+    paid_at = models.DateTimeField()
+    amount = models.FloatField()
+
+    def __str__(self):
+        return f"Archived payment: order{self.order_id}"
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be sent by ``manage.py send_outbox_emails``.
+
+    Rows are written in the same transaction as the change they announce, so
+    an email is queued if and only if that change commits, and the request
+    never waits on the mail server.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    to_email = models.EmailField()
+    from_email = models.CharField(max_length=255, blank=True)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="outbox_pending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+_deferred_order_totals = ContextVar("deferred_order_totals", default=None)
+
+
+@contextmanager
+def deferred_order_totals():
+    """
+    Collect the orders touched by ``ProductOrder`` changes inside the block and
+    recompute each of their totals once when the block exits, instead of once
+    per changed line. Wrap the block in ``transaction.atomic`` so a failure
+    part way through does not leave lines and totals out of step.
+    """
+    if _deferred_order_totals.get() is not None:
+        yield
+        return
+    pending = set()
+    token = _deferred_order_totals.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_order_totals.reset(token)
+    if pending:
+        Order.objects.filter(pk__in=pending).update_totals()
+
+
 @receiver([post_save, post_delete], sender=ProductOrder)
 def update_order_total(sender, instance, **kwargs):
-    order = instance.order
-    order.total_price = order.calculated_total
-    order.save()
+    pending = _deferred_order_totals.get()
+    if pending is not None:
+        pending.add(instance.order_id)
+    else:
+        Order.objects.filter(pk=instance.order_id).update_totals()
+
+
+@receiver(pre_delete, sender=Order)
+def release_order_holds(sender, instance, **kwargs):
+    # The order's holds are deleted with it, so give their units back first.
+    holds = instance.holds.select_for_update().values_list("product_id", "quantity")
+    for product_id, quantity in holds:
+        Product.objects.filter(pk=product_id).update(
+            reserved=F("reserved") - quantity,
+            available=availability(reserved=F("reserved") - quantity),
+            updated_at=timezone.now(),
+        )
+        invalidate(CATALOG, product_namespace(product_id))
+
+
+@receiver([post_save, post_delete], sender=Shipping)
+def invalidate_shipping_cache(sender, instance, **kwargs):
+    invalidate(SHIPPING)
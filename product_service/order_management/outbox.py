@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from order_management.models import OutboxEmail
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+def enqueue_email(to_email, subject, body, html_body="", from_email=None):
+    """Queue an email to be sent once the current transaction commits."""
+    return OutboxEmail.objects.create(
+        to_email=to_email,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL or "",
+        subject=subject,
+        body=body,
+        html_body=html_body,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(
+        seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    )
+
+
+def send_pending_emails(batch_size=50, max_attempts=5):
+    """
+    Claim up to ``batch_size`` due emails and send them over one SMTP
+    connection. Returns ``(sent, failed)``.
+
+    Claimed rows are locked with ``FOR UPDATE SKIP LOCKED``, so several workers
+    can run side by side without sending the same email twice. A failed email
+    is retried with exponential backoff until ``max_attempts`` is reached.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not emails:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            for email in emails:
+                _record_failure(email, e, max_attempts)
+            failed = len(emails)
+        else:
+            for email in emails:
+                try:
+                    _build_message(email, connection).send()
+                except Exception as e:
+                    _record_failure(email, e, max_attempts)
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.status = OutboxEmail.STATUS_SENT
+                    email.sent_at = timezone.now()
+                    sent += 1
+            connection.close()
+
+        OutboxEmail.objects.bulk_update(
+            emails, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return sent, failed
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email or None,
+        [email.to_email],
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def _record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = OutboxEmail.STATUS_FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
@@ -1,8 +1,12 @@
 from rest_framework import serializers
 from order_management.models import *
+from product_service.metrics import TimedSerializerMixin
+from product_service.sparse import SparseFieldsMixin
 
 
-class ProductOrderSerializer(serializers.ModelSerializer):
+class ProductOrderSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     product_name = serializers.CharField(source="product.name", read_only=True)
     product_price = serializers.DecimalField(
         source="product.price", max_digits=12, decimal_places=2, read_only=True
@@ -21,7 +25,9 @@ class ProductOrderSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "product_name", "product_price", "total_price"]
 
 
-class ProductOrderDetailSerializer(serializers.ModelSerializer):
+class ProductOrderDetailSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     name = serializers.CharField(source="product.name", read_only=True)
     price = serializers.DecimalField(
         source="product.price", max_digits=12, decimal_places=2, read_only=True
@@ -33,7 +39,54 @@ class ProductOrderDetailSerializer(serializers.ModelSerializer):
         fields = ["product", "name", "price", "quantity"]
 
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class CartStockField(serializers.IntegerField):
+    """
+    How much of the product the line's cart can have: the stock the catalog
+    shows, ``available_stock``, plus the units the cart itself holds.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, line):
+        product = line.product
+        if not product.reserved:
+            return product.available_stock
+        held = sum(
+            hold.quantity
+            for hold in line.order.holds.all()
+            if hold.product_id == product.pk
+        )
+        return product.available_stock + held
+
+
+class CheckoutLineSerializer(ProductOrderDetailSerializer):
+    stock = CartStockField()
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+
+    class Meta(ProductOrderDetailSerializer.Meta):
+        fields = ProductOrderDetailSerializer.Meta.fields + ["stock", "total_price"]
+
+
+class CheckoutCartSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
+    items = CheckoutLineSerializer(many=True, read_only=True)
+    total_price = serializers.DecimalField(
+        max_digits=12, decimal_places=2, read_only=True
+    )
+
+    class Meta:
+        model = Order
+        fields = ["id", "items", "total_price"]
+
+
+class OrderDetailSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     items = ProductOrderDetailSerializer(many=True, read_only=True)
     total_price = serializers.DecimalField(
         max_digits=12, decimal_places=2, read_only=True
@@ -63,7 +116,9 @@ class OrderDetailSerializer(serializers.ModelSerializer):
         return obj.shipping.method if obj.shipping else None
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     items = ProductOrderSerializer(many=True, read_only=True)
 
     class Meta:
@@ -82,13 +137,17 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
-class ShippingSerializer(serializers.ModelSerializer):
+class ShippingSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Shipping
         fields = "__all__"
 
 
-class OrderHistorySerializer(serializers.ModelSerializer):
+class OrderHistorySerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     items = ProductOrderSerializer(many=True, read_only=True)
 
     class Meta:
@@ -104,12 +163,23 @@ class OrderHistorySerializer(serializers.ModelSerializer):
         return float(obj.shipping.fee) if obj.shipping else 0.0
 
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Payment
         fields = "__all__"
 
 
+class CartItemQuantitySerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartItemsUpdateSerializer(serializers.Serializer):
+    items = CartItemQuantitySerializer(many=True, allow_empty=False)
+
+
 class OrderConfirmSerializer(serializers.Serializer):
     address_id = serializers.IntegerField()
     shipping_id = serializers.IntegerField()
@@ -0,0 +1,280 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from order_management.models import StockReservation
+from product_management.cache import CATALOG, invalidate, product_namespace
+from product_management.models import Product, availability
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product, requested, available=None):
+        self.product = product
+        self.requested = requested
+        self.available = product.stock if available is None else available
+        super().__init__(
+            f"Not enough stock for {product.name} (Available: {self.available})."
+        )
+
+
+def holds_enabled():
+    return getattr(settings, "STOCK_RESERVATIONS", False)
+
+
+def _order_quantities(order):
+    quantities = Counter()
+    for product_id, quantity in order.items.values_list("product_id", "quantity"):
+        quantities[product_id] += quantity
+    return quantities
+
+
+def _by_product(quantities):
+    return Case(
+        *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def reserve_stock(order):
+    """
+    Deduct the stock for every line of ``order`` in two statements.
+
+    All of the order's products are locked with one ``SELECT ... FOR UPDATE``
+    in primary key order. Two checkouts that share products therefore always
+    take their locks in the same order and cannot deadlock. The stock is then
+    taken with one conditional
+    ``UPDATE ... SET stock = stock - qty WHERE stock >= qty``, which also keeps
+    ``available`` in step, so no per-row ``save()`` is needed.
+
+    Must run inside a transaction. Raises ``InsufficientStock`` for the first
+    product that cannot cover its quantity, in which case nothing is updated.
+    """
+    quantities = _order_quantities(order)
+    if not quantities:
+        return
+
+    products = (
+        Product.objects.select_for_update()
+        .filter(pk__in=quantities)
+        .order_by("pk")
+        .only("id", "name", "stock")
+    )
+    for product in products:
+        if product.stock < quantities[product.pk]:
+            raise InsufficientStock(product, quantities[product.pk])
+
+    requested = _by_product(quantities)
+    updated = Product.objects.filter(pk__in=quantities, stock__gte=requested).update(
+        stock=F("stock") - requested,
+        available=availability(stock=F("stock") - requested),
+        updated_at=timezone.now(),
+    )
+    # Only reachable if a product was deleted after the lock, as the locked
+    # rows cannot have changed.
+    if updated != len(quantities):
+        raise RuntimeError(f"Stock update for order {order.pk} touched {updated} rows.")
+
+    # ``update()`` skips the post_save receivers that drop cached catalog pages.
+    invalidate(CATALOG, *[product_namespace(pk) for pk in quantities])
+
+
+def hold_stock(order, quantities):
+    """
+    Make the holds of ``order`` match ``quantities``, a mapping of product
+    id to quantity in which 0 releases the hold, and restart the TTL of all
+    of the order's holds.
+
+    A product's hold grows with one conditional
+    ``UPDATE ... SET reserved = reserved + n WHERE stock - reserved >= n``,
+    taken in primary key order so two carts cannot deadlock. When that
+    fails, the product's expired holds are released and it is tried once
+    more, so abandoned carts do not have to wait for the sweeper.
+
+    Holds change what the catalog shows as in stock, so the cached catalog
+    responses of the products whose hold changed are dropped.
+
+    Must run inside a transaction. Raises ``InsufficientStock`` for the
+    first product that cannot cover its increase.
+    """
+    held = dict(
+        StockReservation.objects.select_for_update()
+        .filter(order=order, product__in=quantities)
+        .values_list("product_id", "quantity")
+    )
+    changed = {}
+    for product_id in sorted(quantities):
+        quantity, before = quantities[product_id], held.get(product_id, 0)
+        if quantity == before:
+            continue
+        changed[product_id] = quantity
+        if quantity < before:
+            Product.objects.filter(pk=product_id).update(
+                reserved=F("reserved") - (before - quantity),
+                available=availability(reserved=F("reserved") - (before - quantity)),
+                updated_at=timezone.now(),
+            )
+        elif not _take(product_id, quantity - before):
+            release_holds(
+                StockReservation.objects.exclude(order=order).filter(
+                    product=product_id, expires_at__lte=timezone.now()
+                )
+            )
+            if not _take(product_id, quantity - before):
+                product = Product.objects.get(pk=product_id)
+                raise InsufficientStock(
+                    product, quantity, product.available_stock + before
+                )
+
+    expires_at = timezone.now() + timedelta(
+        seconds=getattr(settings, "STOCK_RESERVATION_SECONDS", 900)
+    )
+    released = [pk for pk, quantity in changed.items() if not quantity]
+    if released:
+        order.holds.filter(product__in=released).delete()
+    StockReservation.objects.bulk_create(
+        [
+            StockReservation(
+                order=order, product_id=pk, quantity=quantity, expires_at=expires_at
+            )
+            for pk, quantity in changed.items()
+            if quantity
+        ],
+        update_conflicts=True,
+        unique_fields=["order", "product"],
+        update_fields=["quantity", "expires_at"],
+    )
+    order.holds.update(expires_at=expires_at)
+    if changed:
+        invalidate(CATALOG, *[product_namespace(pk) for pk in changed])
+
+
+def _take(product_id, quantity):
+    return Product.objects.filter(
+        pk=product_id, stock__gte=F("reserved") + quantity
+    ).update(
+        reserved=F("reserved") + quantity,
+        available=availability(reserved=F("reserved") + quantity),
+        updated_at=timezone.now(),
+    )
+
+
+def release_holds(holds, limit=None, skip_locked=True):
+    """
+    Delete up to ``limit`` of the holds in the ``holds`` queryset and give
+    their units back, in one ``UPDATE`` for all of their products. Holds
+    another transaction has locked are skipped, unless ``skip_locked`` is
+    False, when they are waited for. Returns how many were released.
+    """
+    with transaction.atomic():
+        rows = (
+            holds.select_for_update(skip_locked=skip_locked)
+            .order_by("pk")
+            .values_list("pk", "product_id", "quantity")
+        )
+        rows = list(rows[:limit] if limit else rows)
+        if not rows:
+            return 0
+        released = Counter()
+        for _, product_id, quantity in rows:
+            released[product_id] += quantity
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in rows]).delete()
+        # Lock the products in the order hold_stock does before updating
+        # them all at once.
+        list(
+            Product.objects.select_for_update()
+            .filter(pk__in=released)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        returned = _by_product(released)
+        Product.objects.filter(pk__in=released).update(
+            reserved=F("reserved") - returned,
+            available=availability(reserved=F("reserved") - returned),
+            updated_at=timezone.now(),
+        )
+        invalidate(CATALOG, *[product_namespace(pk) for pk in released])
+    return len(rows)
+
+
+def release_expired_holds(batch_size=1000):
+    """
+    Release every hold past its ``expires_at``, ``batch_size`` at a time,
+    and return how many were released.
+    """
+    total = 0
+    while True:
+        expired = StockReservation.objects.filter(expires_at__lte=timezone.now())
+        released = release_holds(expired, limit=batch_size)
+        total += released
+        if released < batch_size:
+            return total
+
+
+def convert_holds(order):
+    """
+    ``reserve_stock`` for an order whose stock is already held.
+
+    The held units are taken off ``stock`` and ``reserved`` together in one
+    ``UPDATE``, with no lock on the products first: the holds already set
+    the stock aside. The holds themselves are locked, so the sweeper, which
+    skips locked holds, cannot release them in between, and the ``UPDATE``
+    only subtracts a hold still counted in ``reserved``. Lines that lost
+    their hold, e.g. to the sweeper, are held again first, which fails like
+    ``reserve_stock`` when the stock is gone.
+
+    Must run inside a transaction. Raises ``InsufficientStock`` for the
+    first product that cannot cover its quantity.
+    """
+    quantities = _order_quantities(order)
+    for _ in range(2):
+        held = dict(
+            order.holds.select_for_update().values_list("product_id", "quantity")
+        )
+        stale = {
+            pk: quantities.get(pk, 0)
+            for pk in quantities.keys() | held.keys()
+            if quantities.get(pk, 0) != held.get(pk, 0)
+        }
+        if stale:
+            hold_stock(order, stale)
+        if not quantities:
+            return
+        if _take_held(order, quantities):
+            break
+        # Where rows cannot be locked, e.g. on SQLite, a hold can still be
+        # released after it was read. It is held again on the next pass.
+    else:
+        raise RuntimeError(f"Holds of order {order.pk} kept being released.")
+    order.holds.all().delete()
+
+    invalidate(CATALOG, *[product_namespace(pk) for pk in quantities])
+
+
+def _take_held(order, quantities):
+    """
+    Take ``quantities`` off the stock and holds of their products, all or
+    none of them. Returns False when a hold was released under the order.
+    """
+    requested = _by_product(quantities)
+    products = Product.objects.filter(pk__in=quantities)
+    short = products.filter(Q(stock__lt=requested) | Q(reserved__lt=requested))
+    updated = products.filter(~Exists(short)).update(
+        stock=F("stock") - requested,
+        reserved=F("reserved") - requested,
+        available=availability(F("stock") - requested, F("reserved") - requested),
+        updated_at=timezone.now(),
+    )
+    if updated == len(quantities):
+        return True
+    # Holds keep stock >= reserved, unless the stock was lowered by hand
+    # below what carts hold.
+    found = list(products.order_by("pk"))
+    for product in found:
+        if product.stock < quantities[product.pk]:
+            raise InsufficientStock(product, quantities[product.pk])
+    if len(found) != len(quantities):
+        raise RuntimeError(f"Stock update for order {order.pk} touched {updated} rows.")
+    return False
@@ -0,0 +1,95 @@
+"""
+In-process stand-in for user_service.
+
+``StubUserService`` is a requests transport adapter. While it is active it
+is mounted on the shared user_client session for ``USER_SERVICE_URL`` and
+serves the async httpx clients as well, so product_service code runs
+unchanged and no socket is opened::
+
+    with StubUserService(routes={"/api/address/1/": {"province": "X"}}) as stub:
+        ...
+    stub.calls  # [(path, Authorization header), ...]
+
+A route mapped to ``None`` answers 404. Unknown paths answer 404 too.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError
+from order_management import user_client
+from order_management.user_client import get_session
+
+
+class StubUserService(BaseAdapter):
+    def __init__(self, routes=None, delay=0, down=False):
+        super().__init__()
+        self.routes = routes or {}
+        self.delay = delay
+        self.down = down
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def record(self, url, headers):
+        path = urlsplit(str(url)).path
+        with self._lock:
+            self.calls.append((path, headers.get("Authorization")))
+        return self.routes.get(path)
+
+    def send(self, request, **kwargs):
+        data = self.record(request.url, request.headers)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.down:
+            raise ConnectionError("user_service is down", request=request)
+
+        resp = Response()
+        resp.request = request
+        resp.url = request.url
+        if data is None:
+            resp.status_code = 404
+            resp._content = b""
+        else:
+            resp.status_code = 200
+            resp._content = json.dumps({"data": data}).encode()
+            resp.headers["Content-Type"] = "application/json"
+        return resp
+
+    async def handle_async(self, request):
+        data = self.record(request.url, request.headers)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.down:
+            raise httpx.ConnectError("user_service is down", request=request)
+        if data is None:
+            return httpx.Response(404)
+        return httpx.Response(200, json={"data": data})
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        session = get_session()
+        self._prefix = settings.USER_SERVICE_URL.rstrip("/") + "/"
+        self._previous = session.adapters.get(self._prefix)
+        session.mount(self._prefix, self)
+        self._previous_transport = user_client.async_transport
+        user_client.async_transport = httpx.MockTransport(self.handle_async)
+        user_client._async_clients.clear()
+        return self
+
+    def __exit__(self, *exc_info):
+        session = get_session()
+        if self._previous is None:
+            session.adapters.pop(self._prefix, None)
+        else:
+            session.mount(self._prefix, self._previous)
+        user_client.async_transport = self._previous_transport
+        user_client._async_clients.clear()
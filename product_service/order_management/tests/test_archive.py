@@ -0,0 +1,218 @@
+import io
+import json
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from order_management import stock
+from order_management.archive import archive_orders
+from order_management.management.commands.archive_orders import months_ago
+from order_management.models import (
+    ArchivedOrder,
+    ArchivedPayment,
+    ArchivedProductOrder,
+    Order,
+    Payment,
+    ProductOrder,
+    Shipping,
+    StockReservation,
+)
+from product_management.models import Product
+
+
+class ArchiveOrdersTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="archive", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.shipping = Shipping.objects.create(method="Std", fee=5.0, tel="")
+        self.product = Product.objects.create(
+            name="Tea",
+            detail="d",
+            price=5.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        self.now = timezone.now()
+
+    def order(self, status, days_ago, user=None):
+        order = Order.objects.create(
+            customer=user or self.user, shipping=self.shipping, status=status
+        )
+        ProductOrder.objects.create(order=order, product=self.product, quantity=2)
+        Order.objects.filter(pk=order.pk).update(
+            create_at=self.now - timedelta(days=days_ago)
+        )
+        return Order.objects.get(pk=order.pk)
+
+    def history_ids(self, url):
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(order["id"] for order in resp.data["orders"])
+            url = resp.data["next"]
+        return ids
+
+    def test_moves_old_shipped_orders(self):
+        """[Normal] old shipped orders move with their lines and payment"""
+        old = self.order(Order.STATUS_SHIPPED, 400)
+        payment = Payment.objects.create(order=old)
+        recent = self.order(Order.STATUS_SHIPPED, 10)
+        pending = self.order(Order.STATUS_PENDING, 400)
+
+        moved = archive_orders(self.now - timedelta(days=180))
+
+        self.assertEqual(moved, 1)
+        self.assertEqual(
+            set(Order.objects.values_list("id", flat=True)), {recent.id, pending.id}
+        )
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(
+            (archived.id, archived.status, archived.total_price, archived.create_at),
+            (old.id, old.status, old.total_price, old.create_at),
+        )
+        self.assertEqual(archived.items.get().quantity, 2)
+        self.assertEqual(ArchivedPayment.objects.get().id, payment.id)
+        self.assertFalse(ProductOrder.objects.filter(order_id=old.id).exists())
+        self.assertFalse(Payment.objects.exists())
+
+    def test_releases_stray_holds(self):
+        """[Normal] a hold left on a shipped order is released, never skipped"""
+        old = self.order(Order.STATUS_SHIPPED, 400)
+        StockReservation.objects.create(
+            order=old, product=self.product, quantity=3, expires_at=self.now
+        )
+        Product.objects.filter(pk=self.product.pk).update(reserved=3)
+
+        with mock.patch(
+            "order_management.archive.release_holds", wraps=stock.release_holds
+        ) as release:
+            self.assertEqual(archive_orders(self.now), 1)
+        # Skipping a hold another transaction has locked would leave it
+        # pointing at the order, and the order's DELETE would fail.
+        self.assertIs(release.call_args.kwargs["skip_locked"], False)
+        self.assertFalse(StockReservation.objects.exists())
+        self.assertEqual(Product.objects.get(pk=self.product.pk).reserved, 0)
+
+    def test_moves_in_batches(self):
+        """[Normal] every eligible order is moved, a batch at a time"""
+        for days in range(200, 205):
+            self.order(Order.STATUS_SHIPPED, days)
+        self.assertEqual(archive_orders(self.now, batch_size=2), 5)
+        self.assertEqual(ArchivedOrder.objects.count(), 5)
+        self.assertEqual(ArchivedProductOrder.objects.count(), 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_command(self):
+        """[Normal] archive_orders --months reports how many orders moved"""
+        self.order(Order.STATUS_SHIPPED, 400)
+        self.order(Order.STATUS_SHIPPED, 10)
+        out = io.StringIO()
+        call_command("archive_orders", "--months=6", "--batch-size=10", stdout=out)
+        self.assertIn("archived 1 orders", out.getvalue())
+
+    def test_months_ago_clamps_the_day(self):
+        """[Normal] a month back from the 31st lands on the month's last day"""
+        self.assertEqual(months_ago(datetime(2026, 3, 31), 1), datetime(2026, 2, 28))
+        self.assertEqual(months_ago(datetime(2026, 1, 15), 13), datetime(2024, 12, 15))
+
+    def test_history_reads_live_and_archived(self):
+        """[Normal] GET /api/history/ pages through both tables, newest first"""
+        orders = [
+            self.order(status, days)
+            for status, days in [
+                (Order.STATUS_SHIPPED, 500),
+                (Order.STATUS_PENDING, 400),
+                (Order.STATUS_SHIPPED, 300),
+                (Order.STATUS_PAID, 100),
+                (Order.STATUS_SHIPPED, 250),
+            ]
+        ]
+        self.order(Order.STATUS_SHIPPED, 450, user=User.objects.create(username="o"))
+        archive_orders(self.now - timedelta(days=200))
+        self.assertEqual(ArchivedOrder.objects.count(), 4)
+
+        by_date = sorted(orders, key=lambda order: order.create_at, reverse=True)
+        newest_first = [order.id for order in by_date]
+        url = reverse("user-orders") + "?page_size=2"
+        self.assertEqual(self.history_ids(url), newest_first)
+
+        resp = self.client.get(reverse("user-orders") + "?stream=1")
+        body = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual([order["id"] for order in body["orders"]], newest_first)
+        self.assertEqual(body["orders"][-1]["items"][0]["quantity"], 2)
+
+        url = reverse("user-orders") + "?status=pending,paid"
+        self.assertEqual(self.history_ids(url), [orders[3].id, orders[1].id])
+
+    def test_history_query_count_does_not_grow(self):
+        """[Normal] a history page costs the same however many orders are archived"""
+        self.order(Order.STATUS_SHIPPED, 400)
+        self.order(Order.STATUS_PENDING, 1)
+        archive_orders(self.now - timedelta(days=200))
+        with CaptureQueriesContext(connection) as single:
+            self.client.get(reverse("user-orders"))
+        for _ in range(30):
+            self.order(Order.STATUS_SHIPPED, 400)
+        archive_orders(self.now - timedelta(days=200))
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(reverse("user-orders"))
+        self.assertEqual(len(many), len(single))
+
+    def test_archived_order_detail_and_payment(self):
+        """[Normal] an archived order's detail and payment are still served"""
+        old = self.order(Order.STATUS_SHIPPED, 400)
+        Payment.objects.create(order=old)
+        archive_orders(self.now)
+
+        resp = self.client.get(reverse("order-detail", args=[old.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["items"][0]["quantity"], 2)
+        self.assertEqual(resp.data["shipping_method"], "Std")
+
+        resp = self.client.get(reverse("payment-by-order", args=[old.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"]["amount"], 15.0)
+
+    def test_archived_order_products(self):
+        """[Normal] the products of an archived order are still served"""
+        old = self.order(Order.STATUS_SHIPPED, 400)
+        archive_orders(self.now)
+        resp = self.client.get(reverse("products-in-orders", args=[old.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [product["id"] for product in resp.data["products"]], [self.product.id]
+        )
+
+    def test_archived_order_of_another_user(self):
+        """[Attack] another user's archived order is not found"""
+        other = User.objects.create_user(username="other", password="pass")
+        old = self.order(Order.STATUS_SHIPPED, 400, user=other)
+        archive_orders(self.now)
+        resp = self.client.get(reverse("order-detail", args=[old.id]))
+        self.assertEqual(resp.status_code, 404)
+        resp = self.client.get(reverse("products-in-orders", args=[old.id]))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_cart_does_not_touch_archive(self):
+        """[Normal] cart requests query the live tables only"""
+        self.order(Order.STATUS_SHIPPED, 400)
+        archive_orders(self.now)
+        self.client.post(
+            reverse("add-to-cart"),
+            {"product_id": self.product.id, "quantity": 1},
+            format="json",
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("cart-orders"))
+        self.assertTrue(ctx.captured_queries)
+        for query in ctx.captured_queries:
+            self.assertNotIn("archived", query["sql"])
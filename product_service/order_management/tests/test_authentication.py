@@ -0,0 +1,50 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from order_management.models import Order
+
+
+class ClaimsJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="jwt", password="pass", email="jwt@example.com"
+        )
+        Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+
+    def authenticate(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_claims_token_skips_user_query(self):
+        """[Normal] a token with username/email claims never reads auth_user"""
+        token = AccessToken.for_user(self.user)
+        token["username"] = self.user.username
+        token["email"] = self.user.email
+        self.authenticate(token)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("cart-orders"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["cart_orders"]), 1)
+        self.assertFalse(any("auth_user" in q["sql"] for q in ctx.captured_queries))
+
+    def test_token_without_claims_falls_back_to_cached_user(self):
+        """[Normal] an older token without claims loads the user once, then from cache"""
+        self.authenticate(AccessToken.for_user(self.user))
+        resp = self.client.get(reverse("cart-orders"))
+        self.assertEqual(resp.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("cart-orders"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(any("auth_user" in q["sql"] for q in ctx.captured_queries))
+
+    def test_forged_token_rejected(self):
+        """[Attack] a token with a tampered signature returns 401"""
+        token = AccessToken.for_user(self.user)
+        token["username"] = "admin"
+        self.authenticate(str(token)[:-2] + "xx")
+        resp = self.client.get(reverse("cart-orders"))
+        self.assertEqual(resp.status_code, 401)
@@ -0,0 +1,106 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from order_management.models import Order, ProductOrder, Shipping, StockReservation
+from order_management.tests.stub_user_service import StubUserService
+from product_management.models import Product
+
+ROUTES = {
+    "/api/address/": [{"id": 1, "is_default": False}, {"id": 2, "is_default": True}],
+    "/api/payment/": [{"id": 5, "is_default": False}, {"id": 6, "is_default": True}],
+}
+
+
+class CheckoutContextViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="co", password="pass")
+        token = AccessToken.for_user(self.user)
+        token["username"] = self.user.username
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        Shipping.objects.create(method="Std", fee=5.0, tel="")
+        self.cart = Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"P{i}",
+                detail="d",
+                price=2.5,
+                stock=10,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            ProductOrder.objects.create(order=self.cart, product=product, quantity=2)
+        self.url = reverse("checkout-context")
+
+    def test_context_bundles_everything(self):
+        """[Normal] GET /api/checkout/context/ returns cart, sorted lists and shipping"""
+        with StubUserService(routes=ROUTES):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        data = resp.data["data"]
+        self.assertEqual(data["cart"]["id"], self.cart.id)
+        self.assertEqual(len(data["cart"]["items"]), 3)
+        line = data["cart"]["items"][0]
+        self.assertEqual(line["stock"], 10)
+        self.assertEqual(line["total_price"], "5.00")
+        self.assertEqual([a["id"] for a in data["addresses"]], [2, 1])
+        self.assertEqual([p["id"] for p in data["payment_methods"]], [6, 5])
+        self.assertEqual(len(data["shipping_options"]), 1)
+
+    def test_query_count(self):
+        """[Normal] a warm checkout context costs two queries whatever the cart size"""
+        with StubUserService(routes=ROUTES):
+            self.client.get(self.url)
+            with self.assertNumQueries(2):
+                self.client.get(self.url)
+
+    @override_settings(STOCK_RESERVATIONS=True)
+    def test_stock_leaves_out_other_carts_holds(self):
+        """[Normal] a line's stock leaves out what other carts hold"""
+        product = self.cart.items.order_by("id").first().product
+        other = Order.objects.create(
+            customer=User.objects.create_user(username="other", password="pass"),
+            status=Order.STATUS_CART,
+        )
+        for order, quantity in [(self.cart, 2), (other, 3)]:
+            StockReservation.objects.create(
+                order=order,
+                product=product,
+                quantity=quantity,
+                expires_at=timezone.now(),
+            )
+        Product.objects.filter(pk=product.pk).update(reserved=5)
+
+        with StubUserService(routes=ROUTES):
+            resp = self.client.get(self.url)
+        stock = [line["stock"] for line in resp.data["data"]["cart"]["items"]]
+        self.assertEqual(stock, [7, 10, 10])
+
+    def test_user_lists_are_not_cached(self):
+        """[Normal] addresses are fetched again on every load"""
+        with StubUserService(routes=ROUTES) as stub:
+            self.client.get(self.url)
+            self.client.get(self.url)
+        self.assertEqual(len(stub.calls), 4)
+
+    def test_user_service_down(self):
+        """[Invalid Input] an unreachable user_service yields empty lists"""
+        with StubUserService(down=True), self.assertLogs(
+            "order_management.user_client", "WARNING"
+        ):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"]["addresses"], [])
+        self.assertEqual(len(resp.data["data"]["cart"]["items"]), 3)
+
+    def test_unauthenticated(self):
+        """[Attack] GET /api/checkout/context/ without a token returns 401"""
+        self.client.credentials()
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 401)
@@ -0,0 +1,143 @@
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from order_management.models import Order, ProductOrder
+from order_management.views import UserOrderListView
+from product_management.models import Product
+
+
+class OrderHistoryTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="history", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        product = Product.objects.create(
+            name="Tea",
+            detail="d",
+            price=5.0,
+            stock=100,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        statuses = [Order.STATUS_PAID, Order.STATUS_SHIPPED, Order.STATUS_PENDING]
+        self.orders = Order.objects.bulk_create(
+            Order(customer=self.user, status=statuses[i % 3]) for i in range(7)
+        )
+        # Two orders share a timestamp, so ties are broken by id.
+        start = timezone.now()
+        for i, order in enumerate(self.orders):
+            order.create_at = start + timedelta(minutes=min(i, 5))
+        Order.objects.bulk_update(self.orders, ["create_at"])
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=product, quantity=1)
+            for order in self.orders
+        )
+        other = User.objects.create_user(username="other", password="pass")
+        Order.objects.create(customer=other, status=Order.STATUS_PAID)
+        self.newest_first = [order.id for order in reversed(self.orders)]
+
+    def read_pages(self, url):
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            ids.extend(order["id"] for order in resp.data["orders"])
+            url = resp.data["next"]
+        return ids
+
+    def read_stream(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], "application/json")
+        chunks = list(resp.streaming_content)
+        return chunks, json.loads(b"".join(chunks))
+
+    def test_pages_follow_cursor(self):
+        """[Normal] following next visits every order once, newest first"""
+        url = reverse("user-orders") + "?page_size=3"
+        self.assertEqual(self.read_pages(url), self.newest_first)
+
+    def test_first_page_has_no_previous(self):
+        """[Normal] the first page links to the next one only"""
+        resp = self.client.get(reverse("user-orders") + "?page_size=3")
+        self.assertEqual(len(resp.data["orders"]), 3)
+        self.assertIsNotNone(resp.data["next"])
+        self.assertIsNone(resp.data["previous"])
+
+    def test_status_filter(self):
+        """[Normal] ?status= keeps only the given statuses"""
+        url = reverse("user-orders") + "?status=paid,shipped&page_size=2"
+        expected = [
+            order.id
+            for order in reversed(self.orders)
+            if order.status in (Order.STATUS_PAID, Order.STATUS_SHIPPED)
+        ]
+        self.assertEqual(self.read_pages(url), expected)
+
+    def test_repeated_status_filter(self):
+        """[Normal] ?status= may be repeated"""
+        url = reverse("user-orders") + "?status=paid&status=pending"
+        statuses = {
+            order["status"] for order in self.client.get(url).data["orders"]
+        }
+        self.assertEqual(statuses, {Order.STATUS_PAID, Order.STATUS_PENDING})
+
+    def test_unknown_status(self):
+        """[Invalid Input] an unknown status returns 400"""
+        resp = self.client.get(reverse("user-orders") + "?status=lost")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("lost", resp.data["error"])
+
+    def test_tampered_cursor(self):
+        """[Attack] a forged cursor returns 404 instead of an error page"""
+        resp = self.client.get(reverse("user-orders") + "?cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_stream_matches_pages(self):
+        """[Normal] ?stream=true returns every order as one JSON document"""
+        first_page = self.client.get(reverse("user-orders")).data["orders"]
+        _, body = self.read_stream(reverse("user-orders") + "?stream=true")
+        self.assertEqual([order["id"] for order in body["orders"]], self.newest_first)
+        self.assertEqual(body["orders"], json.loads(json.dumps(first_page)))
+
+    def test_stream_is_written_in_chunks(self):
+        """[Normal] the stream is written a chunk of orders at a time"""
+        with mock.patch.object(UserOrderListView, "stream_chunk_size", 2):
+            chunks, body = self.read_stream(reverse("user-orders") + "?stream=1")
+        # Opening, four chunks of at most two orders, closing.
+        self.assertEqual(len(chunks), 6)
+        self.assertEqual(len(body["orders"]), 7)
+
+    def test_stream_with_status_filter(self):
+        """[Normal] ?stream=true applies the status filter"""
+        _, body = self.read_stream(reverse("user-orders") + "?stream=1&status=shipped")
+        self.assertEqual(
+            {order["status"] for order in body["orders"]}, {Order.STATUS_SHIPPED}
+        )
+        self.assertEqual(len(body["orders"]), 2)
+
+    def test_stream_of_empty_history(self):
+        """[Normal] a user without orders streams an empty list"""
+        self.client.force_authenticate(User.objects.get(username="other"))
+        Order.objects.filter(customer__username="other").delete()
+        _, body = self.read_stream(reverse("user-orders") + "?stream=1")
+        self.assertEqual(body, {"orders": []})
+
+    async def test_stream_under_asgi(self):
+        """[Normal] ?stream=true streams from the ASGI handler"""
+        token = AccessToken.for_user(self.user)
+        token["username"] = self.user.username
+        resp = await self.async_client.get(
+            reverse("user-orders") + "?stream=1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(resp.status_code, 200)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+        ids = [order["id"] for order in json.loads(body)["orders"]]
+        self.assertEqual(ids, self.newest_first)
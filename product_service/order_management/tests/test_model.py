@@ -3,7 +3,10 @@ from django.contrib.auth.models import User
 from order_management.models import *
 from product_management.models import Product
 from datetime import date
+from decimal import Decimal
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 class ShippingModelTest(TestCase):
@@ -81,3 +84,66 @@ class PaymentModelsTest(TestCase):
         pay = Payment(order=self.order)
         pay.save()
         self.assertEqual(pay.amount, 27.5)
+
+
+class OrderTotalTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u4", password="pass")
+        self.order = Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+        self.products = Product.objects.bulk_create(
+            Product(
+                name=f"P{i}",
+                detail="d",
+                price=1.5,
+                stock=100,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(60)
+        )
+
+    def test_total_follows_line_changes(self):
+        """[Normal] adding, changing and removing lines keeps total_price right"""
+        po = ProductOrder.objects.create(
+            order=self.order, product=self.products[0], quantity=2
+        )
+        ProductOrder.objects.create(order=self.order, product=self.products[1], quantity=1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal("4.50"))
+
+        po.quantity = 4
+        po.save()
+        po.delete()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal("1.50"))
+
+    def test_line_change_cost_does_not_grow_with_cart(self):
+        """[Normal] saving a line costs the same for a 1 and 50 line cart"""
+
+        def cost(product):
+            with CaptureQueriesContext(connection) as ctx:
+                ProductOrder.objects.create(order=self.order, product=product, quantity=1)
+            return len(ctx.captured_queries)
+
+        small = cost(self.products[0])
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=self.order, product=product, quantity=1)
+            for product in self.products[1:50]
+        )
+        self.assertEqual(cost(self.products[50]), small)
+
+    def test_deferred_totals_update_once(self):
+        """[Normal] deferred_order_totals recomputes the total once at the end"""
+        with CaptureQueriesContext(connection) as ctx:
+            with deferred_order_totals():
+                for product in self.products[:10]:
+                    ProductOrder.objects.create(
+                        order=self.order, product=product, quantity=1
+                    )
+        updates = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "order_management_order"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal("15.00"))
@@ -0,0 +1,88 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from order_management.archive import archive_orders
+from order_management.models import ArchivedOrder, Order
+from order_management.tests.stub_user_service import StubUserService
+
+ADDRESS = {"id": 7, "receiver_name": "N", "province": "Bangkok", "post_code": "10200"}
+PAYMENT = {"id": 3, "method_type": "credit_card"}
+ROUTES = {"/api/address/7/": ADDRESS, "/api/payment/3/": PAYMENT}
+
+
+class OrderSummaryViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="sum", password="pass")
+        self.order = Order.objects.create(
+            customer=self.user, shipping_address_id=7, user_payment_method_id=3
+        )
+        self.auth = f"Bearer {AccessToken.for_user(self.user)}"
+        self.client.credentials(HTTP_AUTHORIZATION=self.auth)
+        self.url = reverse("order-summary", args=[self.order.id])
+
+    def test_summary_resolves_address_and_payment(self):
+        """[Normal] GET summary embeds user_service data, forwarding the caller's token"""
+        with StubUserService(routes=ROUTES) as stub:
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        data = resp.data["data"]
+        self.assertEqual(data["id"], self.order.id)
+        self.assertEqual(data["address"], ADDRESS)
+        self.assertEqual(data["user_payment_method"], PAYMENT)
+        self.assertEqual(
+            sorted(stub.calls),
+            [("/api/address/7/", self.auth), ("/api/payment/3/", self.auth)],
+        )
+
+    def test_lookups_run_concurrently(self):
+        """[Normal] address and payment lookups overlap instead of running back to back"""
+        with StubUserService(routes=ROUTES, delay=0.3):
+            start = time.perf_counter()
+            resp = self.client.get(self.url)
+            elapsed = time.perf_counter() - start
+        self.assertEqual(resp.status_code, 200)
+        self.assertLess(elapsed, 0.55)
+
+    def test_lookups_are_cached(self):
+        """[Normal] a repeated summary is served without calling user_service"""
+        with StubUserService(routes=ROUTES) as stub:
+            self.client.get(self.url)
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.data["data"]["address"], ADDRESS)
+        self.assertEqual(len(stub.calls), 2)
+
+    def test_user_service_down(self):
+        """[Invalid Input] an unreachable user_service leaves the lookups empty"""
+        with StubUserService(down=True), self.assertLogs(
+            "order_management.user_client", "WARNING"
+        ):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNone(resp.data["data"]["address"])
+        self.assertIsNone(resp.data["data"]["user_payment_method"])
+
+    def test_other_users_order(self):
+        """[Attack] GET summary of another user's order returns 404 without lookups"""
+        other = User.objects.create_user(username="other", password="pass")
+        order = Order.objects.create(customer=other, shipping_address_id=7)
+        with StubUserService(routes=ROUTES) as stub:
+            resp = self.client.get(reverse("order-summary", args=[order.id]))
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(stub.calls, [])
+
+    def test_archived_order(self):
+        """[Normal] GET summary of an archived order still resolves it"""
+        Order.objects.filter(pk=self.order.pk).update(status=Order.STATUS_SHIPPED)
+        archive_orders(timezone.now())
+        self.assertTrue(ArchivedOrder.objects.filter(pk=self.order.pk).exists())
+        with StubUserService(routes=ROUTES):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"]["id"], self.order.id)
+        self.assertEqual(resp.data["data"]["address"], ADDRESS)
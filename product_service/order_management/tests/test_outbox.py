@@ -0,0 +1,89 @@
+from datetime import date, timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from order_management.models import *
+from order_management.outbox import enqueue_email, send_pending_emails
+
+
+class ConfirmOrderOutboxTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="mailer", password="pass", email="buyer@example.com"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.shipping = Shipping.objects.create(method="Std", fee=5.0, tel="")
+        order = Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+        product = Product.objects.create(
+            name="Rice",
+            detail="d",
+            price=20.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        ProductOrder.objects.create(order=order, product=product, quantity=2)
+
+    def test_confirm_queues_email_without_sending(self):
+        """[Normal] confirming an order writes an outbox row and sends nothing"""
+        resp = self.client.post(
+            reverse("confirm-order"),
+            {
+                "address_id": 1,
+                "shipping_id": self.shipping.id,
+                "payment_method": Order.PAYMENT_COD,
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to_email, "buyer@example.com")
+        self.assertIn("Rice", queued.html_body)
+
+
+class SendOutboxEmailsTest(TestCase):
+    def setUp(self):
+        for i in range(3):
+            enqueue_email(f"u{i}@example.com", f"Subject {i}", "body", "<p>body</p>")
+
+    def test_sends_due_emails(self):
+        """[Normal] the worker sends every due email and marks it sent"""
+        self.assertEqual(send_pending_emails(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(
+            OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).exists()
+        )
+        self.assertEqual(send_pending_emails(), (0, 0))
+
+    def test_failure_is_retried_with_backoff(self):
+        """[Invalid Input] a failed send is rescheduled, then given up on"""
+        with mock.patch(
+            "django.core.mail.EmailMultiAlternatives.send",
+            side_effect=SMTPException("down"),
+        ):
+            self.assertEqual(send_pending_emails(max_attempts=2), (0, 3))
+            email = OutboxEmail.objects.first()
+            self.assertEqual(email.status, OutboxEmail.STATUS_PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertEqual(send_pending_emails(max_attempts=2), (0, 0))
+
+            OutboxEmail.objects.update(next_attempt_at=timezone.now() - timedelta(1))
+            send_pending_emails(max_attempts=2)
+        self.assertEqual(
+            OutboxEmail.objects.filter(status=OutboxEmail.STATUS_FAILED).count(), 3
+        )
+
+    def test_command_once_drains_outbox(self):
+        """[Normal] manage.py send_outbox_emails --once sends and exits"""
+        call_command("send_outbox_emails", "--once", "--batch-size", "2", stdout=mock.Mock())
+        self.assertEqual(len(mail.outbox), 3)
@@ -0,0 +1,71 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from order_management.models import Order, ProductOrder
+from product_management.models import Product
+from product_management.tests.query_plans import QueryPlanMixin, analyze
+
+CUSTOMERS = 600
+ORDERS_PER_CUSTOMER = 5
+PRODUCTS = 2000
+
+
+class OrderQueryPlanTest(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create(
+            User(username=f"customer{i}") for i in range(CUSTOMERS)
+        )
+        products = Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                detail="",
+                price=10.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(PRODUCTS)
+        )
+        orders = Order.objects.bulk_create(
+            Order(
+                customer=user,
+                status=Order.STATUS_CART if n == 0 else Order.STATUS_PAID,
+            )
+            for user in users
+            for n in range(ORDERS_PER_CUSTOMER)
+        )
+        ProductOrder.objects.bulk_create(
+            ProductOrder(
+                order=order, product=products[(i + n) % PRODUCTS], quantity=1
+            )
+            for i, order in enumerate(orders)
+            for n in range(2)
+        )
+        analyze(User, Product, Order, ProductOrder)
+        cls.user = users[CUSTOMERS // 2]
+        cls.cart = Order.objects.get(customer=cls.user, status=Order.STATUS_CART)
+        cls.product = cls.cart.items.first().product
+
+    def test_cart_lookup_uses_index(self):
+        """[Normal] finding a customer's cart searches an index"""
+        qs = Order.objects.filter(customer=self.user, status=Order.STATUS_CART)
+        self.assertNoFullScan(qs, Order)
+
+    def test_order_history_uses_index(self):
+        """[Normal] listing a customer's orders searches order_customer_status_idx"""
+        qs = Order.objects.filter(customer=self.user).with_items()
+        self.assertNoFullScan(qs, Order)
+
+    def test_cart_line_lookup_uses_index(self):
+        """[Normal] finding a product's line in a cart searches unique_product_per_order"""
+        qs = ProductOrder.objects.filter(order=self.cart, product=self.product)
+        self.assertNoFullScan(qs, ProductOrder)
+
+    def test_cart_lines_use_index(self):
+        """[Normal] loading a cart's products searches its lines by order"""
+        qs = Product.objects.filter(productorder__order=self.cart).order_by(
+            "productorder__id"
+        )
+        self.assertNoFullScan(qs, Product, ProductOrder)
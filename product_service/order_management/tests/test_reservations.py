@@ -0,0 +1,255 @@
+import io
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from order_management.models import Order, ProductOrder, Shipping, StockReservation
+from order_management import stock
+from order_management.stock import convert_holds, release_expired_holds
+from product_management.models import Product
+
+
+@override_settings(STOCK_RESERVATIONS=True, STOCK_RESERVATION_SECONDS=600)
+class StockReservationTest(APITestCase):
+    def setUp(self):
+        self.shipping = Shipping.objects.create(method="Std", fee=5.0, tel="")
+        self.products = [
+            Product.objects.create(
+                name=f"R{i}",
+                detail="d",
+                price=2.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(2)
+        ]
+        self.product = self.products[0]
+        self.client = self.client_for("buyer")
+        self.user = User.objects.get(username="buyer")
+
+    def client_for(self, username):
+        client = APIClient()
+        client.force_authenticate(
+            user=User.objects.create_user(username=username, password="pass", email="")
+        )
+        return client
+
+    def add(self, client, product, quantity):
+        return client.post(
+            reverse("add-to-cart"),
+            {"product_id": product.id, "quantity": quantity},
+            format="json",
+        )
+
+    def reserved(self, product=None):
+        return Product.objects.get(pk=(product or self.product).pk).reserved
+
+    def expire_holds(self):
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(1))
+
+    def confirm(self, client):
+        return client.post(
+            reverse("confirm-order"),
+            {
+                "address_id": 1,
+                "shipping_id": self.shipping.id,
+                "payment_method": Order.PAYMENT_COD,
+            },
+            format="json",
+        )
+
+    def test_add_to_cart_holds_stock(self):
+        """[Normal] adding to the cart holds the units until the TTL runs out"""
+        self.add(self.client, self.product, 2)
+        self.add(self.client, self.product, 1)
+        hold = StockReservation.objects.get()
+        self.assertEqual(hold.quantity, 3)
+        self.assertAlmostEqual(
+            hold.expires_at,
+            timezone.now() + timedelta(seconds=600),
+            delta=timedelta(seconds=10),
+        )
+        self.assertEqual(self.reserved(), 3)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 5)
+
+    def test_held_stock_is_not_available_to_others(self):
+        """[Invalid Input] a second cart cannot add more than stock minus holds"""
+        self.add(self.client, self.product, 4)
+        other = self.client_for("other")
+        resp = self.add(other, self.product, 2)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["error"], "Not enough stock (available 1)")
+        self.assertFalse(
+            ProductOrder.objects.filter(order__customer__username="other").exists()
+        )
+        self.assertEqual(self.add(other, self.product, 1).status_code, 201)
+        self.assertEqual(self.reserved(), 5)
+
+    def test_catalog_leaves_out_held_stock(self):
+        """[Normal] the catalog's stock and available leave out held units"""
+        cache.clear()
+        detail = reverse("product-detail", args=[self.product.id])
+        self.add(self.client, self.product, 5)
+        data = self.client.get(detail).data["data"]
+        self.assertEqual((data["stock"], data["available"]), (0, False))
+        resp = self.client.get(reverse("product-list"), {"available": "true"})
+        self.assertEqual([p["id"] for p in resp.data["data"]], [self.products[1].id])
+
+        self.client.delete(reverse("remove-from-cart", args=[self.product.id]))
+        data = self.client.get(detail).data["data"]
+        self.assertEqual((data["stock"], data["available"]), (5, True))
+
+    def test_update_and_remove_adjust_the_hold(self):
+        """[Normal] changing or removing a cart line changes its hold"""
+        self.add(self.client, self.product, 2)
+        url = f"/api/cart/update/{self.product.id}/"
+        resp = self.client.patch(url, {"quantity": 4}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"]["quantity"], 4)
+        self.assertEqual(self.reserved(), 4)
+
+        resp = self.client.patch(url, {"quantity": 6}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.reserved(), 4)
+        self.assertEqual(ProductOrder.objects.get().quantity, 4)
+
+        resp = self.client.delete(reverse("remove-from-cart", args=[self.product.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.reserved(), 0)
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_patch_items_is_all_or_nothing(self):
+        """[Invalid Input] one line short of held stock leaves every hold alone"""
+        self.add(self.client_for("other"), self.products[1], 4)
+        self.add(self.client, self.product, 1)
+        resp = self.client.patch(
+            reverse("cart-items"),
+            {
+                "items": [
+                    {"product_id": self.products[0].id, "quantity": 3},
+                    {"product_id": self.products[1].id, "quantity": 2},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("R1 (available 1)", resp.data["error"])
+        self.assertEqual((self.reserved(), self.reserved(self.products[1])), (1, 4))
+        self.assertEqual(ProductOrder.objects.get(order__customer=self.user).quantity, 1)
+
+    def test_checkout_converts_holds(self):
+        """[Normal] confirming takes the held units off stock and drops the holds"""
+        self.add(self.client, self.products[0], 2)
+        self.add(self.client, self.products[1], 5)
+        self.assertEqual(self.confirm(self.client).status_code, 200)
+        self.assertEqual(
+            list(
+                Product.objects.order_by("pk").values_list(
+                    "stock", "reserved", "available"
+                )
+            ),
+            [(3, 0, True), (0, 0, False)],
+        )
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_convert_holds_query_count(self):
+        """[Normal] converting holds costs the same for any number of lines"""
+        for product in self.products:
+            self.add(self.client, product, 1)
+        cart = Order.objects.get(customer=self.user)
+        # Lines, holds, one UPDATE of the products, one DELETE of the holds.
+        with self.assertNumQueries(4):
+            convert_holds(cart)
+
+    def test_sweeper_between_read_and_conversion(self):
+        """[Attack] a hold swept during checkout is not given back twice"""
+        self.add(self.client, self.product, 2)
+        self.add(self.client, self.products[1], 1)
+        cart = Order.objects.get(customer=self.user)
+        self.expire_holds()
+        take_held = stock._take_held
+
+        def sweep_first(*args):
+            # Only reachable without row locks: on PostgreSQL the sweeper
+            # skips the holds convert_holds has locked.
+            if patched.call_count == 1:
+                release_expired_holds()
+            return take_held(*args)
+
+        with mock.patch.object(stock, "_take_held", side_effect=sweep_first) as patched:
+            with transaction.atomic():
+                convert_holds(cart)
+        self.assertEqual(patched.call_count, 2)
+        products = Product.objects.filter(pk__in=[p.pk for p in self.products])
+        self.assertEqual(
+            sorted(products.values_list("stock", "reserved", "available")),
+            [(3, 0, True), (4, 0, True)],
+        )
+        self.assertFalse(StockReservation.objects.exists())
+
+    def test_sweeper_releases_expired_holds(self):
+        """[Normal] release_expired_holds gives expired holds back in bulk"""
+        self.add(self.client, self.products[0], 2)
+        self.add(self.client, self.products[1], 3)
+        self.add(self.client_for("other"), self.products[0], 1)
+        StockReservation.objects.filter(order__customer=self.user).update(
+            expires_at=timezone.now() - timedelta(1)
+        )
+        out = io.StringIO()
+        call_command("release_expired_holds", "--once", stdout=out)
+        self.assertIn("released 2 holds", out.getvalue())
+        self.assertEqual((self.reserved(), self.reserved(self.products[1])), (1, 0))
+        self.assertEqual(StockReservation.objects.count(), 1)
+
+    def test_expired_holds_are_released_when_stock_runs_short(self):
+        """[Normal] an abandoned cart's expired hold does not block other carts"""
+        self.add(self.client, self.product, 5)
+        self.expire_holds()
+        resp = self.add(self.client_for("other"), self.product, 3)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self.reserved(), 3)
+        self.assertFalse(
+            StockReservation.objects.filter(order__customer=self.user).exists()
+        )
+
+    def test_checkout_after_expiry_holds_again(self):
+        """[Normal] a cart whose hold was swept is held again at checkout"""
+        self.add(self.client, self.product, 2)
+        self.expire_holds()
+        call_command("release_expired_holds", "--once", stdout=io.StringIO())
+        self.assertEqual(self.confirm(self.client).status_code, 200)
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEqual((product.stock, product.reserved), (3, 0))
+
+    def test_checkout_after_expiry_fails_when_stock_is_gone(self):
+        """[Invalid Input] a swept hold whose stock was taken fails checkout"""
+        self.add(self.client, self.product, 2)
+        self.expire_holds()
+        self.add(self.client_for("other"), self.product, 4)
+        resp = self.confirm(self.client)
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("Available: 1", resp.data["error"])
+        cart = Order.objects.get(customer=self.user)
+        self.assertEqual(cart.status, Order.STATUS_CART)
+        self.assertEqual(self.reserved(), 4)
+
+    def test_deleting_a_cart_releases_its_holds(self):
+        """[Normal] deleting an order, e.g. in the admin, gives its holds back"""
+        self.add(self.client, self.product, 3)
+        Order.objects.get(customer=self.user).delete()
+        self.assertEqual(self.reserved(), 0)
+
+    def test_hold_cannot_exceed_stock(self):
+        """[Attack] a quantity over the whole stock is refused without a hold"""
+        resp = self.add(self.client, self.product, 50)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.reserved(), 0)
+        self.assertFalse(StockReservation.objects.exists())
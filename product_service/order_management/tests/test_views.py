@@ -3,8 +3,12 @@ from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from product_management.models import *
 from order_management.models import *
+from order_management.stock import reserve_stock
 from datetime import date
 from rest_framework.test import APIClient
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
 
 
 class OrderAPITest(APITestCase):
@@ -61,6 +65,22 @@ class UserOrderListViewTest(APITestCase):
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, 200)
 
+    async def test_user_order_list_under_asgi(self):
+        """[Normal] GET /api/history/ is served by the ASGI handler"""
+        await Order.objects.acreate(customer=self.user)
+        token = AccessToken.for_user(self.user)
+        token["username"] = self.user.username
+        resp = await self.async_client.get(
+            reverse("user-orders"), headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.json()["orders"]), 1)
+
+    async def test_user_order_list_requires_token_under_asgi(self):
+        """[Attack] GET /api/history/ without a token returns 401 under ASGI"""
+        resp = await self.async_client.get(reverse("user-orders"))
+        self.assertEqual(resp.status_code, 401)
+
 
 class CartOrderViewTest(APITestCase):
     def setUp(self):
@@ -180,3 +200,241 @@ class PaymentByOrderViewTest(APITestCase):
         url = reverse("payment-by-order", args=[999])
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, 404)
+
+
+class OrderQueryCountTest(APITestCase):
+    """Order endpoints run a fixed number of queries however many orders exist."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="qcount", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.shipping = Shipping.objects.create(method="Std", fee=5.0, tel="")
+        self.product = Product.objects.create(
+            name="Bulk",
+            detail="d",
+            price=2.0,
+            stock=1000,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+
+    def add_orders(self, count, status=Order.STATUS_PENDING):
+        orders = Order.objects.bulk_create(
+            Order(customer=self.user, shipping=self.shipping, status=status)
+            for _ in range(count)
+        )
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=self.product, quantity=2)
+            for order in orders
+        )
+        return orders
+
+    def make_products(self, count):
+        return Product.objects.bulk_create(
+            Product(
+                name=f"P{i}",
+                detail="d",
+                price=1.0,
+                stock=10,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(count)
+        )
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_history_query_count_is_constant(self):
+        """[Normal] GET /api/history/ costs the same for 1 and 500 orders"""
+        self.add_orders(1)
+        single = self.count_queries(reverse("user-orders"))
+        self.add_orders(499)
+        self.assertEqual(self.count_queries(reverse("user-orders")), single)
+
+    def test_cart_query_count_is_constant(self):
+        """[Normal] GET /api/cart/ costs the same for 1 and 500 cart lines"""
+        (cart,) = self.add_orders(1, status=Order.STATUS_CART)
+        single = self.count_queries(reverse("cart-orders"))
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=cart, product=product, quantity=1)
+            for product in self.make_products(499)
+        )
+        self.assertEqual(self.count_queries(reverse("cart-orders")), single)
+
+    def test_order_detail_query_count(self):
+        """[Normal] GET /api/order/<id>/ does not query per item"""
+        (order,) = self.add_orders(1)
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=product, quantity=1)
+            for product in self.make_products(50)
+        )
+        with self.assertNumQueries(2):
+            resp = self.client.get(reverse("order-detail", args=[order.id]))
+        self.assertEqual(len(resp.data["items"]), 51)
+
+    def test_products_in_order_query_count(self):
+        """[Normal] GET /api/orders/products/<id> does not query per item"""
+        (order,) = self.add_orders(1)
+        single = self.count_queries(reverse("products-in-orders", args=[order.id]))
+        ProductOrder.objects.bulk_create(
+            ProductOrder(order=order, product=product, quantity=1)
+            for product in self.make_products(50)
+        )
+        self.assertEqual(
+            self.count_queries(reverse("products-in-orders", args=[order.id])),
+            single,
+        )
+
+
+class ConfirmOrderStockTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="stock", password="pass", email=""
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.shipping = Shipping.objects.create(method="Std", fee=5.0, tel="")
+        self.order = Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+        self.products = []
+        for i, stock in enumerate((5, 2, 3)):
+            product = Product.objects.create(
+                name=f"S{i}",
+                detail="d",
+                price=1.0,
+                stock=stock,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            ProductOrder.objects.create(order=self.order, product=product, quantity=2)
+            self.products.append(product)
+        self.payload = {
+            "address_id": 1,
+            "shipping_id": self.shipping.id,
+            "payment_method": Order.PAYMENT_COD,
+        }
+
+    def test_confirm_deducts_stock(self):
+        """[Normal] confirming deducts stock and updates availability"""
+        resp = self.client.post(reverse("confirm-order"), self.payload, format="json")
+        self.assertEqual(resp.status_code, 200)
+        stocks = [
+            (p.stock, p.available)
+            for p in Product.objects.order_by("pk").filter(pk__in=[p.pk for p in self.products])
+        ]
+        self.assertEqual(stocks, [(3, True), (0, False), (1, True)])
+
+    def test_insufficient_stock_changes_nothing(self):
+        """[Invalid Input] one short line leaves all stock and the cart untouched"""
+        Product.objects.filter(pk=self.products[1].pk).update(stock=1)
+        resp = self.client.post(reverse("confirm-order"), self.payload, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("S1", resp.data["error"])
+        self.assertEqual(
+            list(Product.objects.order_by("pk").values_list("stock", flat=True)),
+            [5, 1, 3],
+        )
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_CART)
+
+    def test_reserve_stock_query_count(self):
+        """[Normal] reserving stock costs the same for any number of lines"""
+        with self.assertNumQueries(3):
+            reserve_stock(self.order)
+
+
+class CartUpsertTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="upsert", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f"C{i}",
+                detail="d",
+                price=2.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(3)
+        ]
+
+    def add(self, product, quantity):
+        return self.client.post(
+            reverse("add-to-cart"),
+            {"product_id": product.id, "quantity": quantity},
+            format="json",
+        )
+
+    def test_repeated_add_increments_one_line(self):
+        """[Normal] adding the same product twice keeps one line and one cart"""
+        self.add(self.products[0], 2)
+        resp = self.add(self.products[0], 3)
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data["data"]["quantity"], 5)
+        cart = Order.objects.get(customer=self.user, status=Order.STATUS_CART)
+        self.assertEqual(cart.items.count(), 1)
+        self.assertEqual(cart.total_price, 10)
+
+    def test_add_over_stock_returns_400(self):
+        """[Invalid Input] adding past the stock returns 400 and keeps the line"""
+        self.add(self.products[0], 4)
+        resp = self.add(self.products[0], 2)
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(ProductOrder.objects.get().quantity, 4)
+
+    def test_second_cart_is_rejected(self):
+        """[Attack] the database refuses a second cart for the same user"""
+        Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Order.objects.create(customer=self.user, status=Order.STATUS_CART)
+
+    def test_patch_items_updates_many_lines(self):
+        """[Normal] PATCH /api/cart/items/ adds, changes and removes in one call"""
+        self.add(self.products[0], 1)
+        self.add(self.products[1], 1)
+        resp = self.client.patch(
+            reverse("cart-items"),
+            {
+                "items": [
+                    {"product_id": self.products[0].id, "quantity": 3},
+                    {"product_id": self.products[1].id, "quantity": 0},
+                    {"product_id": self.products[2].id, "quantity": 2},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        lines = {item["product"]: item["quantity"] for item in resp.data["data"]["items"]}
+        self.assertEqual(lines, {self.products[0].id: 3, self.products[2].id: 2})
+        self.assertEqual(float(resp.data["data"]["total_price"]), 10.0)
+
+    def test_patch_items_is_all_or_nothing(self):
+        """[Invalid Input] one bad line leaves the whole cart unchanged"""
+        self.add(self.products[0], 1)
+        resp = self.client.patch(
+            reverse("cart-items"),
+            {
+                "items": [
+                    {"product_id": self.products[0].id, "quantity": 3},
+                    {"product_id": self.products[1].id, "quantity": 6},
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(ProductOrder.objects.get().quantity, 1)
+
+    def test_patch_items_rejects_negative_quantity(self):
+        """[Attack] negative quantities are rejected"""
+        resp = self.client.patch(
+            reverse("cart-items"),
+            {"items": [{"product_id": self.products[0].id, "quantity": -1}]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 400)
@@ -0,0 +1,215 @@
+"""
+HTTP client for the parts of user_service that product_service reads.
+
+Every call goes through one process-wide ``requests.Session``, so
+connections to user_service are pooled and kept alive rather than opened
+per request. Independent lookups run concurrently on a small thread pool.
+Lookups made on behalf of a user forward that user's ``Authorization``
+header, so user_service still enforces ownership.
+
+Async views use the ``a``-prefixed functions instead. They share a pooled
+``httpx.AsyncClient`` per event loop and never block the loop.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_session = None
+_executor = None
+_async_clients = weakref.WeakKeyDictionary()
+
+# Transport for new async clients; tests swap in an in-process stub.
+async_transport = None
+
+
+class UserServiceError(Exception):
+    pass
+
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            pool_size = getattr(settings, "USER_SERVICE_POOL_SIZE", 10)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "USER_SERVICE_POOL_SIZE", 10),
+                thread_name_prefix="user-service",
+            )
+        return _executor
+
+
+def fetch(path, authorization):
+    """
+    GET ``path`` from user_service and return its ``data`` payload.
+
+    Returns ``None`` when user_service answers 404 and raises
+    ``UserServiceError`` when it cannot be reached or answers with an error.
+    """
+    try:
+        resp = get_session().get(
+            _url(path),
+            headers={"Authorization": authorization},
+            timeout=getattr(settings, "USER_SERVICE_TIMEOUT", (1, 3)),
+        )
+    except requests.RequestException as e:
+        raise UserServiceError(f"GET {path} failed: {e}") from e
+    return _data(path, resp)
+
+
+def _url(path):
+    return settings.USER_SERVICE_URL.rstrip("/") + path
+
+
+def _data(path, resp):
+    # Works for both requests and httpx responses.
+    if resp.status_code == 404:
+        return None
+    if resp.status_code != 200:
+        raise UserServiceError(f"GET {path} returned {resp.status_code}")
+    try:
+        return resp.json()["data"]
+    except (ValueError, KeyError) as e:
+        raise UserServiceError(f"GET {path} returned an invalid body") from e
+
+
+def fetch_cached(path, user_id, authorization):
+    """
+    ``fetch`` behind a short TTL cache. Keys include the user id so one
+    user's lookup is never served to another. Misses are not cached.
+    """
+    key = f"user_service:{user_id}:{path}"
+    data = cache.get(key)
+    if data is None:
+        data = fetch(path, authorization)
+        if data is not None:
+            cache.set(key, data, getattr(settings, "USER_SERVICE_CACHE_TIMEOUT", 60))
+    return data
+
+
+def start_fetches(paths, user_id, authorization, cached=True):
+    """
+    Start fetching several user_service paths on the thread pool and return
+    the pending futures, so the caller can do its own work meanwhile.
+    Pass ``cached=False`` for lists the user edits, where a stale copy
+    would hide their change.
+    """
+    executor = _get_executor()
+    futures = {}
+    for path in dict.fromkeys(paths):
+        if not path:
+            continue
+        if cached:
+            futures[path] = executor.submit(fetch_cached, path, user_id, authorization)
+        else:
+            futures[path] = executor.submit(fetch, path, authorization)
+    return futures
+
+
+def collect(futures):
+    """
+    Wait for ``start_fetches`` futures and return ``{path: data}``. A lookup
+    that fails is logged and maps to ``None``, so one slow or broken
+    endpoint does not fail the whole page.
+    """
+    results = {}
+    for path, future in futures.items():
+        try:
+            results[path] = future.result()
+        except UserServiceError as e:
+            logger.warning("user_service lookup failed: %s", e)
+            results[path] = None
+    return results
+
+
+def fetch_many(paths, user_id, authorization, cached=True):
+    """Fetch several user_service paths concurrently; see ``collect``."""
+    return collect(start_fetches(paths, user_id, authorization, cached))
+
+
+def get_async_client():
+    # An AsyncClient's connections belong to the loop that opened them.
+    # Under ASGI that is one loop per worker; under WSGI each async view
+    # runs in a loop of its own.
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        connect, read = getattr(settings, "USER_SERVICE_TIMEOUT", (1, 3))
+        pool_size = getattr(settings, "USER_SERVICE_POOL_SIZE", 10)
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            transport=async_transport,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def afetch(path, authorization):
+    """Async ``fetch``."""
+    try:
+        resp = await get_async_client().get(
+            _url(path), headers={"Authorization": authorization}
+        )
+    except httpx.HTTPError as e:
+        # httpx timeouts carry no message of their own.
+        raise UserServiceError(f"GET {path} failed: {e!r}") from e
+    return _data(path, resp)
+
+
+async def afetch_cached(path, user_id, authorization):
+    """Async ``fetch_cached``."""
+    key = f"user_service:{user_id}:{path}"
+    data = await cache.aget(key)
+    if data is None:
+        data = await afetch(path, authorization)
+        if data is not None:
+            await cache.aset(
+                key, data, getattr(settings, "USER_SERVICE_CACHE_TIMEOUT", 60)
+            )
+    return data
+
+
+async def afetch_many(paths, user_id, authorization, cached=True):
+    """Async ``fetch_many``: the lookups run concurrently on the event loop."""
+    paths = [path for path in dict.fromkeys(paths) if path]
+    if cached:
+        lookups = [afetch_cached(path, user_id, authorization) for path in paths]
+    else:
+        lookups = [afetch(path, authorization) for path in paths]
+    results = {}
+    for path, result in zip(
+        paths, await asyncio.gather(*lookups, return_exceptions=True)
+    ):
+        if isinstance(result, UserServiceError):
+            logger.warning("user_service lookup failed: %s", result)
+            result = None
+        elif isinstance(result, BaseException):
+            raise result
+        results[path] = result
+    return results
@@ -1,34 +1,72 @@
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from order_management.models import *
 from order_management.serializers import *
+from order_management.stock import (
+    InsufficientStock,
+    convert_holds,
+    holds_enabled,
+    reserve_stock,
+)
+from order_management.outbox import enqueue_email
+from order_management.cart import CartError, add_to_cart, get_cart, set_cart_quantities
+from order_management.history import (
+    OrderHistoryPagination,
+    aiterate,
+    filter_history,
+    iter_history_json,
+    order_history,
+    select_fields,
+)
+from order_management.user_client import afetch_many, collect, start_fetches
+from product_management.filters import TRUE_VALUES
 from product_management.serializers import ProductSerializer
+from product_management.cache import SHIPPING, get_or_build, make_key
+from product_service.authentication import cached_user
+from product_service.sparse import requested_fields
 from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
 
 # pun add
-from django.core.mail import send_mail
 from django.conf import settings  # เพื่อใช้ EMAIL_HOST_USER
 from django.template.loader import render_to_string  # สำหรับ HTML email (ทางเลือก)
 
 # from user_service.user_management.models import *
 # Render HTML email
 from django.template.loader import render_to_string
-from django.core.mail import send_mail
 from django.utils.html import strip_tags
 
-# Get address details from user_service
-import requests
 
-
-class UserOrderListView(APIView):
+class UserOrderListView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    stream_chunk_size = 100
 
-    def get(self, request):
-        orders = Order.objects.filter(customer=request.user)
-        serializer = OrderHistorySerializer(orders, many=True)
-        return Response({"orders": serializer.data})
+    async def get(self, request):
+        try:
+            qs = filter_history(order_history(request.user), request.query_params)
+            fields = requested_fields(request.query_params, OrderHistorySerializer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        if request.query_params.get("stream", "").lower() in TRUE_VALUES:
+            chunks = iter_history_json(qs, self.stream_chunk_size, fields)
+            # A WSGI server iterates the response itself, in a thread of its
+            # own; under ASGI each chunk is read in the ORM thread.
+            if isinstance(request._request, ASGIRequest):
+                chunks = aiterate(chunks)
+            return StreamingHttpResponse(chunks, content_type="application/json")
+
+        paginator = OrderHistoryPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(
+            select_fields(qs, fields), request, view=self
+        )
+        serializer = OrderHistorySerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
 
 
 class CartOrderView(APIView):
@@ -37,7 +75,7 @@ class CartOrderView(APIView):
     def get(self, request):
         cart_orders = Order.objects.filter(
             customer=request.user, status=Order.STATUS_CART
-        )
+        ).with_items()
         serializer = OrderSerializer(cart_orders, many=True)
         return Response({"cart_orders": serializer.data})
 
@@ -46,15 +84,22 @@ class ProductsInUserOrdersView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, order_id):
-        try:
-            order = Order.objects.get(id=order_id, customer=request.user)
-        except Order.DoesNotExist:
+        if Order.objects.filter(id=order_id, customer=request.user).exists():
+            line = "productorder"
+        elif ArchivedOrder.objects.filter(
+            id=order_id, customer=request.user
+        ).exists():
+            line = "archivedproductorder"
+        else:
             return Response(
                 {"error": "Order not found or not belongs to the user"}, status=404
             )
 
-        product_orders = ProductOrder.objects.filter(order=order)
-        products = [po.product for po in product_orders]
+        products = (
+            Product.objects.filter(**{f"{line}__order": order_id})
+            .order_by(f"{line}__id")
+            .prefetch_related("categories")
+        )
 
         serializer = ProductSerializer(products, many=True)
         return Response({"products": serializer.data})
@@ -65,14 +110,57 @@ class OrderDetailView(APIView):
 
     def get(self, request, id, format=None):
         try:
-            order = Order.objects.get(pk=id, customer=request.user)
+            order = Order.objects.with_items().get(pk=id, customer=request.user)
         except Order.DoesNotExist:
-            return Response({"detail": "Order not found"}, status=404)
+            order = (
+                ArchivedOrder.objects.with_items()
+                .filter(pk=id, customer=request.user)
+                .first()
+            )
+            if order is None:
+                return Response({"detail": "Order not found"}, status=404)
 
         serializer = OrderDetailSerializer(order)
         return Response(serializer.data, status=200)
 
 
+class OrderSummaryView(AsyncAPIView):
+    """
+    Order detail with the shipping address and saved payment method resolved
+    from user_service, so the summary page needs a single request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request, id, format=None):
+        try:
+            order = await Order.objects.with_items().aget(pk=id, customer=request.user)
+        except Order.DoesNotExist:
+            order = (
+                await ArchivedOrder.objects.with_items()
+                .filter(pk=id, customer=request.user)
+                .afirst()
+            )
+            if order is None:
+                return Response({"error": "Order not found"}, status=404)
+
+        address_path = payment_path = None
+        if order.shipping_address_id:
+            address_path = f"/api/address/{order.shipping_address_id}/"
+        if order.user_payment_method_id:
+            payment_path = f"/api/payment/{order.user_payment_method_id}/"
+        resolved = await afetch_many(
+            [address_path, payment_path],
+            request.user.pk,
+            request.headers.get("Authorization", ""),
+        )
+
+        data = OrderDetailSerializer(order).data
+        data["address"] = resolved.get(address_path)
+        data["user_payment_method"] = resolved.get(payment_path)
+        return Response({"data": data})
+
+
 class AddToCartView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -85,18 +173,10 @@ class AddToCartView(APIView):
 
         product = get_object_or_404(Product, pk=product_id)
 
-        order, created = Order.objects.get_or_create(
-            customer=request.user,
-            status=Order.STATUS_CART,
-            defaults={"shipping": None, "total_price": 0},
-        )
-
-        prod_order, po_created = ProductOrder.objects.get_or_create(
-            order=order, product=product, defaults={"quantity": quantity}
-        )
-        if not po_created:
-            prod_order.quantity += quantity
-            prod_order.save()
+        try:
+            prod_order = add_to_cart(get_cart(request.user), product, quantity)
+        except CartError as e:
+            return Response({"error": str(e)}, status=400)
 
         serializer = ProductOrderSerializer(prod_order)
         return Response(
@@ -126,7 +206,11 @@ class RemoveFromCartView(APIView):
         if not product_order:
             return Response({"error": "Product not in cart"}, status=404)
 
-        product_order.delete()
+        if holds_enabled():
+            # Also releases the product's stock hold.
+            set_cart_quantities(order, {product.pk: 0})
+        else:
+            product_order.delete()
 
         return Response({"message": "Product removed from cart"}, status=200)
 
@@ -153,14 +237,26 @@ class UpdateCartItemView(APIView):
         except (TypeError, ValueError):
             return Response({"error": "Invalid quantity"}, status=404)
 
+        if holds_enabled():
+            # Holds the new quantity, or releases the hold when it is 0.
+            try:
+                set_cart_quantities(order, {prod_order.product_id: max(new_qty, 0)})
+            except CartError as e:
+                return Response({"error": str(e)}, status=400)
+            if new_qty < 1:
+                return Response({"message": "Product removed from cart"}, status=200)
+            prod_order.refresh_from_db()
+            serializer = ProductOrderSerializer(prod_order)
+            return Response({"message": "Quantity updated", "data": serializer.data})
+
         if new_qty < 1:
             prod_order.delete()
             return Response({"message": "Product removed from cart"}, status=200)
 
         product = get_object_or_404(Product, pk=product_id)
-        if product.stock < new_qty:
+        if product.available_stock < new_qty:
             return Response(
-                {"error": f"Not enough stock (available {product.stock})"},
+                {"error": f"Not enough stock (available {product.available_stock})"},
                 status=400,
             )
 
@@ -171,6 +267,27 @@ class UpdateCartItemView(APIView):
         return Response({"message": "Quantity updated", "data": serializer.data})
 
 
+class CartItemsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request, format=None):
+        serializer = CartItemsUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = {
+            item["product_id"]: item["quantity"]
+            for item in serializer.validated_data["items"]
+        }
+
+        cart = get_cart(request.user)
+        try:
+            set_cart_quantities(cart, quantities)
+        except CartError as e:
+            return Response({"error": str(e)}, status=400)
+
+        serializer = OrderSerializer(Order.objects.with_items().get(pk=cart.pk))
+        return Response({"message": "Cart updated", "data": serializer.data})
+
+
 # class ConfirmOrderView(APIView):
 #     permission_classes = [IsAuthenticated]
 
@@ -217,17 +334,15 @@ class ConfirmOrderView(APIView):
         if not product_orders.exists():
             return Response({"error": "Cannot confirm an empty order."}, status=400)
 
-        for po in product_orders:
-            product = Product.objects.select_for_update().get(pk=po.product.pk)
-            if product.stock < po.quantity:
-                return Response(
-                    {
-                        "error": f"Not enough stock for {product.name} (Available: {product.stock}). Order not confirmed."
-                    },
-                    status=400,
-                )
-            product.stock -= po.quantity
-            product.save()
+        try:
+            if holds_enabled():
+                convert_holds(order)
+            else:
+                reserve_stock(order)
+        except InsufficientStock as e:
+            # Roll back the status change made by serializer.save() as well.
+            transaction.set_rollback(True)
+            return Response({"error": f"{e} Order not confirmed."}, status=400)
 
         # 3. Update Order Status
         order.status = Order.STATUS_PENDING
@@ -245,78 +360,119 @@ class ConfirmOrderView(APIView):
                     f"Warning: Payment model not found or imported for QR payment creation for order {order.id}"
                 )
 
-        # 5. Send Confirmation Email
-        try:
-            customer_email = request.user.email
-            if customer_email:
-                subject = f"ยืนยันคำสั่งซื้อหมายเลข #{order.id}"
-
-                # Prepare items data
-                items = []
-                total_items = 0
-                for po in product_orders:
-                    item_total = po.quantity * po.product.price
-                    items.append(
-                        {
-                            "name": po.product.name,
-                            "quantity": po.quantity,
-                            "price": po.product.price,
-                            "total": item_total,
-                        }
-                    )
-                    total_items += po.quantity
-
-                html_message = render_to_string(
-                    "order_confirmation_email.html",
+        # 5. Queue Confirmation Email, sent by `manage.py send_outbox_emails`
+        # once this transaction commits, so checkout never waits on SMTP.
+        customer_email = request.user.email
+        if customer_email:
+            # Prepare items data
+            items = []
+            total_items = 0
+            for po in order.items.select_related("product"):
+                items.append(
                     {
-                        "order": order,
-                        "user": request.user,
-                        "items": items,
-                        "total_items": total_items,
-                        "shipping_fee": order.shipping.fee if order.shipping else 0,
-                        "total_price": order.total_price,
-                    },
+                        "name": po.product.name,
+                        "quantity": po.quantity,
+                        "price": po.product.price,
+                        "total": po.total_price,
+                    }
                 )
-
-                # Send email
-                send_mail(
-                    subject,
-                    strip_tags(html_message),  # Plain text version
-                    "mealofhope.official@gmail.com",
-                    [customer_email],
-                    html_message=html_message,  # HTML version
-                    fail_silently=False,
-                )
-                print(f"ส่งอีเมลยืนยันคำสั่งซื้อไปยัง {customer_email} สำหรับคำสั่งซื้อ #{order.id}")
-            else:
-                print(
-                    f"ไม่พบอีเมลของผู้ใช้ {request.user.username} (ID: {request.user.id}) สำหรับคำสั่งซื้อ {order.id}"
-                )
-        except Exception as e:
-            print(f"เกิดข้อผิดพลาดในการส่งอีเมลยืนยันคำสั่งซื้อ {order.id}: {e}")
+                total_items += po.quantity
+
+            html_message = render_to_string(
+                "order_confirmation_email.html",
+                {
+                    "order": order,
+                    # The greeting uses first_name, which is not in the token.
+                    "user": cached_user(request.user.pk) or request.user,
+                    "items": items,
+                    "total_items": total_items,
+                    "shipping_fee": order.shipping.fee if order.shipping else 0,
+                    "total_price": order.total_price,
+                },
+            )
+            enqueue_email(
+                customer_email,
+                f"ยืนยันคำสั่งซื้อหมายเลข #{order.id}",
+                strip_tags(html_message),  # Plain text version
+                html_body=html_message,
+                from_email="mealofhope.official@gmail.com",
+            )
+        else:
+            print(
+                f"ไม่พบอีเมลของผู้ใช้ {request.user.username} (ID: {request.user.id}) สำหรับคำสั่งซื้อ {order.id}"
+            )
 
         return Response(
             {
                 "order_id": order.id,
-                "message": "Order confirmed successfully. Confirmation email sent.",
+                "message": "Order confirmed successfully. Confirmation email queued.",
             },
             status=200,
         )
 
 
+def shipping_options():
+    def build():
+        return ShippingSerializer(Shipping.objects.all(), many=True).data
+
+    return get_or_build(make_key(SHIPPING, "list"), build)
+
+
 class ShippingListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        shipping_methods = Shipping.objects.all()
-        serializer = ShippingSerializer(shipping_methods, many=True)
-        return Response({"data": serializer.data})
+        return Response({"data": shipping_options()})
+
+
+def defaults_first(items):
+    return sorted(items or [], key=lambda item: not item.get("is_default"))
+
+
+class CheckoutContextView(APIView):
+    """
+    Everything the checkout page needs in one response: the cart with its
+    product lines, the user's addresses and payment methods (defaults first)
+    and the shipping options.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # user_service lists are fetched while the cart is read from the DB.
+        # They are not cached: a user who just added an address must see it.
+        pending = start_fetches(
+            ["/api/address/", "/api/payment/"],
+            request.user.pk,
+            request.headers.get("Authorization", ""),
+            cached=False,
+        )
+        cart = Order.objects.filter(
+            customer=request.user, status=Order.STATUS_CART
+        ).with_items()
+        if holds_enabled():
+            # The lines' stock adds back what the cart itself holds.
+            cart = cart.prefetch_related("holds")
+        cart = cart.first()
+        data = {
+            "cart": CheckoutCartSerializer(cart).data if cart else None,
+            "shipping_options": shipping_options(),
+        }
+        resolved = collect(pending)
+        data["addresses"] = defaults_first(resolved["/api/address/"])
+        data["payment_methods"] = defaults_first(resolved["/api/payment/"])
+        return Response({"data": data})
 
 
 class PaymentByOrderView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, order_id):
-        payment = get_object_or_404(Payment, order_id=order_id)
+        payment = (
+            Payment.objects.filter(order_id=order_id).first()
+            or ArchivedPayment.objects.filter(order_id=order_id).first()
+        )
+        if payment is None:
+            raise Http404
         serializer = PaymentSerializer(payment)
         return Response({"data": serializer.data})
@@ -0,0 +1,323 @@
+"""
+Bulk import and export of the product catalog.
+
+Files are CSV or JSON Lines with the columns in ``FIELDS``. In CSV the
+categories are joined with ``|``; in JSON Lines they are a list. Export
+also writes each product's ``id``, which import ignores.
+
+Import upserts on ``name``: a row updates every product with that name,
+or creates one when there is none. Rows are written in batches, through
+``COPY`` into a staging table on PostgreSQL and ``bulk_create`` /
+``bulk_update`` elsewhere. When a row has a ``categories`` column, the
+product's categories are replaced by those listed, and categories that do
+not exist yet are created. Without the column they are left alone.
+
+Neither path calls ``Product.save()`` or sends model signals, so
+``available`` is derived here the same way ``save()`` derives it and the
+catalog cache is invalidated once per batch.
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+from product_management.cache import CATALOG, invalidate, product_namespace
+from product_management.models import Category, Product
+
+FIELDS = (
+    "name",
+    "detail",
+    "price",
+    "stock",
+    "production_date",
+    "expiration_date",
+    "address",
+    "categories",
+)
+# Product columns an import writes, in staging table order.
+COLUMNS = FIELDS[:-1]
+CATEGORY_SEPARATOR = "|"
+FORMATS = ("csv", "jsonl")
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows(self):
+        return self.created + self.updated
+
+
+def detect_format(path):
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def read_records(stream, fmt):
+    """Yield ``(line number, record dict)`` from a CSV or JSON Lines file."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        yield line_number, record
+
+
+def _text(record, name, required=False):
+    value = record.get(name)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"{name} is required.")
+    max_length = Product._meta.get_field(name).max_length
+    if len(value) > max_length:
+        raise ValueError(f"{name} is longer than {max_length} characters.")
+    return value
+
+
+def _number(record, name, cast):
+    try:
+        return cast(record.get(name))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number.")
+
+
+def _date(record, name):
+    value = record.get(name)
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{name} must be a YYYY-MM-DD date.")
+
+
+def _categories(record):
+    value = record.get("categories")
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(CATEGORY_SEPARATOR)
+    if not isinstance(value, list):
+        raise ValueError("categories must be a list.")
+    names = [str(name).strip() for name in value]
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def parse_record(record):
+    """
+    Turn a raw record into a row of typed values. Raises ``ValueError``
+    with a message fit for the import report when a value is missing or
+    malformed.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object.")
+    row = {
+        "name": _text(record, "name", required=True),
+        "detail": _text(record, "detail"),
+        "price": _number(record, "price", float),
+        "stock": _number(record, "stock", int),
+        "production_date": _date(record, "production_date"),
+        "expiration_date": _date(record, "expiration_date"),
+        "address": _text(record, "address"),
+        "categories": _categories(record),
+    }
+    row["available"] = row["stock"] > 0
+    return row
+
+
+def import_products(records, batch_size=1000, use_copy=None):
+    """
+    Upsert ``(line number, record)`` pairs from ``read_records`` in batches
+    of ``batch_size``, each in its own transaction. Malformed records are
+    skipped and reported in ``ImportResult.errors``. ``use_copy`` defaults
+    to whether the database supports ``COPY``.
+    """
+    if use_copy is None:
+        use_copy = connection.vendor == "postgresql"
+    result = ImportResult()
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        rows = {}
+        for line_number, record in batch:
+            try:
+                row = parse_record(record)
+            except ValueError as e:
+                result.errors.append((line_number, str(e)))
+                continue
+            # The last row for a name wins, as it would one save at a time.
+            rows.pop(row["name"], None)
+            rows[row["name"]] = row
+        if rows:
+            created, updated = _write_batch(list(rows.values()), use_copy)
+            result.created += created
+            result.updated += updated
+    return result
+
+
+def _write_batch(rows, use_copy):
+    with transaction.atomic():
+        if use_copy:
+            created_ids, updated_ids = _copy_products(rows)
+        else:
+            created_ids, updated_ids = _save_products(rows)
+        _set_categories(rows, created_ids, updated_ids)
+        # New ids too: a detail request made before the import caches the
+        # missing product as empty under its id.
+        changed = [*created_ids.values(), *updated_ids.values()]
+        invalidate(CATALOG, *[product_namespace(pk) for ids in changed for pk in ids])
+    return len(created_ids), len(updated_ids)
+
+
+def _save_products(rows):
+    """Return ``{name: [id]}`` for the products created and updated."""
+    existing = defaultdict(list)
+    for product in Product.objects.filter(name__in=[row["name"] for row in rows]):
+        existing[product.name].append(product)
+
+    now = timezone.now()
+    created, updated = [], []
+    for row in rows:
+        values = {column: row[column] for column in COLUMNS}
+        values["available"] = row["available"]
+        matches = existing.get(row["name"])
+        if not matches:
+            created.append(Product(**values))
+            continue
+        for product in matches:
+            for column, value in values.items():
+                setattr(product, column, value)
+            product.available = product.available_stock > 0
+            product.updated_at = now
+            updated.append(product)
+
+    Product.objects.bulk_create(created)
+    Product.objects.bulk_update(
+        updated, [*COLUMNS[1:], "available", "updated_at"], batch_size=500
+    )
+    return _ids_by_name(created), _ids_by_name(updated)
+
+
+def _ids_by_name(products):
+    ids = defaultdict(list)
+    for product in products:
+        ids[product.name].append(product.id)
+    return ids
+
+
+def _copy_products(rows):
+    """``_save_products`` for PostgreSQL, through a staging table."""
+    table = connection.ops.quote_name(Product._meta.db_table)
+    columns = ", ".join(COLUMNS)
+    assignments = ", ".join(f"{column} = i.{column}" for column in COLUMNS[1:])
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in COLUMNS])
+    buffer.seek(0)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMP TABLE product_import ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {table} WITH NO DATA"
+        )
+        cursor.copy_expert(
+            # An empty CSV field is NULL unless FORCE_NOT_NULL says otherwise.
+            f"COPY product_import ({columns}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL (detail, address))",
+            buffer,
+        )
+        # ``available`` as Product.save() derives it; ``updated_at`` as
+        # auto_now would set it.
+        cursor.execute(
+            f"UPDATE {table} AS p SET {assignments}, available = i.stock > p.reserved, "
+            f"updated_at = now() FROM product_import AS i WHERE p.name = i.name "
+            f"RETURNING p.id, p.name"
+        )
+        updated = _group(cursor.fetchall())
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, available, reserved, updated_at) "
+            f"SELECT {columns}, stock > 0, 0, now() FROM product_import AS i "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {table} AS p WHERE p.name = i.name) "
+            f"RETURNING id, name"
+        )
+        created = _group(cursor.fetchall())
+        cursor.execute("DROP TABLE product_import")
+    return created, updated
+
+
+def _group(id_name_pairs):
+    ids = defaultdict(list)
+    for pk, name in id_name_pairs:
+        ids[name].append(pk)
+    return ids
+
+
+def _set_categories(rows, created_ids, updated_ids):
+    rows = [row for row in rows if row["categories"] is not None]
+    if not rows:
+        return
+    names = {name for row in rows for name in row["categories"]}
+    category_ids = {}
+    for category in Category.objects.filter(name__in=names).order_by("id"):
+        category_ids.setdefault(category.name, category.id)
+    missing = [name for name in sorted(names) if name not in category_ids]
+    for category in Category.objects.bulk_create(Category(name=n) for n in missing):
+        category_ids[category.name] = category.id
+
+    through = Product.categories.through
+    links = []
+    product_ids = []
+    for row in rows:
+        for pk in created_ids.get(row["name"], []) + updated_ids.get(row["name"], []):
+            product_ids.append(pk)
+            links.extend(
+                through(product_id=pk, category_id=category_ids[name])
+                for name in row["categories"]
+            )
+    through.objects.filter(product_id__in=product_ids).delete()
+    through.objects.bulk_create(links, batch_size=1000)
+
+
+def export_products(stream, fmt, chunk_size=2000):
+    """
+    Write every product to ``stream`` in id order and return how many were
+    written. Products are read ``chunk_size`` at a time, so memory does not
+    grow with the catalog.
+    """
+    products = (
+        Product.objects.order_by("id")
+        .prefetch_related("categories")
+        .iterator(chunk_size)
+    )
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(("id", *FIELDS))
+    count = 0
+    for product in products:
+        categories = [category.name for category in product.categories.all()]
+        values = [
+            product.id,
+            *(getattr(product, column) for column in COLUMNS),
+        ]
+        if fmt == "csv":
+            writer.writerow([*values, CATEGORY_SEPARATOR.join(categories)])
+        else:
+            record = dict(zip(("id", *COLUMNS), values), categories=categories)
+            stream.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        count += 1
+    return count
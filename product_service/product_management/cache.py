@@ -0,0 +1,171 @@
+"""
+Versioned caching for catalog responses.
+
+Cached values are never deleted. Each key embeds a generation number, and
+bumping the generation makes every key built from the old number
+unreachable. The old entries then expire on their own.
+
+The ``a``-prefixed functions are the async counterparts used by async views.
+"""
+
+import asyncio
+import hashlib
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from product_service.db.replicas import reading_from_primary
+
+CATALOG = "catalog"
+SHIPPING = "shipping"
+
+# Set for a while after every invalidation, see _build_context.
+RECENT_WRITE_KEY = "cache:recent-write"
+
+# How long a rebuild may hold the lock, and how long other requests for the
+# same key wait for it before rebuilding themselves.
+LOCK_TIMEOUT = 10
+LOCK_WAIT = 2.0
+LOCK_POLL = 0.02
+
+
+def cache_timeout():
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+
+def get_generation(namespace):
+    key = f"{namespace}:generation"
+    generation = cache.get(key)
+    if generation is None:
+        # Start from the clock, not 1, so a generation evicted from the cache
+        # never comes back as a number that old entries were stored under.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(namespace):
+    key = f"{namespace}:generation"
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def bump_generation(namespace):
+    key = f"{namespace}:generation"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate(*namespaces):
+    """
+    Bump ``namespaces`` now and again when the current transaction commits, so
+    a read that cached pre-commit data in between is dropped as well.
+    """
+
+    def bump():
+        for namespace in namespaces:
+            bump_generation(namespace)
+        cache.set(RECENT_WRITE_KEY, True, _replica_window())
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def _replica_window():
+    # A replica in rotation is at most REPLICA_MAX_LAG behind, as of its
+    # last check, up to REPLICA_CHECK_INTERVAL ago.
+    return getattr(settings, "REPLICA_MAX_LAG", 5) + getattr(
+        settings, "REPLICA_CHECK_INTERVAL", 5
+    )
+
+
+def _build_context(recent_write):
+    """
+    Where a value cached under a fresh generation is read from. Right after
+    a write, a replica may still hold the rows from before it, and a value
+    built from them would be served under the new generation until it
+    expires, so it is built from the primary.
+    """
+    return reading_from_primary() if recent_write else nullcontext()
+
+
+def product_namespace(product_id):
+    return f"{CATALOG}:product:{product_id}"
+
+
+def _digest(parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def make_key(namespace, *parts):
+    return f"{namespace}:{get_generation(namespace)}:{_digest(parts)}"
+
+
+async def amake_key(namespace, *parts):
+    return f"{namespace}:{await aget_generation(namespace)}:{_digest(parts)}"
+
+
+def get_or_build(key, build, timeout=None):
+    """
+    Return the cached value for ``key``, calling ``build`` on a miss.
+
+    Concurrent misses on the same key are coalesced: only the request that
+    takes the lock runs ``build`` while the others wait for its result.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    context = _build_context(cache.get(RECENT_WRITE_KEY))
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            value = cache.get(key)
+            if value is not None:
+                return value
+        with context:
+            return build()
+
+    try:
+        with context:
+            value = build()
+        cache.set(key, value, cache_timeout() if timeout is None else timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+async def aget_or_build(key, build, timeout=None):
+    """``get_or_build`` for async views; ``build`` is a coroutine function."""
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    context = _build_context(await cache.aget(RECENT_WRITE_KEY))
+    lock_key = f"{key}:lock"
+    if not await cache.aadd(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL)
+            value = await cache.aget(key)
+            if value is not None:
+                return value
+        with context:
+            return await build()
+
+    try:
+        with context:
+            value = await build()
+        await cache.aset(key, value, cache_timeout() if timeout is None else timeout)
+    finally:
+        await cache.adelete(lock_key)
+    return value
@@ -0,0 +1,103 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def queryset_validators(queryset, last_modified=True):
+    """
+    Return ``(etag, last_modified)`` for a product queryset.
+
+    Both come from one aggregate over ``updated_at``. An edit moves the
+    maximum and an insert or delete changes the count. Returns an empty
+    tuple when nothing matches, so callers can cache it.
+
+    Pass ``last_modified=False`` for collections, which then get None in
+    its place. Their maximum ``updated_at`` goes back in time when the
+    newest product is deleted or stops matching a filter, and a client
+    sending only ``If-Modified-Since`` would be told its stale copy is
+    current. The ETag also covers the count, so it changes either way.
+    """
+    stats = queryset.aggregate(last=Max("updated_at"), count=Count("id"))
+    return _validators(stats, last_modified)
+
+
+def _validators(stats, last_modified):
+    if not stats["count"]:
+        return ()
+    last = stats["last"]
+    digest = hashlib.md5(f"{last.isoformat()}:{stats['count']}".encode()).hexdigest()
+    return quote_etag(digest), int(last.timestamp()) if last_modified else None
+
+
+async def aqueryset_validators(queryset, last_modified=True):
+    """Async ``queryset_validators``."""
+    stats = await queryset.aaggregate(last=Max("updated_at"), count=Count("id"))
+    return _validators(stats, last_modified)
+
+
+def conditional_get(validators):
+    """
+    Decorate an ``APIView.get`` to answer conditional requests.
+
+    ``validators(request, *args, **kwargs)`` returns ``(etag, last_modified)``,
+    where ``last_modified`` may be None, or a falsy value when none apply. A
+    matching ``If-None-Match`` or ``If-Modified-Since`` gets
+    ``304 Not Modified`` without calling the view.
+    Successful responses are marked publicly cacheable.
+
+    An async ``get`` takes async ``validators``.
+    """
+
+    def decorator(view_method):
+        if iscoroutinefunction(view_method):
+
+            @wraps(view_method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                found = await validators(request, *args, **kwargs)
+                response = _not_modified(request, found)
+                if response is None:
+                    response = await view_method(self, request, *args, **kwargs)
+                return _finish(response, found)
+
+            return async_wrapper
+
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            found = validators(request, *args, **kwargs)
+            response = _not_modified(request, found)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+            return _finish(response, found)
+
+        return wrapper
+
+    return decorator
+
+
+def _not_modified(request, found):
+    if not found:
+        return None
+    etag, last_modified = found
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def _finish(response, found):
+    if found and response.status_code == 200:
+        etag, last_modified = found
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+    if response.status_code in (200, 304):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.CATALOG_CACHE_MAX_AGE,
+            stale_while_revalidate=settings.CATALOG_STALE_WHILE_REVALIDATE,
+        )
+    return response
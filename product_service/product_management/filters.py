@@ -0,0 +1,54 @@
+from django.db.models import Value
+from django.db.models.functions import Upper
+
+from product_management.search import contains_term
+
+TRUE_VALUES = ("true", "1", "yes")
+FALSE_VALUES = ("false", "0", "no")
+
+
+def filter_products(queryset, params):
+    """
+    Apply the catalog query parameters to a ``Product`` queryset.
+
+    Supported parameters are ``province``, ``available``, ``category``,
+    ``price_min``, ``price_max`` and ``q``. Raises ``ValueError`` with a
+    user facing message when a parameter cannot be parsed.
+    """
+    province = params.get("province")
+    if province:
+        # Spelled out rather than ``address__iexact`` so every backend
+        # compares ``UPPER(address)`` and can use product_address_upper_idx.
+        queryset = queryset.alias(address_upper=Upper("address")).filter(
+            address_upper=Upper(Value(province))
+        )
+
+    available = params.get("available")
+    if available:
+        value = available.lower()
+        if value in TRUE_VALUES:
+            queryset = queryset.filter(available=True)
+        elif value in FALSE_VALUES:
+            queryset = queryset.filter(available=False)
+        else:
+            raise ValueError("available must be true or false.")
+
+    category = params.get("category")
+    if category:
+        queryset = queryset.filter(categories__name=category)
+
+    for param, lookup in (("price_min", "price__gte"), ("price_max", "price__lte")):
+        value = params.get(param)
+        if value in (None, ""):
+            continue
+        try:
+            queryset = queryset.filter(**{lookup: float(value)})
+        except ValueError:
+            raise ValueError(f"{param} must be a number.")
+
+    term = params.get("q")
+    if term:
+        # Same lookup as the search endpoint, so the trigram indexes apply.
+        queryset = queryset.filter(contains_term(term))
+
+    return queryset
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from product_management.bulk import FORMATS, detect_format, export_products
+
+
+class Command(BaseCommand):
+    help = "Write every product to a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='File to write, or "-" for stdout.')
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Defaults to jsonl for .jsonl/.ndjson files and csv otherwise.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        start = time.perf_counter()
+        if path == "-":
+            count = export_products(self.stdout, fmt, options["chunk_size"])
+            # The report goes to stderr so it does not end up in the export.
+            report = self.stderr
+        else:
+            try:
+                stream = open(path, "w", newline="", encoding="utf-8")
+            except OSError as e:
+                raise CommandError(f"Cannot write {path}: {e.strerror}")
+            with stream:
+                count = export_products(stream, fmt, options["chunk_size"])
+            report = self.stdout
+        elapsed = time.perf_counter() - start
+        report.write(
+            f"exported {count} rows in {elapsed:.2f}s, {count / elapsed:.0f} rows/s"
+        )
@@ -0,0 +1,60 @@
+import sys
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from product_management.bulk import (
+    FORMATS,
+    detect_format,
+    import_products,
+    read_records,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create or update products from a CSV or JSON Lines file, matching "
+        "existing products by name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='File to read, or "-" for stdin.')
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Defaults to jsonl for .jsonl/.ndjson files and csv otherwise.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create/bulk_update even on PostgreSQL.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        start = time.perf_counter()
+        try:
+            stream = (
+                nullcontext(sys.stdin)
+                if path == "-"
+                else open(path, newline="", encoding="utf-8-sig")
+            )
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e.strerror}")
+        with stream as file:
+            result = import_products(
+                read_records(file, fmt),
+                batch_size=options["batch_size"],
+                use_copy=False if options["no_copy"] else None,
+            )
+        elapsed = time.perf_counter() - start
+
+        for line_number, error in result.errors:
+            self.stderr.write(f"line {line_number}: {error}")
+        self.stdout.write(
+            f"imported {result.rows} rows ({result.created} created, "
+            f"{result.updated} updated, {len(result.errors)} skipped) "
+            f"in {elapsed:.2f}s, {result.rows / elapsed:.0f} rows/s"
+        )
@@ -0,0 +1,69 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations
+
+FORWARD_SQL = [
+    """
+    CREATE TRIGGER product_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, detail, search_vector
+    ON product_management_product
+    FOR EACH ROW EXECUTE FUNCTION
+    tsvector_update_trigger(search_vector, 'pg_catalog.simple', name, detail)
+    """,
+    """
+    UPDATE product_management_product
+    SET search_vector = to_tsvector(
+        'pg_catalog.simple', coalesce(name, '') || ' ' || coalesce(detail, '')
+    )
+    """,
+    """
+    CREATE INDEX product_search_vector_gin
+    ON product_management_product USING gin (search_vector)
+    """,
+    """
+    CREATE INDEX product_name_trgm
+    ON product_management_product USING gin (name gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX product_detail_trgm
+    ON product_management_product USING gin (detail gin_trgm_ops)
+    """,
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS product_detail_trgm",
+    "DROP INDEX IF EXISTS product_name_trgm",
+    "DROP INDEX IF EXISTS product_search_vector_gin",
+    "DROP TRIGGER IF EXISTS product_search_vector_update ON product_management_product",
+]
+
+
+def run_postgres_sql(statements):
+    # The search indexes and trigger only exist on PostgreSQL. Other
+    # backends (SQLite test runs) use the icontains fallback in search.py.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("product_management", "0003_category_remove_product_category_product_categories"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL), run_postgres_sql(REVERSE_SQL)
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-17 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_management', '0004_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
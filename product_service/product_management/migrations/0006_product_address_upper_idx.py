@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:26
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_management', '0005_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(django.db.models.functions.text.Upper('address'), name='product_address_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_management', '0007_product_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
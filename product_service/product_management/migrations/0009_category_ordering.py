@@ -0,0 +1,17 @@
+# Generated by Django 5.0.4 on 2026-10-17 13:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_management', '0008_product_reserved'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ['id']},
+        ),
+    ]
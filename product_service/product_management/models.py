@@ -1,10 +1,23 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import BooleanField, ExpressionWrapper, F
+from django.db.models.functions import Upper
+from django.db.models.lookups import GreaterThan
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from product_management.cache import CATALOG, invalidate, product_namespace
 
 
 # Create your models here.
 class Category(models.Model):
     name = models.CharField(max_length=100)
 
+    class Meta:
+        # A product's categories are listed in a fixed order, the same one
+        # product_management.rows reads them in.
+        ordering = ["id"]
+
     def __str__(self):
         return self.name
 
@@ -14,15 +27,79 @@ class Product(models.Model):
     detail = models.CharField(max_length=500)
     price = models.FloatField()
     stock = models.IntegerField()
+    # Units held by carts, see order_management.stock. Kept in step with
+    # StockReservation by incremental updates instead of summed per request.
+    reserved = models.IntegerField(default=0, editable=False)
     categories = models.ManyToManyField(Category, related_name="products")
     production_date = models.DateField()
     expiration_date = models.DateField()
     address = models.CharField(max_length=50, blank=True)
+    # Whether any stock is left that carts do not hold, see availability().
     available = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Maintained by a database trigger on PostgreSQL, see migration 0004.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # The catalog's province filter compares UPPER(address).
+            models.Index(Upper("address"), name="product_address_upper_idx"),
+            # import_products upserts on name.
+            models.Index(fields=["name"], name="product_name_idx"),
+        ]
+
+    @property
+    def available_stock(self):
+        """Stock that is neither sold nor held by a cart."""
+        return self.stock - self.reserved
 
     def save(self, *args, **kwargs):
-        self.available = self.stock > 0
+        self.available = self.available_stock > 0
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
+
+
+def availability(stock=F("stock"), reserved=F("reserved")):
+    """
+    ``Product.available`` as an expression, for ``update()`` calls that
+    change ``stock`` or ``reserved`` without ``save()``. The right hand sides
+    of an ``UPDATE`` read the row as it was before it, so pass the new
+    values in terms of the old ones.
+    """
+    return ExpressionWrapper(GreaterThan(stock, reserved), output_field=BooleanField())
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    invalidate(CATALOG, product_namespace(instance.pk))
+
+
+def touch_products(product_ids):
+    """
+    Bump ``updated_at`` and drop cached responses for products whose output
+    changed without the product row itself being saved.
+    """
+    product_ids = list(product_ids)
+    Product.objects.filter(pk__in=product_ids).update(updated_at=timezone.now())
+    invalidate(CATALOG, *[product_namespace(pk) for pk in product_ids])
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_product_categories_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            touch_products([instance.pk])
+        return
+    # Changed from the category side: ``pk_set`` holds product ids, except
+    # for a clear, where the products have to be read before they go.
+    if action == "pre_clear":
+        touch_products(instance.products.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        touch_products(pk_set)
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def invalidate_category_cache(sender, instance, **kwargs):
+    touch_products(instance.products.values_list("id", flat=True))
@@ -0,0 +1,96 @@
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the product catalog.
+
+    Each page is read with ``WHERE <ordering> > <cursor> LIMIT page_size``
+    so the cost of a page does not depend on how deep into the catalog it is.
+    """
+
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+    ordering_param = "ordering"
+    ordering_fields = ("id", "name", "price", "stock", "expiration_date")
+
+    def get_ordering(self, request, queryset, view):
+        value = request.query_params.get(self.ordering_param, "")
+        field = value.lstrip("-")
+        if field not in self.ordering_fields:
+            return self.ordering
+        if field == "id":
+            return (value,)
+        # ``id`` breaks ties so rows sharing the same sort value keep a
+        # stable order between pages.
+        return (value, "-id" if value.startswith("-") else "id")
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "data": data,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+            }
+        )
+
+
+class ProductSearchPagination(BasePagination):
+    """
+    Page number pagination for ranked search results.
+
+    Ranked results cannot be keyset paginated, but they are rarely read past
+    the first few pages. Unlike ``PageNumberPagination`` this never runs a
+    ``COUNT(*)``; one extra row is fetched to find out if there is a next page.
+    """
+
+    page_size = 24
+    page_query_param = "page"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = min(
+            self._get_int(self.page_size_query_param, self.page_size),
+            self.max_page_size,
+        )
+        self.page_number = self._get_int(self.page_query_param, 1)
+        offset = (self.page_number - 1) * self.page_size
+        rows = list(queryset[offset : offset + self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        return rows[: self.page_size]
+
+    def _get_int(self, param, default):
+        try:
+            value = int(self.request.query_params[param])
+        except (KeyError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "data": data,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+            }
+        )
@@ -0,0 +1,69 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Lookup, Q, Value, When
+
+
+def search_products(queryset, term):
+    """
+    Return ``queryset`` narrowed to products matching ``term``, annotated with
+    a ``rank`` and ordered best match first.
+    """
+    if connection.vendor == "postgresql":
+        return _postgres_search(queryset, term)
+    return _basic_search(queryset, term)
+
+
+class _ILike(Lookup):
+    # ``icontains`` compiles to ``UPPER(col) LIKE UPPER(%s)`` on PostgreSQL,
+    # which the trigram indexes on the bare columns cannot serve. ``ILIKE``
+    # on the column itself can.
+    lookup_name = "ilike"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", [*lhs_params, *rhs_params]
+
+
+def contains_term(term):
+    """
+    Return a ``Q`` for products whose name or detail contains ``term``, case
+    insensitively, in a form the trigram indexes can serve on PostgreSQL.
+    """
+    if connection.vendor == "postgresql":
+        pattern = f"%{connection.ops.prep_for_like_query(term)}%"
+        return Q(_ILike(F("name"), pattern)) | Q(_ILike(F("detail"), pattern))
+    return Q(name__icontains=term) | Q(detail__icontains=term)
+
+
+def _postgres_search(queryset, term):
+    # ``search_vector`` covers whole words in English, the trigram indexes
+    # cover partial and misspelled words and Thai names, which have no spaces
+    # for the tsvector parser to split on.
+    query = SearchQuery(term, config="simple", search_type="websearch")
+    return (
+        queryset.filter(
+            Q(search_vector=query)
+            | Q(name__trigram_similar=term)
+            | contains_term(term)
+        )
+        .annotate(
+            rank=SearchRank(F("search_vector"), query)
+            + TrigramSimilarity("name", term)
+        )
+        .order_by("-rank", "id")
+    )
+
+
+def _basic_search(queryset, term):
+    return (
+        queryset.filter(contains_term(term))
+        .annotate(
+            rank=Case(
+                When(name__icontains=term, then=Value(1.0)),
+                default=Value(0.5),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-rank", "id")
+    )
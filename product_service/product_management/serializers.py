@@ -1,14 +1,32 @@
 from rest_framework import serializers
 from product_management.models import *
+from product_service.metrics import TimedSerializerMixin
+from product_service.sparse import SparseFieldsMixin
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Category
         fields = ["name"]
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class AvailableStockField(serializers.IntegerField):
+    """``stock`` less the units held by carts, which are not for sale."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return instance.available_stock
+
+
+class ProductSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
+    stock = AvailableStockField()
     categories = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="name"
     )
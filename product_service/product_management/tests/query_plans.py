@@ -0,0 +1,42 @@
+"""
+Helpers for tests that pin hot queries to their indexes.
+
+``QueryPlanMixin.assertNoFullScan`` runs ``EXPLAIN`` on a queryset and fails
+when the plan reads a whole table instead of searching an index::
+
+    analyze(Order)
+    self.assertNoFullScan(Order.objects.filter(customer=user), Order)
+
+Seed the tables with a few thousand rows and ``analyze`` them first. On a
+near empty table PostgreSQL rightly prefers a sequential scan, so a plan
+is only worth checking once the planner sees the table as large.
+"""
+
+import re
+
+from django.db import connection
+
+# SQLite reports any pass over a whole table or index as SCAN and an index
+# lookup as SEARCH; PostgreSQL names the table it reads sequentially.
+FULL_SCAN = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"\bSCAN (\w+)"),
+}
+
+
+def analyze(*models):
+    """Refresh the planner statistics for ``models``' tables."""
+    with connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+
+class QueryPlanMixin:
+    def assertNoFullScan(self, queryset, *models):
+        pattern = FULL_SCAN.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f"Cannot read {connection.vendor} query plans.")
+        plan = queryset.explain()
+        tables = {model._meta.db_table for model in models}
+        scanned = sorted(tables.intersection(pattern.findall(plan)))
+        self.assertFalse(scanned, f"Full scan of {', '.join(scanned)}:\n{plan}")
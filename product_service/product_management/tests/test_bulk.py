@@ -0,0 +1,288 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from product_management.bulk import export_products, import_products, read_records
+from product_management.models import Category, Product
+
+CSV_HEADER = (
+    "name,detail,price,stock,production_date,expiration_date,address,categories\n"
+)
+
+
+class ImportProductsTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def run_import(self, name, content, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command(
+            "import_products", self.write(name, content), *args, stdout=out, stderr=err
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_creates_products(self):
+        """[Normal] a CSV import creates products, categories and availability"""
+        out, _ = self.run_import(
+            "products.csv",
+            CSV_HEADER
+            + "Rice,Jasmine,45.5,10,2025-01-01,2026-01-01,Chiang Mai,Grain|Organic\n"
+            + "Tea,,12,0,2025-02-01,2026-02-01,,Drink\n",
+        )
+        self.assertIn("imported 2 rows (2 created, 0 updated, 0 skipped)", out)
+        self.assertIn("rows/s", out)
+        rice = Product.objects.get(name="Rice")
+        self.assertEqual(rice.price, 45.5)
+        self.assertEqual(rice.address, "Chiang Mai")
+        self.assertTrue(rice.available)
+        self.assertEqual(
+            sorted(rice.categories.values_list("name", flat=True)), ["Grain", "Organic"]
+        )
+        tea = Product.objects.get(name="Tea")
+        self.assertFalse(tea.available)
+        self.assertEqual(tea.detail, "")
+        self.assertEqual(Category.objects.count(), 3)
+
+    def test_reimport_updates_by_name(self):
+        """[Normal] importing an existing name updates it instead of adding one"""
+        product = Product.objects.create(
+            name="Rice",
+            detail="old",
+            price=1.0,
+            stock=0,
+            production_date=date(2024, 1, 1),
+            expiration_date=date(2025, 1, 1),
+        )
+        product.categories.add(Category.objects.create(name="Old"))
+        out, _ = self.run_import(
+            "products.csv",
+            CSV_HEADER + "Rice,new,2.5,3,2025-01-01,2026-01-01,Nan,Grain\n",
+        )
+        self.assertIn("0 created, 1 updated", out)
+        product.refresh_from_db()
+        self.assertEqual(Product.objects.count(), 1)
+        self.assertEqual(
+            (product.detail, product.price, product.stock), ("new", 2.5, 3)
+        )
+        self.assertTrue(product.available)
+        self.assertEqual(
+            list(product.categories.values_list("name", flat=True)), ["Grain"]
+        )
+
+    def test_missing_categories_column_keeps_categories(self):
+        """[Normal] without a categories column a product keeps its categories"""
+        product = Product.objects.create(
+            name="Rice",
+            detail="",
+            price=1.0,
+            stock=1,
+            production_date=date(2024, 1, 1),
+            expiration_date=date(2025, 1, 1),
+        )
+        product.categories.add(Category.objects.create(name="Grain"))
+        self.run_import(
+            "products.csv",
+            "name,detail,price,stock,production_date,expiration_date\n"
+            "Rice,d,2,1,2025-01-01,2026-01-01\n",
+        )
+        self.assertEqual(
+            list(product.categories.values_list("name", flat=True)), ["Grain"]
+        )
+
+    def test_jsonl(self):
+        """[Normal] a JSON Lines import reads categories as a list"""
+        record = {
+            "name": "Honey",
+            "detail": "Wild",
+            "price": 120,
+            "stock": 4,
+            "production_date": "2025-03-01",
+            "expiration_date": "2027-03-01",
+            "address": "Nan",
+            "categories": ["Sweet"],
+        }
+        out, _ = self.run_import("products.jsonl", json.dumps(record) + "\n\n")
+        self.assertIn("1 created", out)
+        honey = Product.objects.get(name="Honey")
+        self.assertEqual(
+            list(honey.categories.values_list("name", flat=True)), ["Sweet"]
+        )
+
+    def test_last_duplicate_row_wins(self):
+        """[Normal] when a file repeats a name, its last row wins"""
+        self.run_import(
+            "products.csv",
+            CSV_HEADER
+            + "Rice,first,1,1,2025-01-01,2026-01-01,,\n"
+            + "Rice,second,2,1,2025-01-01,2026-01-01,,\n",
+        )
+        self.assertEqual(Product.objects.get().detail, "second")
+
+    def test_invalid_rows_are_skipped_and_reported(self):
+        """[Invalid Input] malformed rows are skipped with their line number"""
+        out, err = self.run_import(
+            "products.csv",
+            CSV_HEADER
+            + "Rice,,abc,1,2025-01-01,2026-01-01,,\n"
+            + ",,1,1,2025-01-01,2026-01-01,,\n"
+            + "Tea,,1,1,01/02/2025,2026-01-01,,\n"
+            + "Salt,,1,1,2025-01-01,2026-01-01,,\n",
+        )
+        self.assertIn("1 created, 0 updated, 3 skipped", out)
+        self.assertIn("line 2: price must be a number.", err)
+        self.assertIn("line 3: name is required.", err)
+        self.assertIn("line 4: production_date must be a YYYY-MM-DD date.", err)
+        self.assertEqual(list(Product.objects.values_list("name", flat=True)), ["Salt"])
+
+    def test_invalid_json_line(self):
+        """[Invalid Input] a line that is not a JSON object is skipped"""
+        _, err = self.run_import("products.jsonl", "not json\n[1, 2]\n")
+        self.assertIn("line 1: not a JSON object.", err)
+        self.assertIn("line 2: not a JSON object.", err)
+
+    def test_overlong_value_is_rejected(self):
+        """[Attack] a value longer than its column is rejected, not truncated"""
+        _, err = self.run_import(
+            "products.csv",
+            CSV_HEADER + f"{'x' * 51},,1,1,2025-01-01,2026-01-01,,\n",
+        )
+        self.assertIn("name is longer than 50 characters.", err)
+        self.assertFalse(Product.objects.exists())
+
+    def test_update_invalidates_cached_detail(self):
+        """[Normal] an import drops cached responses for the products it changes"""
+        product = Product.objects.create(
+            name="Rice",
+            detail="",
+            price=1.0,
+            stock=1,
+            production_date=date(2024, 1, 1),
+            expiration_date=date(2025, 1, 1),
+        )
+        client = APIClient()
+        url = reverse("product-detail", args=[product.id])
+        self.assertEqual(client.get(url).data["data"]["price"], 1.0)
+        self.run_import(
+            "products.csv", CSV_HEADER + "Rice,,9,1,2025-01-01,2026-01-01,,\n"
+        )
+        self.assertEqual(client.get(url).data["data"]["price"], 9.0)
+
+    def test_create_invalidates_cached_missing_detail(self):
+        """[Normal] an import drops a cached miss for an id it then creates"""
+        product = Product.objects.create(
+            name="Rice",
+            detail="",
+            price=1.0,
+            stock=1,
+            production_date=date(2024, 1, 1),
+            expiration_date=date(2025, 1, 1),
+        )
+        client = APIClient()
+        url = reverse("product-detail", args=[product.id + 1])
+        self.assertEqual(client.get(url).status_code, 404)
+        self.run_import(
+            "products.csv", CSV_HEADER + "Salt,,9,1,2025-01-01,2026-01-01,,\n"
+        )
+        self.assertEqual(Product.objects.get(name="Salt").id, product.id + 1)
+        self.assertEqual(client.get(url).data["data"]["name"], "Salt")
+
+    def test_batches_without_copy(self):
+        """[Normal] the bulk_create/bulk_update path gives the same result"""
+        Product.objects.create(
+            name="P0",
+            detail="",
+            price=1.0,
+            stock=1,
+            production_date=date(2024, 1, 1),
+            expiration_date=date(2025, 1, 1),
+        )
+        rows = "".join(
+            f"P{i},,{i},{i % 2},2025-01-01,2026-01-01,,C{i % 3}\n" for i in range(25)
+        )
+        out, _ = self.run_import(
+            "products.csv", CSV_HEADER + rows, "--batch-size=10", "--no-copy"
+        )
+        self.assertIn("imported 25 rows (24 created, 1 updated, 0 skipped)", out)
+        self.assertEqual(Product.objects.count(), 25)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Product.objects.filter(available=True).count(), 12)
+
+
+class ExportProductsTest(TestCase):
+    def setUp(self):
+        grain = Category.objects.create(name="Grain")
+        for i in range(5):
+            product = Product.objects.create(
+                name=f"ข้าว {i}",
+                detail="d, with comma",
+                price=1.5 + i,
+                stock=i,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+                address="Nan",
+            )
+            product.categories.add(grain)
+
+    def snapshot(self):
+        return sorted(
+            (
+                p.name,
+                p.detail,
+                p.price,
+                p.stock,
+                p.available,
+                p.address,
+                tuple(p.categories.values_list("name", flat=True)),
+            )
+            for p in Product.objects.all()
+        )
+
+    def round_trip(self, fmt):
+        before = self.snapshot()
+        stream = io.StringIO()
+        self.assertEqual(export_products(stream, fmt), 5)
+        Product.objects.all().delete()
+        stream.seek(0)
+        result = import_products(read_records(stream, fmt))
+        self.assertEqual((result.created, result.errors), (5, []))
+        self.assertEqual(self.snapshot(), before)
+
+    def test_csv_round_trip(self):
+        """[Normal] exported CSV imports back to the same catalog"""
+        self.round_trip("csv")
+
+    def test_jsonl_round_trip(self):
+        """[Normal] exported JSON Lines imports back to the same catalog"""
+        self.round_trip("jsonl")
+
+    def test_export_command_to_stdout(self):
+        """[Normal] export_products - writes CSV to stdout and reports on stderr"""
+        out, err = io.StringIO(), io.StringIO()
+        call_command("export_products", "-", stdout=out, stderr=err)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["categories"], "Grain")
+        self.assertIn("exported 5 rows", err.getvalue())
+
+    def test_export_reads_in_chunks(self):
+        """[Normal] export reads a chunk of products per query, not per product"""
+        with CaptureQueriesContext(connection) as ctx:
+            export_products(io.StringIO(), "jsonl", chunk_size=2)
+        # Three chunks, each with its categories prefetch.
+        self.assertLessEqual(len(ctx.captured_queries), 6)
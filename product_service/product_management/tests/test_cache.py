@@ -0,0 +1,108 @@
+import threading
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from order_management.models import Shipping
+from product_management.cache import get_or_build
+from product_management.models import Category, Product
+
+
+class GetOrBuildTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_builds_once_and_caches(self):
+        """get_or_build only calls build on a miss"""
+        calls = []
+        build = lambda: calls.append(1) or "value"
+        self.assertEqual(get_or_build("k", build), "value")
+        self.assertEqual(get_or_build("k", build), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_concurrent_miss_waits_for_rebuild(self):
+        """a miss while another request holds the lock waits for its result"""
+        cache.add("k:lock", 1)
+        timer = threading.Timer(0.1, lambda: cache.set("k", "rebuilt"))
+        timer.start()
+
+        def build():
+            raise AssertionError("build should not run while the lock is held")
+
+        self.assertEqual(get_or_build("k", build), "rebuilt")
+        timer.join()
+
+
+class CatalogCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Fruit")
+        self.prod = Product.objects.create(
+            name="Apple",
+            detail="Red",
+            price=3.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+
+    def test_list_is_served_from_cache(self):
+        """[Normal] a repeated list request runs no queries"""
+        self.client.get(reverse("product-list"))
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("product-list"))
+        self.assertEqual(resp.data["data"][0]["name"], "Apple")
+
+    def test_product_save_invalidates_list_and_detail(self):
+        """[Normal] saving a product drops its cached responses"""
+        detail_url = reverse("product-detail", args=[self.prod.id])
+        self.client.get(reverse("product-list"))
+        self.client.get(detail_url)
+
+        self.prod.stock = 0
+        self.prod.save()
+
+        resp = self.client.get(reverse("product-list"))
+        self.assertFalse(resp.data["data"][0]["available"])
+        self.assertEqual(self.client.get(detail_url).data["data"]["stock"], 0)
+
+    def test_category_change_invalidates_detail(self):
+        """[Normal] adding a category shows up in the cached detail"""
+        detail_url = reverse("product-detail", args=[self.prod.id])
+        self.client.get(detail_url)
+        self.category.products.add(self.prod)
+        self.assertEqual(
+            self.client.get(detail_url).data["data"]["categories"], ["Fruit"]
+        )
+
+    def test_filters_are_cached_separately(self):
+        """[Normal] different query strings get different cache entries"""
+        self.client.get(reverse("product-list"))
+        resp = self.client.get(reverse("product-list"), {"available": "false"})
+        self.assertEqual(resp.data["data"], [])
+
+    def test_missing_product_is_cached_as_404(self):
+        """[Invalid Input] unknown product ids keep returning 404"""
+        url = reverse("product-detail", args=[9999])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class ShippingCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            user=User.objects.create_user(username="ship", password="pass")
+        )
+        Shipping.objects.create(method="Std", fee=5.0)
+
+    def test_shipping_change_invalidates_list(self):
+        """[Normal] a new shipping method appears in the cached list"""
+        self.assertEqual(len(self.client.get(reverse("shipping-list")).data["data"]), 1)
+        Shipping.objects.create(method="Express", fee=50.0)
+        self.assertEqual(len(self.client.get(reverse("shipping-list")).data["data"]), 2)
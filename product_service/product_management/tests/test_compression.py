@@ -0,0 +1,78 @@
+import gzip
+import json
+from datetime import date
+
+import brotli
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from product_management.models import Product
+from product_service.compression import CompressionMiddleware, accepts
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.bulk_create(
+            Product(
+                name=f"Pear {i}",
+                detail="Sweet and crisp",
+                price=2.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            for i in range(30)
+        )
+        self.url = reverse("product-list")
+
+    def test_brotli_preferred(self):
+        """[Normal] a client accepting br gets brotli, with Vary and a weak ETag"""
+        resp = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.assertEqual(resp.headers["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", resp.headers["Vary"])
+        self.assertTrue(resp.headers["ETag"].startswith("W/"))
+        body = json.loads(brotli.decompress(resp.content))
+        self.assertEqual(len(body["data"]), 24)
+        self.assertEqual(resp.headers["Content-Length"], str(len(resp.content)))
+
+    def test_gzip_fallback(self):
+        """[Normal] a client accepting only gzip gets gzip"""
+        resp = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br;q=0")
+        self.assertEqual(resp.headers["Content-Encoding"], "gzip")
+        self.assertEqual(len(json.loads(gzip.decompress(resp.content))["data"]), 24)
+
+    def test_weak_etag_still_matches(self):
+        """[Normal] the weakened ETag of a compressed response answers 304"""
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="br").headers["ETag"]
+        resp = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    def test_small_and_unaccepted_responses(self):
+        """[Normal] small bodies, or no Accept-Encoding, are sent uncompressed"""
+        resp = self.client.get(self.url, {"page_size": 1}, HTTP_ACCEPT_ENCODING="br")
+        self.assertNotIn("Content-Encoding", resp.headers)
+        resp = self.client.get(self.url)
+        self.assertNotIn("Content-Encoding", resp.headers)
+
+    def test_streaming(self):
+        """[Normal] streamed responses are compressed chunk by chunk"""
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="br")
+        chunks = [b'{"a":', b'"' + b"x" * 5000 + b'"', b"}"]
+        middleware = CompressionMiddleware(lambda r: StreamingHttpResponse(chunks))
+        resp = middleware(request)
+        self.assertEqual(resp.headers["Content-Encoding"], "br")
+        body = brotli.decompress(b"".join(resp.streaming_content))
+        self.assertEqual(body, b"".join(chunks))
+
+    def test_accepts(self):
+        """[Invalid Input] q=0 and malformed q values refuse the coding"""
+        self.assertTrue(accepts("gzip, BR;q=0.5", "br"))
+        self.assertFalse(accepts("br;q=0", "br"))
+        self.assertFalse(accepts("br;q=abc", "br"))
+        self.assertFalse(accepts("brotli", "br"))
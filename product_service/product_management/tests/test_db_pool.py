@@ -0,0 +1,100 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from product_service.db import pool as db_pool
+from product_service.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+        self.broken = False
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise db_pool.OperationalError("server closed the connection")
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def test_connection_is_reused(self):
+        """[Normal] a returned connection is handed out again instead of a new one"""
+        pool = ConnectionPool(max_size=2)
+        first = pool.getconn(FakeConnection)
+        pool.putconn(first)
+        self.assertIs(pool.getconn(FakeConnection), first)
+        stats = pool.stats()
+        self.assertEqual((stats["created"], stats["reused"]), (1, 1))
+
+    def test_checkout_times_out_when_exhausted(self):
+        """[Invalid Input] a full pool raises PoolTimeout after the timeout"""
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.getconn(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_open_transaction_is_rolled_back(self):
+        """[Normal] a connection returned mid-transaction is rolled back"""
+        pool = ConnectionPool()
+        connection = pool.getconn(FakeConnection)
+        connection.status = TRANSACTION_STATUS_INTRANS
+        pool.putconn(connection)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertIs(pool.getconn(FakeConnection), connection)
+
+    def test_closed_and_expired_connections_are_replaced(self):
+        """[Normal] closed or too old connections are discarded, not reused"""
+        pool = ConnectionPool(max_lifetime=0)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        self.assertIsNot(pool.getconn(FakeConnection), connection)
+        self.assertTrue(connection.closed)
+
+    def test_health_check_drops_dead_connection(self):
+        """[Attack] a connection the server dropped while idle fails its ping"""
+        pool = ConnectionPool(check=True, check_after=0)
+        connection = pool.getconn(FakeConnection)
+        pool.putconn(connection)
+        connection.broken = True
+        self.assertIsNot(pool.getconn(FakeConnection), connection)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+    def test_metrics_expose_pool_state(self):
+        """[Normal] GET /metrics reports each pool's connections"""
+        key = ("test", "metrics")
+        pool = db_pool.get_pool(key, lambda: ConnectionPool(name="shop"))
+        self.addCleanup(db_pool._pools.pop, key)
+        pool.getconn(FakeConnection)
+        with self.settings(METRICS_TOKEN="secret"):
+            resp = self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+            )
+        body = resp.content.decode()
+        self.assertIn('db_pool_connections_in_use{db="shop"} 1', body)
+        self.assertIn('db_pool_max_size{db="shop"} 10', body)
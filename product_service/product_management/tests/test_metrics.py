@@ -0,0 +1,72 @@
+import re
+from datetime import date
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from product_management.models import Product
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(
+            name="Milk",
+            detail="d",
+            price=1.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+
+    def test_server_timing_header(self):
+        """[Normal] responses carry db, serialize and total Server-Timing entries"""
+        resp = self.client.get(reverse("product-list"))
+        timing = resp.headers["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("serialize;dur=", timing)
+        self.assertIn("total;dur=", timing)
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        """[Normal] GET /metrics returns Prometheus histograms per view"""
+        self.client.get(reverse("product-list"))
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertIn("# TYPE http_request_duration_seconds histogram", body)
+        self.assertIn(
+            'http_request_db_queries_count{view="product-list"}', body
+        )
+
+    def test_serializer_time_is_charged(self):
+        """[Normal] time in serializers is reported per view"""
+        product = Product.objects.get()
+        self.client.get(reverse("product-detail", args=[product.id]))
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        sums = re.findall(
+            r'http_request_serialize_duration_seconds_sum{view="product-detail"} (\S+)',
+            resp.content.decode(),
+        )
+        self.assertGreater(float(sums[0]), 0)
+
+    def test_metrics_needs_the_token(self):
+        """[Attack] /metrics refuses requests without the right bearer token"""
+        for header in ({}, {"HTTP_AUTHORIZATION": "Bearer guess"}):
+            resp = self.client.get(reverse("metrics"), **header)
+            self.assertEqual(resp.status_code, 403)
+            self.assertNotIn(b"http_request", resp.content)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_metrics_off_without_a_token(self):
+        """[Attack] /metrics is not served while no token is configured"""
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(resp.status_code, 404)
+
+    @override_settings(METRICS_QUERY_COUNT_THRESHOLD=0)
+    def test_query_threshold_is_logged(self):
+        """[Normal] views over the query threshold are logged"""
+        with self.assertLogs("product_service.metrics", level="WARNING") as logs:
+            self.client.get(reverse("product-list"))
+        self.assertIn("product-list", logs.output[0])
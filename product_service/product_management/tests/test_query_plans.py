@@ -0,0 +1,68 @@
+from datetime import date
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from product_management.filters import filter_products
+from product_management.models import Product
+from product_management.search import search_products
+from product_management.tests.query_plans import QueryPlanMixin, analyze
+
+PROVINCES = 100
+PRODUCTS = 5000
+
+
+class ProductQueryPlanTest(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Product.objects.bulk_create(
+            Product(
+                name=f"Product {i}",
+                detail="",
+                price=10.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+                address=f"Province {i % PROVINCES}",
+            )
+            for i in range(PRODUCTS)
+        )
+        analyze(Product)
+
+    def test_province_filter_uses_index(self):
+        """[Normal] the province filter searches product_address_upper_idx"""
+        qs = filter_products(Product.objects.all(), {"province": "province 7"})
+        self.assertNoFullScan(qs, Product)
+        self.assertEqual(qs.count(), PRODUCTS // PROVINCES)
+
+    def test_province_filter_ignores_case(self):
+        """[Normal] the province filter still matches regardless of case"""
+        qs = filter_products(Product.objects.all(), {"province": "PROVINCE 7"})
+        self.assertEqual(
+            set(qs.values_list("address", flat=True)), {"Province 7"}
+        )
+
+    @skipUnless(
+        connection.vendor == "postgresql", "Trigram indexes are PostgreSQL only."
+    )
+    def test_search_uses_trigram_indexes(self):
+        """[Normal] a substring search reads the name and detail trigram indexes"""
+        qs = search_products(Product.objects.all(), "duct 421")
+        self.assertNoFullScan(qs, Product)
+        # Near misses such as "Product 4421" pass the similarity check too.
+        self.assertLessEqual(
+            {f"Product {i}" for i in range(4210, 4220)} | {"Product 421"},
+            set(qs.values_list("name", flat=True)),
+        )
+
+    @skipUnless(
+        connection.vendor == "postgresql", "Trigram indexes are PostgreSQL only."
+    )
+    def test_q_filter_uses_trigram_indexes(self):
+        """[Normal] the catalog q filter reads the name and detail trigram indexes"""
+        qs = filter_products(Product.objects.all(), {"q": "duct 421"})
+        self.assertNoFullScan(qs, Product)
+        self.assertEqual(
+            set(qs.values_list("name", flat=True)),
+            {"Product 421"} | {f"Product {i}" for i in range(4210, 4220)},
+        )
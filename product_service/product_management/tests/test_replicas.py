@@ -0,0 +1,224 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from order_management.models import Order
+from product_management.cache import CATALOG, RECENT_WRITE_KEY, bump_generation
+from product_management.models import Product
+from product_service.db.replicas import ReplicaMiddleware, health
+
+REPLICA = "replica"
+
+# A second connection to the test database stands in for a replica.
+if REPLICA not in connections.settings:
+    connections.settings[REPLICA] = {
+        **connections.settings[DEFAULT_DB_ALIAS],
+        "TEST": {
+            **connections.settings[DEFAULT_DB_ALIAS]["TEST"],
+            "MIRROR": DEFAULT_DB_ALIAS,
+        },
+    }
+
+
+def route(method, read, authorization=None):
+    """Run ``read`` as the view of a ``method`` request and return its result."""
+    headers = {"Authorization": authorization} if authorization else {}
+    request = RequestFactory().generic(method, "/", headers=headers)
+    return ReplicaMiddleware(lambda request: read())(request)
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], REPLICA_CHECK_INTERVAL=0)
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        health.reset()
+        # SimpleTestCase may not query the replica, so its lag is made up.
+        lag = mock.patch("product_service.db.replicas.replica_lag", return_value=0)
+        lag.start()
+        self.addCleanup(lag.stop)
+
+    def test_safe_request_reads_from_replica(self):
+        """[Normal] reads of a GET request go to the replica"""
+        self.assertEqual(route("GET", lambda: Product.objects.all().db), REPLICA)
+
+    def test_unsafe_request_reads_from_primary(self):
+        """[Normal] reads of a POST request go to the primary"""
+        self.assertEqual(
+            route("POST", lambda: Product.objects.all().db), DEFAULT_DB_ALIAS
+        )
+
+    def test_locking_read_goes_to_primary(self):
+        """[Normal] select_for_update() in a GET request goes to the primary"""
+        read = lambda: Product.objects.select_for_update().db  # noqa: E731
+        self.assertEqual(route("GET", read), DEFAULT_DB_ALIAS)
+
+    def test_reads_after_a_write_go_to_primary(self):
+        """[Normal] once a request writes, its later reads go to the primary"""
+
+        def view():
+            before = Product.objects.all().db
+            router.db_for_write(Product)
+            return before, Product.objects.all().db
+
+        self.assertEqual(route("GET", view), (REPLICA, DEFAULT_DB_ALIAS))
+
+    def test_reads_outside_a_request_go_to_primary(self):
+        """[Normal] management commands and workers read from the primary"""
+        self.assertEqual(Product.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_client_is_pinned_after_a_write(self):
+        """[Normal] a client reads its own writes for REPLICA_PIN_SECONDS"""
+        read = lambda: Product.objects.all().db  # noqa: E731
+        route("POST", lambda: None, authorization="Bearer one")
+        self.assertEqual(route("GET", read, "Bearer one"), DEFAULT_DB_ALIAS)
+        self.assertEqual(route("GET", read, "Bearer two"), REPLICA)
+        cache.clear()  # the pin expires
+        self.assertEqual(route("GET", read, "Bearer one"), REPLICA)
+
+    def test_lagging_replica_leaves_rotation(self):
+        """[Normal] a replica behind by more than REPLICA_MAX_LAG is skipped"""
+        read = lambda: Product.objects.all().db  # noqa: E731
+        lag = "product_service.db.replicas.replica_lag"
+        with override_settings(REPLICA_MAX_LAG=5):
+            with mock.patch(lag, return_value=30.0), self.assertLogs(
+                "product_service.db.replicas", "WARNING"
+            ):
+                self.assertEqual(route("GET", read), DEFAULT_DB_ALIAS)
+            with mock.patch(lag, return_value=1.0), self.assertLogs(
+                "product_service.db.replicas", "INFO"
+            ):
+                self.assertEqual(route("GET", read), REPLICA)
+
+    def test_unreachable_replica_leaves_rotation(self):
+        """[Invalid Input] a replica whose lag cannot be read is skipped"""
+        read = lambda: Product.objects.all().db  # noqa: E731
+        lag = "product_service.db.replicas.replica_lag"
+        with mock.patch(lag, return_value=None), self.assertLogs(
+            "product_service.db.replicas", "WARNING"
+        ):
+            self.assertEqual(route("GET", read), DEFAULT_DB_ALIAS)
+
+    def test_lag_is_checked_once_per_interval(self):
+        """[Normal] the lag of a replica is not queried on every request"""
+        read = lambda: Product.objects.all().db  # noqa: E731
+        with override_settings(REPLICA_CHECK_INTERVAL=60), mock.patch(
+            "product_service.db.replicas.replica_lag", return_value=0
+        ) as lag:
+            for _ in range(3):
+                route("GET", read)
+        self.assertEqual(lag.call_count, 1)
+
+    def test_no_replicas(self):
+        """[Normal] without replicas every read goes to the primary"""
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(
+                route("GET", lambda: Product.objects.all().db), DEFAULT_DB_ALIAS
+            )
+
+    def test_migrations_skip_replicas(self):
+        """[Normal] migrate never writes to a replica"""
+        self.assertFalse(router.allow_migrate(REPLICA, "product_management"))
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, "product_management"))
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaTransactionTest(TestCase):
+    def test_reads_in_a_transaction_go_to_primary(self):
+        """[Normal] reads inside transaction.atomic go to the primary"""
+        # TestCase runs every test inside a transaction.
+        self.assertEqual(
+            route("GET", lambda: Product.objects.all().db), DEFAULT_DB_ALIAS
+        )
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], REPLICA_CHECK_INTERVAL=0)
+class ReplicaRequestTest(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        health.reset()
+        self.user = User.objects.create_user(username="reader", password="pass")
+        self.product = Product.objects.create(
+            name="Tea",
+            detail="d",
+            price=5.0,
+            stock=10,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        # As if the writes above were long past.
+        cache.clear()
+
+    def client_for(self, user):
+        token = AccessToken.for_user(user)
+        token["username"] = user.username
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def queries(self, client, method, url, **kwargs):
+        with CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS]
+        ) as primary, CaptureQueriesContext(connections[REPLICA]) as replica:
+            resp = getattr(client, method)(url, **kwargs)
+        self.assertLess(resp.status_code, 400)
+        return len(primary), len(replica)
+
+    def test_catalog_is_read_from_replica(self):
+        """[Normal] GET /api/product/all/ queries the replica only"""
+        primary, replica = self.queries(APIClient(), "get", reverse("product-list"))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_catalog_after_a_write_is_built_from_primary(self):
+        """[Normal] a lagging replica cannot fill the cache with rows from before a write"""
+        url = reverse("product-list")
+        # Behind, but within REPLICA_MAX_LAG, so still in rotation.
+        with override_settings(REPLICA_MAX_LAG=5), mock.patch(
+            "product_service.db.replicas.replica_lag", return_value=3.0
+        ):
+            self.product.stock = 4
+            self.product.save()
+            primary, replica = self.queries(APIClient(), "get", url)
+            self.assertGreater(primary, 0)
+            self.assertEqual(replica, 0)
+
+            # Once the replica has had time to catch up, it is used again.
+            cache.delete(RECENT_WRITE_KEY)
+            bump_generation(CATALOG)
+            primary, replica = self.queries(APIClient(), "get", url)
+            self.assertEqual(primary, 0)
+            self.assertGreater(replica, 0)
+
+    def test_history_after_add_to_cart_reads_primary(self):
+        """[Normal] a customer sees the cart they just filled, others use the replica"""
+        client = self.client_for(self.user)
+        self.queries(
+            client,
+            "post",
+            reverse("add-to-cart"),
+            data={"product_id": self.product.id, "quantity": 1},
+            format="json",
+        )
+        primary, replica = self.queries(client, "get", reverse("user-orders"))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        self.assertEqual(Order.objects.filter(customer=self.user).count(), 1)
+
+        other = self.client_for(User.objects.create_user(username="other"))
+        primary, replica = self.queries(other, "get", reverse("user-orders"))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
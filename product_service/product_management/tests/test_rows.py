@@ -0,0 +1,104 @@
+import json
+import random
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from product_management.models import Category, Product
+from product_management.rows import product_rows, represent_rows
+from product_management.serializers import ProductSerializer
+from product_service.renderers import ORJSONRenderer
+
+ALPHABET = "abcxyz ÀéßЖกขค\u2028\"\\/\n\t😀 '<>&"
+
+
+class ProductRowsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        rng = random.Random(334)
+        self.categories = Category.objects.bulk_create(
+            Category(name=self.text(rng, 12)) for _ in range(6)
+        )
+        for _ in range(60):
+            product = Product.objects.create(
+                name=self.text(rng, 12),
+                detail=self.text(rng, 100),
+                price=rng.choice(
+                    [0.0, 1.0, round(rng.uniform(0, 1e4), 2), rng.uniform(0, 1e6)]
+                ),
+                stock=rng.randrange(0, 1000),
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2024, 1, 1) + timedelta(rng.randrange(2000)),
+                address=self.text(rng, 12),
+            )
+            # Units held by carts are taken off the stock sent.
+            Product.objects.filter(pk=product.pk).update(
+                reserved=rng.randrange(product.stock + 1)
+            )
+            # Linked out of id order, the output lists them by id.
+            product.categories.add(
+                *rng.sample(self.categories, rng.randrange(len(self.categories)))
+            )
+
+    def text(self, rng, length):
+        return "".join(rng.choices(ALPHABET, k=rng.randrange(length + 1)))
+
+    def assertSameAsSerializer(self, queryset):
+        expected = ProductSerializer(
+            queryset.prefetch_related("categories"), many=True
+        ).data
+        actual = represent_rows(product_rows(queryset))
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            ORJSONRenderer().render(actual), JSONRenderer().render(expected)
+        )
+
+    def test_output_matches_serializer(self):
+        """[Normal] random products represent exactly as ProductSerializer"""
+        self.assertSameAsSerializer(Product.objects.order_by("id"))
+        self.assertSameAsSerializer(Product.objects.order_by("-price", "id"))
+
+    def test_category_filter_keeps_every_category(self):
+        """[Normal] filtering on one category still lists all of a product's"""
+        name = self.categories[0].name
+        queryset = Product.objects.filter(categories__name=name).order_by("id")
+        self.assertTrue(queryset.exists())
+        self.assertSameAsSerializer(queryset)
+
+    def test_list_view_matches_serializer(self):
+        """[Normal] every page of GET /api/product/all/ matches ProductSerializer"""
+        url = reverse("product-list") + "?page_size=7&ordering=-expiration_date"
+        data = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            data.extend(json.loads(resp.content)["data"])
+            url = resp.data["next"]
+        products = Product.objects.order_by("-expiration_date", "-id")
+        expected = ProductSerializer(products, many=True).data
+        self.assertEqual(data, json.loads(json.dumps(expected)))
+
+    def test_empty_queryset(self):
+        """[Normal] no rows represent as an empty list without a query"""
+        with self.assertNumQueries(0):
+            self.assertEqual(represent_rows(product_rows(Product.objects.none())), [])
+
+
+class ORJSONRendererTest(APITestCase):
+    def test_matches_json_renderer(self):
+        """[Normal] dates, decimals and non-string keys render as JSONRenderer"""
+        data = {
+            "at": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            "on": date(2026, 1, 2),
+            "amount": Decimal("10.50"),
+            1: [" ", None, True, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back(self):
+        """[Normal] an indent in the Accept header is honoured"""
+        body = ORJSONRenderer().render({"a": 1}, "application/json; indent=2")
+        self.assertEqual(body, b'{\n  "a": 1\n}')
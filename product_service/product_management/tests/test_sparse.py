@@ -0,0 +1,116 @@
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from order_management.models import Order, ProductOrder
+from product_management.models import Category, Product
+
+
+class SparseFieldsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        fruit = Category.objects.create(name="Fruit")
+        self.products = []
+        for i in range(3):
+            product = Product.objects.create(
+                name=f"Apple {i}",
+                detail="A long description " * 20,
+                price=1.5 + i,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            product.categories.add(fruit)
+            self.products.append(product)
+
+    def get(self, name, params, *args):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(name, args=args), params)
+        self.assertEqual(resp.status_code, 200)
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        return resp.data["data"], sql
+
+    def test_list_fields(self):
+        """[Normal] fields= keeps only the named fields and reads no others"""
+        data, sql = self.get("product-list", {"fields": "name,price"})
+        self.assertEqual(data[0], {"name": "Apple 0", "price": 1.5})
+        self.assertNotIn('"detail"', sql)
+        self.assertNotIn("category", sql)
+
+    def test_list_exclude(self):
+        """[Normal] exclude= drops the named fields and keeps the rest in order"""
+        data, sql = self.get("product-list", {"exclude": "detail,address"})
+        self.assertEqual(
+            list(data[0]),
+            [
+                "id",
+                "name",
+                "categories",
+                "price",
+                "stock",
+                "expiration_date",
+                "available",
+            ],
+        )
+        self.assertEqual(data[0]["categories"], ["Fruit"])
+        self.assertNotIn('"detail"', sql)
+
+    def test_list_fields_follow_the_cursor(self):
+        """[Normal] later pages keep the fieldset and order by unsent fields"""
+        url = reverse("product-list") + "?fields=name&ordering=-price&page_size=2"
+        resp = self.client.get(url)
+        self.assertEqual(resp.data["data"], [{"name": "Apple 2"}, {"name": "Apple 1"}])
+        resp = self.client.get(resp.data["next"])
+        self.assertEqual(resp.data["data"], [{"name": "Apple 0"}])
+
+    def test_search_batch_and_detail(self):
+        """[Normal] search, batch and detail accept the same parameters"""
+        data, sql = self.get("product-search", {"q": "Apple", "fields": "id"})
+        self.assertEqual(data, [{"id": product.id} for product in self.products])
+        # The search matches on detail, but does not select it.
+        self.assertNotIn('"detail"', sql.split(" FROM ")[0])
+
+        product = self.products[0]
+        data, _ = self.get(
+            "product-batch", {"ids": str(product.id), "exclude": "detail"}
+        )
+        self.assertNotIn("detail", data[str(product.id)])
+
+        data, sql = self.get("product-detail", {"fields": "stock"}, product.id)
+        self.assertEqual(data, {"stock": 5})
+        full, _ = self.get("product-detail", {}, product.id)
+        self.assertEqual(full["detail"], product.detail)
+
+    def test_unknown_field(self):
+        """[Invalid Input] an unknown field returns 400"""
+        for name, args in [("product-list", []), ("product-detail", [1])]:
+            resp = self.client.get(reverse(name, args=args), {"exclude": "reserved"})
+            self.assertEqual(resp.status_code, 400)
+            self.assertEqual(resp.data["error"], "Unknown fields: reserved")
+
+    def test_history_without_items(self):
+        """[Normal] history without items skips the item queries"""
+        user = User.objects.create_user(username="sparse", password="pass")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        for _ in range(2):
+            order = Order.objects.create(customer=user, status=Order.STATUS_PAID)
+            ProductOrder.objects.create(
+                order=order, product=self.products[0], quantity=1
+            )
+
+        with CaptureQueriesContext(connection) as full:
+            client.get(reverse("user-orders"))
+        with CaptureQueriesContext(connection) as sparse:
+            resp = client.get(reverse("user-orders"), {"fields": "id,status"})
+        self.assertEqual(resp.data["orders"][0], {"id": order.id, "status": "paid"})
+        self.assertLess(len(sparse), len(full))
+
+        resp = client.get(reverse("user-orders"), {"exclude": "items", "stream": "1"})
+        body = json.loads(b"".join(resp.streaming_content))
+        self.assertEqual(list(body["orders"][0]), ["id", "total_price", "status"])
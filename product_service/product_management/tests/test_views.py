@@ -1,7 +1,10 @@
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APITestCase
-from product_management.models import Product
-from datetime import date
+from product_management.models import Category, Product
+from datetime import date, timedelta
 
 
 class ProductAPITest(APITestCase):
@@ -32,3 +35,287 @@ class ProductAPITest(APITestCase):
         url = "/api/product/1 OR 1=1/"
         resp = self.client.get(url)
         self.assertIn(resp.status_code, (400, 404))
+
+
+class ProductListFilterTest(APITestCase):
+    def setUp(self):
+        self.fruit = Category.objects.create(name="Fruit")
+        self.drink = Category.objects.create(name="Drink")
+        for i in range(30):
+            prod = Product.objects.create(
+                name=f"Apple {i}" if i % 2 else f"Juice {i}",
+                detail="Fresh" if i % 3 else "Cold",
+                price=float(i),
+                stock=0 if i % 5 == 0 else 3,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+                address="Bangkok" if i < 20 else "Chiang Mai",
+            )
+            prod.categories.add(self.fruit if i % 2 else self.drink)
+
+    def test_list_is_paginated(self):
+        """[Normal] product list returns one page and a next cursor"""
+        resp = self.client.get(reverse("product-list"), {"page_size": 10})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["data"]), 10)
+        self.assertIsNotNone(resp.data["next"])
+
+    def test_cursor_walks_whole_catalog(self):
+        """[Normal] following next links returns each product exactly once"""
+        seen = []
+        url = reverse("product-list") + "?page_size=7&ordering=-price"
+        while url:
+            resp = self.client.get(url)
+            seen += [item["id"] for item in resp.data["data"]]
+            url = resp.data["next"]
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+    def test_filters_are_applied(self):
+        """[Normal] available, category, price range and q narrow the result"""
+        resp = self.client.get(
+            reverse("product-list"),
+            {
+                "available": "true",
+                "category": "Fruit",
+                "price_min": 5,
+                "price_max": 20,
+                "q": "fresh",
+                "province": "bangkok",
+                "page_size": 100,
+            },
+        )
+        self.assertEqual(resp.status_code, 200)
+        expected = [
+            i
+            for i in range(30)
+            if i % 2 and i % 5 and i % 3 and 5 <= i <= 20 and i < 20
+        ]
+        self.assertEqual(
+            sorted(item["price"] for item in resp.data["data"]),
+            [float(i) for i in expected],
+        )
+
+    def test_invalid_price_returns_400(self):
+        """[Invalid Input] non-numeric price_min returns 400"""
+        resp = self.client.get(reverse("product-list"), {"price_min": "abc"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_unknown_ordering_is_ignored(self):
+        """[Attack] ordering on an unlisted field falls back to id"""
+        resp = self.client.get(reverse("product-list"), {"ordering": "detail"})
+        self.assertEqual(resp.status_code, 200)
+        ids = [item["id"] for item in resp.data["data"]]
+        self.assertEqual(ids, sorted(ids))
+
+
+class ProductSearchTest(APITestCase):
+    def setUp(self):
+        for name, detail in [
+            ("Green tea", "Cold brewed"),
+            ("Mango", "Sweet mango with green skin"),
+            ("มะม่วง", "ผลไม้สด"),
+            ("Bread", "Whole grain"),
+        ]:
+            Product.objects.create(
+                name=name,
+                detail=detail,
+                price=1.0,
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+
+    def test_search_ranks_name_matches_first(self):
+        """[Normal] GET /api/product/search/?q= returns ranked matches"""
+        resp = self.client.get(reverse("product-search"), {"q": "green"})
+        self.assertEqual(resp.status_code, 200)
+        names = [item["name"] for item in resp.data["data"]]
+        self.assertEqual(names, ["Green tea", "Mango"])
+
+    def test_search_thai_name(self):
+        """[Normal] Thai product names are searchable"""
+        resp = self.client.get(reverse("product-search"), {"q": "มะม่วง"})
+        self.assertEqual([item["name"] for item in resp.data["data"]], ["มะม่วง"])
+
+    def test_search_is_paginated(self):
+        """[Normal] search returns a next link when more results exist"""
+        resp = self.client.get(
+            reverse("product-search"), {"q": "e", "page_size": 2}
+        )
+        self.assertEqual(len(resp.data["data"]), 2)
+        self.assertIsNotNone(resp.data["next"])
+        resp = self.client.get(resp.data["next"])
+        self.assertEqual(len(resp.data["data"]), 1)
+        self.assertIsNone(resp.data["next"])
+
+    def test_search_requires_term(self):
+        """[Invalid Input] missing q returns 400"""
+        resp = self.client.get(reverse("product-search"))
+        self.assertEqual(resp.status_code, 400)
+
+
+class ProductBatchTest(APITestCase):
+    def setUp(self):
+        fruit = Category.objects.create(name="Fruit")
+        self.products = []
+        for i in range(3):
+            prod = Product.objects.create(
+                name=f"Batch {i}",
+                detail="d",
+                price=float(i),
+                stock=5,
+                production_date=date(2025, 1, 1),
+                expiration_date=date(2026, 1, 1),
+            )
+            prod.categories.add(fruit)
+            self.products.append(prod)
+
+    def test_batch_returns_products_keyed_by_id(self):
+        """[Normal] GET /api/product/batch/?ids= loads all products at once"""
+        ids = [p.id for p in self.products]
+        with self.assertNumQueries(2):
+            resp = self.client.get(
+                reverse("product-batch"), {"ids": ",".join(map(str, ids + [9999]))}
+            )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["data"][str(ids[0])]["name"], "Batch 0")
+        self.assertEqual(resp.data["data"][str(ids[2])]["categories"], ["Fruit"])
+        self.assertEqual(resp.data["data"]["9999"], {"error": "Product not found"})
+
+    def test_batch_fields_projection(self):
+        """[Normal] fields= limits the returned fields"""
+        resp = self.client.get(
+            reverse("product-batch"),
+            {"ids": str(self.products[0].id), "fields": "name,price"},
+        )
+        self.assertEqual(
+            resp.data["data"][str(self.products[0].id)], {"name": "Batch 0", "price": 0.0}
+        )
+
+    def test_batch_invalid_ids(self):
+        """[Invalid Input] non-numeric ids return 400"""
+        resp = self.client.get(reverse("product-batch"), {"ids": "1,abc"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_batch_unknown_field(self):
+        """[Attack] unknown projection fields return 400"""
+        resp = self.client.get(
+            reverse("product-batch"), {"ids": "1", "fields": "search_vector"}
+        )
+        self.assertEqual(resp.status_code, 400)
+
+
+class ProductConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.prod = Product.objects.create(
+            name="Tea",
+            detail="Green",
+            price=2.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+
+    def test_list_sends_validators_and_cache_control(self):
+        """[Normal] product list carries ETag and Cache-Control, no Last-Modified"""
+        resp = self.client.get(reverse("product-list"))
+        self.assertIn("ETag", resp.headers)
+        self.assertNotIn("Last-Modified", resp.headers)
+        self.assertIn("public", resp.headers["Cache-Control"])
+        self.assertIn("stale-while-revalidate", resp.headers["Cache-Control"])
+
+    def test_list_if_none_match_returns_304(self):
+        """[Normal] a matching If-None-Match returns 304 without a body"""
+        etag = self.client.get(reverse("product-list")).headers["ETag"]
+        resp = self.client.get(reverse("product-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.content, b"")
+
+    def test_etag_changes_when_product_changes(self):
+        """[Normal] saving a product changes the list and detail ETags"""
+        list_etag = self.client.get(reverse("product-list")).headers["ETag"]
+        detail_url = reverse("product-detail", args=[self.prod.id])
+        detail_etag = self.client.get(detail_url).headers["ETag"]
+        self.prod.stock = 1
+        self.prod.save()
+        resp = self.client.get(reverse("product-list"), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_list_after_newest_product_is_deleted(self):
+        """[Normal] deleting the newest product is not answered with 304"""
+        Product.objects.filter(pk=self.prod.pk).update(
+            updated_at=timezone.now() - timedelta(days=1)
+        )
+        newest = Product.objects.create(
+            name="Milk",
+            detail="Fresh",
+            price=1.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+        first = self.client.get(reverse("product-list"))
+        since = http_date(newest.updated_at.timestamp())
+        newest.delete()
+        resp = self.client.get(
+            reverse("product-list"),
+            HTTP_IF_MODIFIED_SINCE=since,
+            HTTP_IF_NONE_MATCH=first.headers["ETag"],
+        )
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(reverse("product-list"), HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p["name"] for p in resp.data["data"]], ["Tea"])
+
+    def test_detail_if_modified_since_returns_304(self):
+        """[Normal] If-Modified-Since at Last-Modified returns 304"""
+        url = reverse("product-detail", args=[self.prod.id])
+        last_modified = self.client.get(url).headers["Last-Modified"]
+        resp = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_missing_product_has_no_validators(self):
+        """[Invalid Input] 404 responses carry no ETag"""
+        resp = self.client.get(reverse("product-detail", args=[9999]))
+        self.assertEqual(resp.status_code, 404)
+        self.assertNotIn("ETag", resp.headers)
+
+
+class ProductAsyncViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.prod = Product.objects.create(
+            name="Rice",
+            detail="Jasmine",
+            price=3.0,
+            stock=5,
+            production_date=date(2025, 1, 1),
+            expiration_date=date(2026, 1, 1),
+        )
+
+    async def test_list_and_detail_under_asgi(self):
+        """[Normal] product list and detail are served by the ASGI handler"""
+        resp = await self.async_client.get(reverse("product-list"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["data"][0]["name"], "Rice")
+        resp = await self.async_client.get(
+            reverse("product-detail", args=[self.prod.id])
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["data"]["name"], "Rice")
+
+    async def test_if_none_match_under_asgi(self):
+        """[Normal] conditional requests return 304 through the async path"""
+        url = reverse("product-detail", args=[self.prod.id])
+        etag = (await self.async_client.get(url)).headers["ETag"]
+        resp = await self.async_client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+
+    async def test_bad_filter_under_asgi(self):
+        """[Invalid Input] a bad filter returns 400 through the async path"""
+        resp = await self.async_client.get(reverse("product-list"), {"price_min": "x"})
+        self.assertEqual(resp.status_code, 400)
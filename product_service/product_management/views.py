@@ -1,32 +1,172 @@
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from product_management.models import Product
 from product_management.serializers import ProductSerializer
+from product_management.filters import filter_products
+from product_management.pagination import (
+    ProductCursorPagination,
+    ProductSearchPagination,
+)
+from product_management.rows import product_rows, represent_rows
+from product_management.search import search_products
+from product_management.cache import (
+    CATALOG,
+    aget_or_build,
+    amake_key,
+    product_namespace,
+)
+from product_management.conditional import aqueryset_validators, conditional_get
+from product_service.sparse import only_columns, requested_fields
 from rest_framework import status
 
 
-class ProductListView(APIView):
+async def product_list_validators(request):
+    try:
+        qs = filter_products(Product.objects.all(), request.query_params)
+    except ValueError:
+        return None
+    key = await amake_key(CATALOG, "validators", sorted(request.query_params.lists()))
+    return await aget_or_build(
+        key, lambda: aqueryset_validators(qs, last_modified=False)
+    )
+
+
+def select_fields(queryset, fields):
+    """
+    Narrow a product queryset to the columns ``ProductSerializer`` reads
+    for ``fields``, prefetching categories only when they are sent.
+    """
+    serializer = ProductSerializer(fields=fields)
+    # ``stock`` is sent less ``reserved``.
+    queryset = queryset.only(*only_columns(serializer, "reserved"))
+    if "categories" in serializer.fields:
+        queryset = queryset.prefetch_related("categories")
+    return queryset
+
+
+async def product_detail_validators(request, product_id, format=None):
+    key = await amake_key(product_namespace(product_id), "validators")
+    return await aget_or_build(
+        key, lambda: aqueryset_validators(Product.objects.filter(id=product_id))
+    )
+
+
+class ProductListView(AsyncAPIView):
+    permission_classes = [AllowAny]
+
+    @conditional_get(product_list_validators)
+    async def get(self, request, format=None):
+        try:
+            qs = filter_products(Product.objects.all(), request.query_params)
+            fields = requested_fields(request.query_params, ProductSerializer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        async def build():
+            paginator = ProductCursorPagination()
+            rows = product_rows(qs, fields, required=paginator.ordering_fields)
+            # DRF's paginator evaluates the page itself, so it runs in the
+            # ORM thread the same way Django's own async queryset methods do.
+            page = await sync_to_async(paginator.paginate_queryset)(
+                rows, request, view=self
+            )
+            data = await sync_to_async(represent_rows)(page, fields)
+            return paginator.get_paginated_response(data).data
+
+        # Keyed on the host as well, the next/previous links are absolute.
+        key = await amake_key(
+            CATALOG, "list", request.get_host(), sorted(request.query_params.lists())
+        )
+        return Response(await aget_or_build(key, build))
+
+
+class ProductSearchView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, format=None):
-        qs = Product.objects.all()
+        params = request.query_params.copy()
+        term = params.pop("q", [""])[-1].strip()
+        if not term:
+            return Response({"error": "q is required."}, status=400)
 
-        province = request.query_params.get("province")
-        if province:
-            qs = qs.filter(address__iexact=province)
+        try:
+            qs = filter_products(Product.objects.all(), params)
+            fields = requested_fields(params, ProductSerializer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        serializer = ProductSerializer(qs, many=True)
-        return Response({"data": serializer.data}, status=200)
+        paginator = ProductSearchPagination()
+        page = paginator.paginate_queryset(
+            select_fields(search_products(qs, term), fields), request, view=self
+        )
+        serializer = ProductSerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
 
 
-class ProductDetailView(APIView):
+class ProductBatchView(APIView):
     permission_classes = [AllowAny]
+    max_ids = 100
+
+    def get(self, request, format=None):
+        try:
+            ids = [
+                int(value)
+                for value in request.query_params.get("ids", "").split(",")
+                if value.strip()
+            ]
+        except ValueError:
+            return Response({"error": "ids must be a list of integers."}, status=400)
+        if not ids:
+            return Response({"error": "ids is required."}, status=400)
+        if len(ids) > self.max_ids:
+            return Response(
+                {"error": f"At most {self.max_ids} ids can be requested."}, status=400
+            )
 
-    def get(self, request, product_id, format=None):
         try:
-            product = Product.objects.get(id=product_id)
-            serializer = ProductSerializer(product)
-            return Response({"data": serializer.data})
-        except Product.DoesNotExist:
+            fields = requested_fields(request.query_params, ProductSerializer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        qs = select_fields(Product.objects.filter(id__in=ids), fields)
+        products = {product.id: product for product in qs}
+
+        ids = list(dict.fromkeys(ids))
+        found = [products[product_id] for product_id in ids if product_id in products]
+        serialized = iter(ProductSerializer(found, many=True, fields=fields).data)
+        data = {
+            str(product_id): (
+                next(serialized)
+                if product_id in products
+                else {"error": "Product not found"}
+            )
+            for product_id in ids
+        }
+        return Response({"data": data})
+
+
+class ProductDetailView(AsyncAPIView):
+    permission_classes = [AllowAny]
+
+    @conditional_get(product_detail_validators)
+    async def get(self, request, product_id, format=None):
+        try:
+            fields = requested_fields(request.query_params, ProductSerializer)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        async def build():
+            product = await select_fields(
+                Product.objects.filter(id=product_id), fields
+            ).afirst()
+            # Cache misses as well, as an empty dict since None means "not cached".
+            return ProductSerializer(product, fields=fields).data if product else {}
+
+        key = await amake_key(product_namespace(product_id), "detail", fields)
+        data = await aget_or_build(key, build)
+        if not data:
             return Response({"error": "Product not found"}, status=404)
+        return Response({"data": data})
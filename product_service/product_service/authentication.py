@@ -0,0 +1,53 @@
+"""
+JWT authentication that does not read ``auth_user`` on every request.
+
+user_service signs ``username`` and ``email`` into its access tokens. From
+those claims ``ClaimsJWTAuthentication`` builds an unsaved ``User`` whose
+primary key is the token's user id. That is enough for ``request.user`` in
+ORM filters, foreign key assignments and ``request.user.email``. Views that
+need the real row, e.g. for fields not in the token, call ``cached_user``.
+
+As with any stateless token, deactivating a user takes effect when their
+access token expires rather than immediately.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+def cached_user(user_id):
+    """Return the ``User`` row for ``user_id``, cached for a short TTL."""
+    key = f"auth:user:{user_id}"
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            return None
+        cache.set(key, user, getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60))
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or "username" not in validated_token:
+            # Tokens issued before the claims were added: fall back to the
+            # database, through the cache.
+            user = cached_user(user_id) if user_id is not None else None
+            if user is None:
+                return super().get_user(validated_token)
+            return user
+
+        user = User(
+            pk=user_id,
+            username=validated_token["username"],
+            email=validated_token.get("email", ""),
+        )
+        # Mark it as loaded so Django treats it as an existing row. It only
+        # holds the token's fields and must never be saved.
+        user._state.adding = False
+        user._state.db = "default"
+        return user
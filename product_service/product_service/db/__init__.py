@@ -0,0 +1,15 @@
+"""
+PostgreSQL backend with a per-process connection pool.
+
+Set ``ENGINE`` to this package and describe the pool in ``OPTIONS["pool"]``::
+
+    "ENGINE": "product_service.db",
+    "OPTIONS": {"pool": {"max_size": 10, "timeout": 10}},
+
+Django 5.0 opens a new connection for every request, and under ASGI every
+request also runs its ORM calls in a thread of its own, so ``CONN_MAX_AGE``
+cannot keep connections either. This backend borrows a connection from the
+pool when Django connects and hands it back when Django closes it, which
+Django does at the end of each request. Without ``OPTIONS["pool"]`` it
+behaves exactly like the stock PostgreSQL backend.
+"""
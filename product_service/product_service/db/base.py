@@ -0,0 +1,65 @@
+import weakref
+
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+
+from .pool import ConnectionPool, close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database open.
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = None
+        self._pool_finalizer = None
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        # OPTIONS are passed on to psycopg2.connect(), which has no "pool".
+        pool_options = conn_params.pop("pool", None)
+        if pool_options and self.alias != NO_DB_ALIAS:
+            if pool_options is True:
+                pool_options = {}
+            key = (self.alias, repr(sorted(conn_params.items())))
+            self.pool = get_pool(
+                key,
+                lambda: ConnectionPool(
+                    check=self.settings_dict["CONN_HEALTH_CHECKS"],
+                    name=conn_params.get("dbname", self.alias),
+                    **pool_options,
+                ),
+            )
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+        # The pool opens connections through the stock backend, so a new
+        # connection is set up exactly as it would be without pooling.
+        connection = self.pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # Give the connection back if this wrapper is dropped without being
+        # closed, e.g. when the thread that used it exits.
+        self._pool_finalizer = weakref.finalize(self, self.pool.putconn, connection)
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        self._pool_finalizer.detach()
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps a reference to a connection closed inside
+                # atomic(), so it must not go back to the pool.
+                self.pool.discard(self.connection)
+            else:
+                self.pool.putconn(self.connection)
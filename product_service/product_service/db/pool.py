@@ -0,0 +1,188 @@
+import collections
+import threading
+import time
+
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    A bounded pool of psycopg2 connections.
+
+    At most ``max_size`` connections are checked out or idle at once. A
+    checkout waits up to ``timeout`` seconds for one to be returned and
+    then raises ``PoolTimeout``. Idle connections are reused newest first.
+    A connection older than ``max_lifetime``, idle for longer than
+    ``max_idle``, or that fails its health check is closed instead of
+    reused. With ``check`` set, a connection idle for more than
+    ``check_after`` seconds is pinged with ``SELECT 1`` before it is
+    handed out.
+    """
+
+    def __init__(
+        self,
+        max_size=10,
+        timeout=10.0,
+        max_lifetime=3600.0,
+        max_idle=600.0,
+        check=True,
+        check_after=10.0,
+        name="default",
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check = check
+        self.check_after = check_after
+        self.name = name
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = collections.deque()
+        self._created_at = {}
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+
+    def getconn(self, connect):
+        """Check out an idle connection, or open one with ``connect()``."""
+        start = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        waited = time.monotonic() - start
+        with self._lock:
+            self.wait_time += waited
+            if not acquired:
+                self.timeouts += 1
+        if not acquired:
+            raise PoolTimeout(
+                f"No connection available in pool {self.name!r} "
+                f"after {self.timeout} seconds."
+            )
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                connection = connect()
+                with self._lock:
+                    self._created_at[connection] = time.monotonic()
+                    self.created += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.in_use += 1
+        return connection
+
+    def putconn(self, connection):
+        """Return a checked out connection, rolling back anything left open."""
+        try:
+            if connection.closed:
+                raise OperationalError("connection is closed")
+            if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:
+            self._close(connection)
+        else:
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def discard(self, connection):
+        """Close a checked out connection instead of returning it."""
+        self._close(connection)
+        with self._lock:
+            self.in_use -= 1
+        self._slots.release()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._created_at),
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "timeouts": self.timeouts,
+                "wait_seconds": self.wait_time,
+            }
+
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, returned_at = self._idle.pop()
+            if self._usable(connection, returned_at):
+                with self._lock:
+                    self.reused += 1
+                return connection
+            self._close(connection)
+
+    def _usable(self, connection, returned_at):
+        now = time.monotonic()
+        if connection.closed:
+            return False
+        if now - self._created_at.get(connection, now) > self.max_lifetime:
+            return False
+        if now - returned_at > self.max_idle:
+            return False
+        if self.check and now - returned_at > self.check_after:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                connection.rollback()
+            except Exception:
+                return False
+        return True
+
+    def _close(self, connection):
+        with self._lock:
+            self._created_at.pop(connection, None)
+            self.discarded += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def get_pool(key, factory):
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def close_pools(name=None):
+    """Close the idle connections of every pool, or of the pools for ``name``."""
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if name in (None, pool.name)]
+    for pool in pools:
+        pool.close()
+
+
+def pool_stats():
+    with _pools_lock:
+        return [(pool.name, pool.stats()) for pool in _pools.values()]
@@ -0,0 +1,322 @@
+"""
+Per-request instrumentation.
+
+``MetricsMiddleware`` times every request, counts its SQL queries and the
+time spent in them and in DRF serializers, reports the figures in a
+``Server-Timing`` header and aggregates them into histograms that
+``metrics_view`` exposes in the Prometheus text format. Serializer time is
+charged by serializers that mix in ``TimedSerializerMixin``.
+
+``metrics_view`` only answers requests that carry ``METRICS_TOKEN`` as a
+bearer token, and is off while the setting is empty, so the view names and
+traffic figures it reports are not public.
+
+The middleware runs natively under both WSGI and ASGI. Queries are charged
+to the request through a context variable, which ``sync_to_async`` carries
+into the thread where async views run their ORM calls.
+
+Database connection figures come from the same process: how often Django
+connected and, when the pooled backend in ``db`` is configured, the state of
+each pool.
+
+All figures are kept in process memory. With several worker processes each
+one reports its own counters, which is what Prometheus expects when it
+scrapes every instance.
+"""
+
+import hmac
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+from .db.pool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, labels):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self.series = {}
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * len(self.buckets), 0, 0.0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, value_sum) in sorted(self.series.items()):
+            labels = ",".join(
+                f'{key}="{value}"' for key, value in zip(self.labels, label_values)
+            )
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+            lines.append(f"{self.name}_sum{{{labels}}} {value_sum}")
+        return "\n".join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Total request latency.",
+            LATENCY_BUCKETS,
+            ("view", "method", "status"),
+        )
+        self.db_queries = Histogram(
+            "http_request_db_queries",
+            "SQL queries run per request.",
+            QUERY_BUCKETS,
+            ("view",),
+        )
+        self.db_duration = Histogram(
+            "http_request_db_duration_seconds",
+            "Time spent in SQL queries per request.",
+            LATENCY_BUCKETS,
+            ("view",),
+        )
+        self.serialize_duration = Histogram(
+            "http_request_serialize_duration_seconds",
+            "Time spent in DRF serializers per request.",
+            LATENCY_BUCKETS,
+            ("view",),
+        )
+        self.db_connects = 0
+
+    def observe(self, view, method, status, metrics, total):
+        with self.lock:
+            self.request_duration.observe((view, method, str(status)), total)
+            self.db_queries.observe((view,), metrics.queries)
+            self.db_duration.observe((view,), metrics.db_time)
+            self.serialize_duration.observe((view,), metrics.serialize_time)
+
+    def count_connect(self):
+        with self.lock:
+            self.db_connects += 1
+
+    def render(self):
+        with self.lock:
+            sections = [
+                histogram.render()
+                for histogram in (
+                    self.request_duration,
+                    self.db_queries,
+                    self.db_duration,
+                    self.serialize_duration,
+                )
+            ]
+            sections.append(
+                "# HELP db_connects_total Connections opened or taken from a pool.\n"
+                "# TYPE db_connects_total counter\n"
+                f"db_connects_total {self.db_connects}"
+            )
+        sections.extend(_render_pools())
+        return "\n".join(sections) + "\n"
+
+
+POOL_METRICS = (
+    ("db_pool_connections_in_use", "gauge", "Pooled connections in use.", "in_use"),
+    ("db_pool_connections_idle", "gauge", "Idle pooled connections.", "idle"),
+    ("db_pool_max_size", "gauge", "Most connections the pool may hold.", "max_size"),
+    (
+        "db_pool_connections_created_total",
+        "counter",
+        "Connections the pool opened.",
+        "created",
+    ),
+    (
+        "db_pool_connections_reused_total",
+        "counter",
+        "Checkouts served by an idle connection.",
+        "reused",
+    ),
+    (
+        "db_pool_connections_discarded_total",
+        "counter",
+        "Connections closed as stale, broken or too old.",
+        "discarded",
+    ),
+    (
+        "db_pool_timeouts_total",
+        "counter",
+        "Checkouts that gave up waiting for a connection.",
+        "timeouts",
+    ),
+    (
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a free connection.",
+        "wait_seconds",
+    ),
+)
+
+
+def _render_pools():
+    pools = pool_stats()
+    if not pools:
+        return []
+    sections = []
+    for name, kind, help_text, field in POOL_METRICS:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for db, stats in pools:
+            lines.append(f'{name}{{db="{db}"}} {stats[field]}')
+        sections.append("\n".join(lines))
+    return sections
+
+
+registry = Registry()
+
+
+class RequestMetrics:
+    __slots__ = ("queries", "db_time", "serialize_time", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - start
+        metrics.queries += 1
+
+
+def _install_query_timer(sender, connection, **kwargs):
+    # Connections live in whichever thread runs the ORM, so the wrapper is
+    # installed on each one as it connects rather than per request.
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _count_connect(sender, connection, **kwargs):
+    registry.count_connect()
+
+
+connection_created.connect(_install_query_timer)
+connection_created.connect(_count_connect)
+
+
+class TimedSerializerMixin:
+    """
+    Charge the time spent turning objects into primitives to the current
+    request. A nested serializer's time is only counted through the
+    outermost one, and a list's through each of its items.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+            metrics.serializing = False
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, "METRICS_QUERY_COUNT_THRESHOLD", 20)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        for connection in connections.all(initialized_only=True):
+            _install_query_timer(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, time.perf_counter() - start)
+
+    def finish(self, request, response, metrics, total):
+        view = _view_name(request)
+        registry.observe(view, request.method, response.status_code, metrics, total)
+        response.headers["Server-Timing"] = (
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries", '
+            f"serialize;dur={metrics.serialize_time * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+        if metrics.queries > self.threshold:
+            logger.warning(
+                "%s %s (%s) ran %d SQL queries, over the threshold of %d",
+                request.method,
+                request.path,
+                view,
+                metrics.queries,
+                self.threshold,
+            )
+        return response
+
+
+def metrics_view(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        raise Http404
+    sent = request.META.get("HTTP_AUTHORIZATION", "").removeprefix("Bearer ")
+    if not hmac.compare_digest(sent.encode(), token.encode()):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
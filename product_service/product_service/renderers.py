@@ -0,0 +1,33 @@
+"""
+``JSONRenderer`` on orjson.
+
+orjson encodes the dicts and lists of a response several times faster than
+the ``json`` module. With the default ``COMPACT_JSON`` and ``UNICODE_JSON``
+settings ``ORJSONRenderer`` writes the same bytes as DRF's ``JSONRenderer``:
+values orjson does not handle itself, and dates and datetimes, which it
+formats differently, go through DRF's ``JSONEncoder``. Only floats past
+1e16 or below 1e-4 are spelt differently, e.g. ``1e16`` for ``1e+16``, and a
+NaN is written as ``null`` where ``STRICT_JSON`` would raise.
+
+Pretty printed responses, and non-default settings, are left to
+``JSONRenderer``.
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        # Escaped as JSONRenderer does, so the output is also valid JavaScript.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "product_management",
     "order_management",
     "rest_framework",
@@ -46,6 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "product_service.metrics.MetricsMiddleware",
+    "product_service.db.replicas.ReplicaMiddleware",
+    "product_service.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -56,6 +60,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Responses smaller than this many bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
 ROOT_URLCONF = "product_service.urls"
 
 TEMPLATES = [
@@ -93,15 +100,97 @@ DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # PostgreSQL with a per-process connection pool, see product_service/db.
+        "ENGINE": "product_service.db",
         "NAME": os.environ.get("POSTGRES_DB"),       # <--- แก้ไขตรงนี้ (จาก POSTGRES_NAME)
         "USER": os.environ.get("POSTGRES_USER"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"), # <--- ชื่อนี้ตรงกับใน .env ใหม่
-        "HOST": "db",  # HOST คือชื่อ service ของ database ใน docker-compose.yml
-        "PORT": 5432,
+        # HOST คือชื่อ service ของ database ใน docker-compose.yml
+        "HOST": os.environ.get("POSTGRES_HOST", "db"),
+        "PORT": int(os.environ.get("POSTGRES_PORT", 5432)),
+        # DB_TEST_MIGRATE=false builds the test database from the models
+        # instead of the migrations, for servers without pg_trgm.
+        "TEST": {
+            "MIGRATE": os.environ.get("DB_TEST_MIGRATE", "true").lower() == "true"
+        },
+        # Ping pooled connections that sat idle before handing them out.
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            # DB_POOL=false goes back to one connection per request.
+            "pool": os.environ.get("DB_POOL", "true").lower() == "true"
+            and {
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+                "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+                "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 600)),
+            },
+        },
     }
 }
 
+# Read replicas, e.g. DB_REPLICA_HOSTS=db-replica-1,db-replica-2. Reads of
+# GET requests go to them, see product_service/db/replicas.py.
+REPLICA_DATABASES = []
+for number, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["product_service.db.replicas.ReplicaRouter"]
+# Seconds a client that wrote keeps reading from the primary.
+REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 10))
+# A replica further behind than this many seconds drops out of rotation.
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+# Seconds between replication lag checks, per replica and process.
+REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Local memory by default, set REDIS_URL to share the cache between workers.
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds a cached catalog or shipping response is kept.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 300))
+
+# Cache-Control sent with public catalog responses.
+CATALOG_CACHE_MAX_AGE = int(os.environ.get("CATALOG_CACHE_MAX_AGE", 60))
+CATALOG_STALE_WHILE_REVALIDATE = int(
+    os.environ.get("CATALOG_STALE_WHILE_REVALIDATE", 300)
+)
+
+# Requests running more SQL queries than this are logged as warnings.
+METRICS_QUERY_COUNT_THRESHOLD = int(os.environ.get("METRICS_QUERY_COUNT_THRESHOLD", 20))
+
+# Bearer token Prometheus sends to scrape /metrics. /metrics answers 404
+# while it is empty.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Hold cart stock for STOCK_RESERVATION_SECONDS from the moment it is added
+# instead of checking it only at checkout, see order_management/stock.py.
+# Run manage.py release_expired_holds alongside to free abandoned carts.
+STOCK_RESERVATIONS = os.environ.get("STOCK_RESERVATIONS", "false").lower() == "true"
+STOCK_RESERVATION_SECONDS = int(os.environ.get("STOCK_RESERVATION_SECONDS", 900))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -144,7 +233,26 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
+    # Builds request.user from the token claims signed by user_service
+    # instead of loading auth_user on every request.
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-    )
+        "product_service.authentication.ClaimsJWTAuthentication",
+    ),
+    # Same output as DRF's JSONRenderer, encoded by orjson.
+    "DEFAULT_RENDERER_CLASSES": (
+        "product_service.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
+
+# Seconds product_service keeps a User row loaded by cached_user().
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 60))
+
+# user_service, as reached from inside the compose network.
+USER_SERVICE_URL = os.environ.get("USER_SERVICE_URL", "http://user_api:8888")
+# (connect, read) timeouts in seconds for calls to user_service.
+USER_SERVICE_TIMEOUT = (1, 3)
+# Pooled keep-alive connections and worker threads for user_service calls.
+USER_SERVICE_POOL_SIZE = 10
+# Seconds a resolved address or payment method is reused.
+USER_SERVICE_CACHE_TIMEOUT = int(os.environ.get("USER_SERVICE_CACHE_TIMEOUT", 60))
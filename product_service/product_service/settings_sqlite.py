@@ -0,0 +1,16 @@
+"""
+Settings for running the tests and benchmarks on SQLite, without a
+PostgreSQL server::
+
+    DJANGO_SETTINGS_MODULE=product_service.settings_sqlite python manage.py test
+"""
+
+from product_service.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+    }
+}
+REPLICA_DATABASES = []
@@ -0,0 +1,71 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?exclude=`` on API responses.
+
+A client that shows a product's name and price has no use for its 500
+character ``detail``. Serializers that mix in ``SparseFieldsMixin`` accept
+``fields`` and ``exclude`` keyword arguments naming the fields to keep or
+drop. ``requested_fields`` reads the same from the query string, and
+``only_columns`` turns the kept fields into the columns to pass to
+``QuerySet.only()``, so what is not sent is not read either.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+
+
+class SparseFieldsMixin:
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        dropped = set(exclude or ())
+        if fields is not None:
+            dropped |= set(self.fields) - set(fields)
+        for name in dropped:
+            self.fields.pop(name, None)
+
+
+def requested_fields(params, serializer_class):
+    """
+    Return the names of ``serializer_class``'s fields kept by the ``fields``
+    and ``exclude`` query parameters, in declaration order, or None when
+    neither is given. Both take a comma separated list. Raises
+    ``ValueError`` with a user facing message for an unknown field.
+    """
+    names = list(serializer_class().fields)
+    kept = names
+    for param in ("fields", "exclude"):
+        value = params.get(param)
+        if not value:
+            continue
+        listed = {name.strip() for name in value.split(",") if name.strip()}
+        unknown = listed - set(names)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        if param == "fields":
+            kept = [name for name in kept if name in listed]
+        else:
+            kept = [name for name in kept if name not in listed]
+    return None if kept is names else kept
+
+
+def only_columns(serializer, *required):
+    """
+    Return the model fields ``serializer`` reads, plus ``required``, for
+    ``QuerySet.only()``. Relations other than foreign keys are left out,
+    they are prefetched rather than read from the row. Returns None when a
+    field reads an attribute that is not a model field, such as a property,
+    which may need any column.
+    """
+    serializer = getattr(serializer, "child", serializer)
+    opts = serializer.Meta.model._meta
+    columns = {opts.pk.name, *required}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*":
+            return None
+        try:
+            model_field = opts.get_field(field.source.split(".")[0])
+        except FieldDoesNotExist:
+            return None
+        if model_field.concrete:
+            columns.add(model_field.name)
+    return sorted(columns)
@@ -19,16 +19,25 @@ from django.contrib import admin
 from django.urls import path
 from product_management.views import *
 from order_management.views import *
+from product_service.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
     path("api/product/all/", ProductListView.as_view(), name="product-list"),
+    path("api/product/search/", ProductSearchView.as_view(), name="product-search"),
+    path("api/product/batch/", ProductBatchView.as_view(), name="product-batch"),
     path(
         "api/product/<int:product_id>/",
         ProductDetailView.as_view(),
         name="product-detail",
     ),
     path("api/order/<int:id>/", OrderDetailView.as_view(), name="order-detail"),
+    path(
+        "api/order/<int:id>/summary/",
+        OrderSummaryView.as_view(),
+        name="order-summary",
+    ),
     path("api/history/", UserOrderListView.as_view(), name="user-orders"),
     path("api/cart/", CartOrderView.as_view(), name="cart-orders"),
     path(
@@ -43,8 +52,14 @@ urlpatterns = [
         name="remove-from-cart",
     ),
     path("api/cart/update/<int:product_id>/", UpdateCartItemView.as_view()),
+    path("api/cart/items/", CartItemsView.as_view(), name="cart-items"),
     path("api/order/confirm/", ConfirmOrderView.as_view(), name="confirm-order"),
     path("api/shipping/", ShippingListView.as_view(), name="shipping-list"),
+    path(
+        "api/checkout/context/",
+        CheckoutContextView.as_view(),
+        name="checkout-context",
+    ),
     path(
         "api/payment/<int:order_id>/",
         PaymentByOrderView.as_view(),
@@ -3,15 +3,22 @@ from rest_framework import serializers
 from user_management.models import *
 from django.utils.html import strip_tags
 from django.contrib.auth import password_validation
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from user_service.metrics import TimedSerializerMixin
+from user_service.sparse import SparseFieldsMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = User
         fields = ["username", "email"]
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     user = UserSerializer(read_only=True)
     user_id = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(), write_only=True, source="user"
@@ -42,13 +49,17 @@ class CustomerSerializer(serializers.ModelSerializer):
         return instance
 
 
-class UserPaymentMethodSerializer(serializers.ModelSerializer):
+class UserPaymentMethodSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = UserPaymentMethod
         fields = ["id", "method", "card_no", "expired", "holder_name", "is_default"]
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(
+    TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = Address
         fields = [
@@ -75,3 +86,14 @@ class ChangePasswordSerializer(serializers.Serializer):
             )
         password_validation.validate_password(pw1, self.context["request"].user)
         return attrs
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Signs username and email into the tokens so product_service can skip the user lookup."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["username"] = user.username
+        token["email"] = user.email
+        return token
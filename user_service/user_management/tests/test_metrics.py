@@ -0,0 +1,32 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+
+@override_settings(METRICS_TOKEN="secret")
+class MetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="metrics", password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        """[Normal] responses carry a Server-Timing header"""
+        resp = self.client.get(reverse("address-list"))
+        self.assertIn('desc="1 queries"', resp.headers["Server-Timing"])
+
+    def test_metrics_endpoint(self):
+        """[Normal] GET /metrics reports the views that were hit"""
+        self.client.get(reverse("address-list"))
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        body = resp.content.decode()
+        self.assertIn('http_request_db_queries_count{view="address-list"}', body)
+        self.assertIn(
+            'http_request_serialize_duration_seconds_count{view="address-list"}', body
+        )
+
+    def test_metrics_needs_the_token(self):
+        """[Attack] /metrics refuses requests without the right bearer token"""
+        resp = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer guess")
+        self.assertEqual(resp.status_code, 403)
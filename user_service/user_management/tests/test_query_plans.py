@@ -0,0 +1,49 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from user_management.models import Address, UserPaymentMethod
+from user_management.tests.query_plans import QueryPlanMixin, analyze
+
+USERS = 1000
+ADDRESSES_PER_USER = 3
+
+
+class AddressQueryPlanTest(QueryPlanMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        users = User.objects.bulk_create(
+            User(username=f"user{i}") for i in range(USERS)
+        )
+        Address.objects.bulk_create(
+            Address(
+                user=user,
+                receiver_name="Receiver",
+                house_number="1",
+                district="District",
+                province="Province",
+                post_code="10000",
+                is_default=n == 0,
+            )
+            for user in users
+            for n in range(ADDRESSES_PER_USER)
+        )
+        UserPaymentMethod.objects.bulk_create(
+            UserPaymentMethod(user=user, method="credit_card", is_default=n == 0)
+            for user in users
+            for n in range(2)
+        )
+        analyze(User, Address, UserPaymentMethod)
+        cls.user = users[USERS // 2]
+
+    def test_default_address_uses_index(self):
+        """[Normal] DefaultAddressView's lookup searches an index"""
+        qs = Address.objects.filter(user=self.user, is_default=True)
+        self.assertNoFullScan(qs, Address)
+
+    def test_address_list_uses_index(self):
+        """[Normal] listing a user's addresses searches an index"""
+        self.assertNoFullScan(Address.objects.filter(user=self.user), Address)
+
+    def test_default_payment_method_uses_index(self):
+        """[Normal] finding a user's default payment method searches an index"""
+        qs = UserPaymentMethod.objects.filter(user=self.user, is_default=True)
+        self.assertNoFullScan(qs, UserPaymentMethod)
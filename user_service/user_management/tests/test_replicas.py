@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from user_management.models import Address
+from user_service.db.replicas import health
+
+REPLICA = "replica"
+
+# A second connection to the test database stands in for a replica.
+if REPLICA not in connections.settings:
+    connections.settings[REPLICA] = {
+        **connections.settings[DEFAULT_DB_ALIAS],
+        "TEST": {
+            **connections.settings[DEFAULT_DB_ALIAS]["TEST"],
+            "MIRROR": DEFAULT_DB_ALIAS,
+        },
+    }
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA], REPLICA_CHECK_INTERVAL=0)
+class ReplicaRequestTest(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        health.reset()
+        self.user = User.objects.create_user(username="reader", password="pass")
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        return client
+
+    def queries(self, client, method, url, **kwargs):
+        with CaptureQueriesContext(
+            connections[DEFAULT_DB_ALIAS]
+        ) as primary, CaptureQueriesContext(connections[REPLICA]) as replica:
+            resp = getattr(client, method)(url, **kwargs)
+        self.assertLess(resp.status_code, 400)
+        return len(primary), len(replica)
+
+    def test_address_list_is_read_from_replica(self):
+        """[Normal] GET /api/address/ queries the replica only"""
+        primary, replica = self.queries(
+            self.client_for(self.user), "get", reverse("address-list")
+        )
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_address_list_after_adding_reads_primary(self):
+        """[Normal] a user sees the address they just added, others use the replica"""
+        client = self.client_for(self.user)
+        self.queries(
+            client,
+            "post",
+            reverse("address-list"),
+            data={
+                "receiver_name": "N",
+                "house_number": "1",
+                "district": "D",
+                "province": "P",
+                "post_code": "10200",
+            },
+            format="json",
+        )
+        primary, replica = self.queries(client, "get", reverse("address-list"))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        self.assertEqual(Address.objects.filter(user=self.user).count(), 1)
+
+        other = self.client_for(User.objects.create_user(username="other"))
+        primary, replica = self.queries(other, "get", reverse("address-list"))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
@@ -1,6 +1,10 @@
+import json
+
+import brotli
 from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.tokens import AccessToken
 from user_management.models import *
 
 
@@ -54,6 +58,56 @@ class AddressAPITest(APITestCase):
         resp = self.client.post(reverse("address-list"), {}, format="json")
         self.assertEqual(resp.status_code, 400)
 
+    def test_list_address_fields(self):
+        """[Normal] fields= and exclude= pick the returned fields"""
+        address = Address.objects.create(
+            user=self.user,
+            receiver_name="R",
+            house_number="1",
+            district="D",
+            province="P",
+            post_code="10100",
+        )
+        resp = self.client.get(reverse("address-list"), {"fields": "id,province"})
+        self.assertEqual(resp.data["data"], [{"id": address.id, "province": "P"}])
+        resp = self.client.get(
+            reverse("address-list"), {"exclude": "house_number,post_code"}
+        )
+        self.assertNotIn("post_code", resp.data["data"][0])
+        self.assertEqual(resp.data["data"][0]["district"], "D")
+
+    def test_list_address_unknown_field(self):
+        """[Attack] fields= cannot name a column the serializer does not send"""
+        resp = self.client.get(reverse("address-list"), {"fields": "user,id"})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["error"], "Unknown fields: user")
+
+
+class DefaultAddressViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="da", password="pass")
+        self.auth = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_default_address_under_asgi(self):
+        """[Normal] GET /api/address/default/ is served by the ASGI handler"""
+        await Address.objects.acreate(
+            user=self.user,
+            receiver_name="N",
+            house_number="1",
+            district="D",
+            province="P",
+            post_code="10200",
+            is_default=True,
+        )
+        resp = await self.async_client.get(reverse("address-default"), headers=self.auth)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["data"]["receiver_name"], "N")
+
+    async def test_default_address_missing(self):
+        """[Invalid Input] GET /api/address/default/ without one returns 404"""
+        resp = await self.async_client.get(reverse("address-default"), headers=self.auth)
+        self.assertEqual(resp.status_code, 404)
+
 
 class PaymentMethodAPITest(APITestCase):
     def setUp(self):
@@ -71,6 +125,21 @@ class PaymentMethodAPITest(APITestCase):
         resp = self.client.post(reverse("paymentmethod-list"), {}, format="json")
         self.assertEqual(resp.status_code, 400)
 
+    def test_list_payment_methods_compressed(self):
+        """[Normal] a large list is sent with brotli when the client accepts it"""
+        UserPaymentMethod.objects.bulk_create(
+            UserPaymentMethod(user=self.user, method="card", holder_name="H" * 200)
+            for _ in range(10)
+        )
+        resp = self.client.get(
+            reverse("paymentmethod-list"),
+            {"fields": "method,holder_name"},
+            HTTP_ACCEPT_ENCODING="gzip, br",
+        )
+        self.assertEqual(resp.headers["Content-Encoding"], "br")
+        data = json.loads(brotli.decompress(resp.content))["data"]
+        self.assertEqual(data[0], {"method": "card", "holder_name": "H" * 200})
+
 
 class RegisterViewTest(APITestCase):
     def test_register_normal(self):
@@ -109,3 +178,18 @@ class RegisterViewTest(APITestCase):
         }
         resp = self.client.post(reverse("register"), payload, format="json")
         self.assertIn(resp.status_code, [400, 422])
+
+
+class TokenClaimsTest(APITestCase):
+    def test_token_carries_username_and_email(self):
+        """[Normal] POST /api/token/ signs username and email into the access token"""
+        User.objects.create_user(username="tk", password="pass", email="tk@example.com")
+        resp = self.client.post(
+            reverse("token_obtain_pair"),
+            {"username": "tk", "password": "pass"},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        token = AccessToken(resp.data["access"])
+        self.assertEqual(token["username"], "tk")
+        self.assertEqual(token["email"], "tk@example.com")
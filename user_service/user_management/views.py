@@ -7,6 +7,25 @@ from user_management.serializers import *
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from adrf.views import APIView as AsyncAPIView
+from user_service.sparse import only_columns, requested_fields
+
+
+def sparse_list(request, queryset, serializer_class):
+    """
+    Serialize ``queryset`` with the fields asked for by ``?fields=`` and
+    ``?exclude=``, reading only their columns. Returns a 400 response for
+    an unknown field.
+    """
+    try:
+        fields = requested_fields(request.query_params, serializer_class)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    columns = only_columns(serializer_class(fields=fields))
+    if columns:
+        queryset = queryset.only(*columns)
+    serializer = serializer_class(queryset, many=True, fields=fields)
+    return Response({"data": serializer.data})
 
 
 @csrf_exempt
@@ -86,8 +105,7 @@ class AddressListView(APIView):
 
     def get(self, request, format=None):
         qs = Address.objects.filter(user=request.user)
-        serializer = AddressSerializer(qs, many=True)
-        return Response({"data": serializer.data})
+        return sparse_list(request, qs, AddressSerializer)
 
     def post(self, request, format=None):
         if request.data.get("is_default"):
@@ -139,11 +157,11 @@ class AddressDetailView(APIView):
         return Response(status=204)
 
 
-class DefaultAddressView(APIView):
+class DefaultAddressView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, format=None):
-        addr = Address.objects.filter(user=request.user, is_default=True).first()
+    async def get(self, request, format=None):
+        addr = await Address.objects.filter(user=request.user, is_default=True).afirst()
         if not addr:
             return Response({"error": "Default address not found"}, status=404)
         serializer = AddressSerializer(addr)
@@ -155,8 +173,7 @@ class PaymentMethodListView(APIView):
 
     def get(self, request, format=None):
         qs = UserPaymentMethod.objects.filter(user=request.user)
-        serializer = UserPaymentMethodSerializer(qs, many=True)
-        return Response({"data": serializer.data})
+        return sparse_list(request, qs, UserPaymentMethodSerializer)
 
     def post(self, request, format=None):
         serializer = UserPaymentMethodSerializer(data=request.data)
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'user_service.settings')
 
 application = get_asgi_application()
+
+if settings.DEBUG:
+    # Serve the admin's static files, as runserver does.
+    application = ASGIStaticFilesHandler(application)
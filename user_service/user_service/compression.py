@@ -0,0 +1,86 @@
+"""
+Negotiated response compression.
+
+``CompressionMiddleware`` is Django's ``GZipMiddleware`` with brotli added.
+A client whose ``Accept-Encoding`` allows ``br`` gets brotli, which is
+smaller than gzip for JSON at a similar cost, and any other client that
+allows ``gzip`` gets gzip. Bodies under ``COMPRESSION_MIN_SIZE`` bytes are
+sent as they are: they fit in a packet or two either way, and compressing
+them only costs CPU on both ends. Streamed responses are compressed a chunk
+at a time.
+"""
+
+import brotli
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+
+def min_size():
+    return getattr(settings, "COMPRESSION_MIN_SIZE", 1024)
+
+
+def accepts(header, coding):
+    """Whether an ``Accept-Encoding`` header allows ``coding``."""
+    for item in header.split(","):
+        name, *params = item.split(";")
+        if name.strip().lower() != coding:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+class CompressionMiddleware(GZipMiddleware):
+    # Quality 11, brotli's default, is meant for static files and is many
+    # times slower. 5 compresses JSON better than gzip at about its speed.
+    brotli_quality = 5
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < min_size():
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        if not accepts(request.META.get("HTTP_ACCEPT_ENCODING", ""), "br"):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._abrotli(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = self._brotli(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # A strong ETag names the uncompressed bytes, see GZipMiddleware.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    def _brotli(self, chunks):
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+    async def _abrotli(self, chunks):
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        async for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
@@ -0,0 +1,216 @@
+"""
+Routing reads to PostgreSQL replicas.
+
+``ReplicaMiddleware`` marks each request, and ``ReplicaRouter`` sends the
+ORM reads of a GET, HEAD or OPTIONS request to one of the aliases listed
+in ``REPLICA_DATABASES``. Everything else goes to ``default``:
+
+- writes, ``select_for_update()`` and reads inside a transaction;
+- every query of a request that changes data, and every read after the
+  first write of a request;
+- every query of a client that changed data in the last
+  ``REPLICA_PIN_SECONDS``, so it reads its own writes. Clients are told
+  apart by their bearer token or session cookie, which are known before
+  authentication runs. The pin is kept in the cache, which must be shared
+  between workers for it to hold across them;
+- reads outside a request, e.g. in management commands.
+
+A replica whose replication lag exceeds ``REPLICA_MAX_LAG`` seconds, or
+that cannot be reached, drops out of rotation until a later check finds
+it caught up. Lag is checked at most every ``REPLICA_CHECK_INTERVAL``
+seconds per process.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_current = ContextVar("replica_routing", default=None)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def replica_lag(alias):
+    """
+    Seconds ``alias`` is behind its primary, or ``None`` when that cannot
+    be told. Only PostgreSQL can report lag; other databases count as
+    caught up.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return 0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_SQL)
+            (lag,) = cursor.fetchone()
+    except DatabaseError as e:
+        logger.warning("Cannot check replication lag on %s: %s", alias, e)
+        connection.close()
+        return None
+    return None if lag is None else float(lag)
+
+
+class ReplicaHealth:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = {}
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, "REPLICA_CHECK_INTERVAL", 5)
+        checked_at, healthy = self.checked.get(alias, (None, False))
+        if checked_at is not None and time.monotonic() - checked_at < interval:
+            return healthy
+        # One thread checks; the others go on with the last result rather
+        # than wait on a replica that may not answer.
+        if not self.lock.acquire(blocking=False):
+            return healthy
+        try:
+            was_healthy = healthy or checked_at is None
+            lag = replica_lag(alias)
+            healthy = lag is not None and lag <= getattr(settings, "REPLICA_MAX_LAG", 5)
+            if healthy and not was_healthy:
+                logger.info("Replica %s is back in rotation", alias)
+            elif was_healthy and not healthy:
+                logger.warning("Replica %s is out of rotation, lag %s", alias, lag)
+            self.checked[alias] = (time.monotonic(), healthy)
+            return healthy
+        finally:
+            self.lock.release()
+
+    def reset(self):
+        with self.lock:
+            self.checked.clear()
+
+
+health = ReplicaHealth()
+
+
+class RequestRouting:
+    __slots__ = ("safe", "pin_key", "wrote", "replica")
+
+    def __init__(self, request):
+        self.safe = request.method in SAFE_METHODS
+        self.pin_key = _pin_key(request)
+        self.wrote = False
+        # Chosen on the first read; "" means the primary.
+        self.replica = None
+
+
+def _pin_key(request):
+    credential = request.headers.get("Authorization") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credential:
+        return None
+    digest = hashlib.sha256(credential.encode()).hexdigest()
+    return f"db:primary-pin:{digest}"
+
+
+def _replicas():
+    return getattr(settings, "REPLICA_DATABASES", ())
+
+
+def _pin_seconds():
+    return getattr(settings, "REPLICA_PIN_SECONDS", 10)
+
+
+def _choose_replica(state):
+    if not state.safe:
+        return ""
+    if state.pin_key is not None and cache.get(state.pin_key):
+        return ""
+    healthy = [alias for alias in _replicas() if health.is_healthy(alias)]
+    return random.choice(healthy) if healthy else ""
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or not _replicas():
+            return None
+        if state.wrote:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = _choose_replica(state)
+        return state.replica or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in _replicas()
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestRouting(request)
+        token = _current.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _current.reset(token)
+            self.pin(state)
+
+    async def __acall__(self, request):
+        state = RequestRouting(request)
+        token = _current.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _current.reset(token)
+            await self.apin(state)
+
+    def should_pin(self, state):
+        return (
+            state.pin_key is not None
+            and (state.wrote or not state.safe)
+            and bool(_replicas())
+        )
+
+    def pin(self, state):
+        if self.should_pin(state):
+            cache.set(state.pin_key, True, _pin_seconds())
+
+    async def apin(self, state):
+        if self.should_pin(state):
+            await cache.aset(state.pin_key, True, _pin_seconds())
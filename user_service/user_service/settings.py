@@ -45,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "user_service.metrics.MetricsMiddleware",
+    "user_service.db.replicas.ReplicaMiddleware",
+    "user_service.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -55,6 +58,9 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Responses smaller than this many bytes are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+
 ROOT_URLCONF = "user_service.urls"
 
 TEMPLATES = [
@@ -83,15 +89,57 @@ WSGI_APPLICATION = "user_service.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # PostgreSQL with a per-process connection pool, see user_service/db.
+        "ENGINE": "user_service.db",
         "NAME": os.environ.get("POSTGRES_DB"),       # <--- แก้ไขตรงนี้ (จาก POSTGRES_NAME)
         "USER": os.environ.get("POSTGRES_USER"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"), # <--- ชื่อนี้ตรงกับใน .env ใหม่
-        "HOST": "db",  # HOST คือชื่อ service ของ database ใน docker-compose.yml
-        "PORT": 5432,
+        # HOST คือชื่อ service ของ database ใน docker-compose.yml
+        "HOST": os.environ.get("POSTGRES_HOST", "db"),
+        "PORT": int(os.environ.get("POSTGRES_PORT", 5432)),
+        # DB_TEST_MIGRATE=false builds the test database from the models
+        # instead of the migrations, for servers without pg_trgm.
+        "TEST": {
+            "MIGRATE": os.environ.get("DB_TEST_MIGRATE", "true").lower() == "true"
+        },
+        # Ping pooled connections that sat idle before handing them out.
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            # DB_POOL=false goes back to one connection per request.
+            "pool": os.environ.get("DB_POOL", "true").lower() == "true"
+            and {
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+                "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+                "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", 600)),
+            },
+        },
     }
 }
 
+# Read replicas, e.g. DB_REPLICA_HOSTS=db-replica-1,db-replica-2. Reads of
+# GET requests go to them, see user_service/db/replicas.py.
+REPLICA_DATABASES = []
+for number, host in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), start=1
+):
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ["user_service.db.replicas.ReplicaRouter"]
+# Seconds a client that wrote keeps reading from the primary.
+REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", 10))
+# A replica further behind than this many seconds drops out of rotation.
+REPLICA_MAX_LAG = float(os.environ.get("DB_REPLICA_MAX_LAG", 5))
+# Seconds between replication lag checks, per replica and process.
+REPLICA_CHECK_INTERVAL = float(os.environ.get("DB_REPLICA_CHECK_INTERVAL", 5))
+
 # Email settings
 EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
@@ -102,6 +150,13 @@ EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
 
+# Requests running more SQL queries than this are logged as warnings.
+METRICS_QUERY_COUNT_THRESHOLD = int(os.environ.get("METRICS_QUERY_COUNT_THRESHOLD", 20))
+
+# Bearer token Prometheus sends to scrape /metrics. /metrics answers 404
+# while it is empty.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -148,3 +203,7 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     )
 }
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "user_management.serializers.ClaimsTokenObtainPairSerializer",
+}